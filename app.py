@@ -1,19 +1,36 @@
 import streamlit as st
 from weather import (
-    get_weather,
-    get_forecast,
-    get_air_pollution,
-    plot_weather,
-    plot_pollution,
-    generate_report,
-    get_user_location,
-    get_current_weather,
+    fetch_location,
+    fetch_nearby,
+    get_local_weather,
     get_weather_tips,
+    http_latency_snapshot,
     parse_record_time,
+    parse_location_input,
+    response_cache,
+    suggest_places,
 )
 from database import WeatherDB
-from datetime import datetime, time, timedelta
+from export import FORMATS, export_history, export_path, remove_export
+from history_writer import HistoryWriter
+from observations import get_observation_store
+import tracing
+from datetime import datetime, timedelta
+from time import monotonic
+from concurrent.futures import ThreadPoolExecutor
 import urllib.parse
+import os
+
+# Hidden debug panel (?debug=1 or WEATHER_DEBUG=1) and single-rerun profiling
+# (WEATHER_PROFILE=cprofile|pyinstrument, triggered from the panel or ?profile=1)
+DEBUG = os.getenv("WEATHER_DEBUG") == "1" or st.query_params.get("debug") == "1"
+PROFILE_KIND = os.getenv("WEATHER_PROFILE")
+DEBUG_SEARCHES = 20
+
+profiler = None
+if PROFILE_KIND and (st.session_state.pop("profile_next", False) or "profile" in st.query_params):
+    st.query_params.pop("profile", None)
+    profiler = tracing.Profiler(PROFILE_KIND).start()
 
 st.markdown(
     "<h1 style='text-align: center; color: #2E86C1;'> Weather & Air Around You</h1>",
@@ -21,155 +38,340 @@ st.markdown(
 )
 st.markdown("---")
 
-col1 = st.columns(1)[0]
-latitude, longitude = get_user_location()
-with col1:
-    if latitude and longitude:
-        weather = get_current_weather(latitude, longitude)
-        city = weather.get("city", "Your Location")  #
-        st.subheader(f"Today's Weather in {city}")
-        if "error" in weather:
-            st.error(weather["error"])
-        else:
-            st.markdown(
-                f"""
-                <div style='display: flex; gap: 20px; justify-content: center;'>
-                    <div style='background-color:#f0f8ff;padding:15px;border-radius:12px;box-shadow:2px 2px 10px #dcdcdc;width:30%;text-align:center;'>
-                        <h3>🌡 Temp</h3>
-                        <p style='font-size:22px;font-weight:bold;'>{weather["temperature"]} °C</p>
-                    </div>
-                    <div style='background-color:#eafaf1;padding:15px;border-radius:12px;box-shadow:2px 2px 10px #dcdcdc;width:30%;text-align:center;'>
-                        <h3>💧 Humidity</h3>
-                        <p style='font-size:22px;font-weight:bold;'>{weather["humidity"]}%</p>
-                    </div>
-                    <div style='background-color:#fef9e7;padding:15px;border-radius:12px;box-shadow:2px 2px 10px #dcdcdc;width:30%;text-align:center;'>
-                        <h3>🌬️ Wind</h3>
-                        <p style='font-size:22px;font-weight:bold;'>{weather["wind_speed"]} m/s</p>
-                    </div>
+# How long the auto-located weather is reused within a session, and how often
+# its panel checks on the background lookup while it is running
+LOCAL_WEATHER_TTL = 10 * 60
+LOCAL_WEATHER_POLL = 1
+
+
+@st.cache_resource
+def get_background_pool():
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="local-weather")
+
+
+def local_weather_future():
+    """Background lookup of the IP-located weather, shared by the session's reruns."""
+    cached = st.session_state.get("local_weather")
+    if cached is None or monotonic() - cached["at"] > LOCAL_WEATHER_TTL:
+        cached = {"at": monotonic(), "future": get_background_pool().submit(get_local_weather)}
+        st.session_state.local_weather = cached
+    return cached["future"]
+
+
+def describe_approx(approx):
+    """Caption for a result reused from a nearby point (see weather.fetch_nearby)."""
+    minutes = approx["age_seconds"] // 60
+    age = f"{minutes} min ago" if minutes else "just now"
+    return f"≈ Approximate: data fetched {age} for a point {approx['distance_km']:.1f} km away"
+
+
+def render_local_weather(weather):
+    city = weather.get("city", "Your Location")  #
+    st.subheader(f"Today's Weather in {city}")
+    if weather.get("approx"):
+        st.caption(describe_approx(weather["approx"]))
+    if "error" in weather:
+        st.error(weather["error"])
+    else:
+        st.markdown(
+            f"""
+            <div style='display: flex; gap: 20px; justify-content: center;'>
+                <div style='background-color:#f0f8ff;padding:15px;border-radius:12px;box-shadow:2px 2px 10px #dcdcdc;width:30%;text-align:center;'>
+                    <h3>🌡 Temp</h3>
+                    <p style='font-size:22px;font-weight:bold;'>{weather["temperature"]} °C</p>
                 </div>
-                """,
-                unsafe_allow_html=True,
-            )
+                <div style='background-color:#eafaf1;padding:15px;border-radius:12px;box-shadow:2px 2px 10px #dcdcdc;width:30%;text-align:center;'>
+                    <h3>💧 Humidity</h3>
+                    <p style='font-size:22px;font-weight:bold;'>{weather["humidity"]}%</p>
+                </div>
+                <div style='background-color:#fef9e7;padding:15px;border-radius:12px;box-shadow:2px 2px 10px #dcdcdc;width:30%;text-align:center;'>
+                    <h3>🌬️ Wind</h3>
+                    <p style='font-size:22px;font-weight:bold;'>{weather["wind_speed"]} m/s</p>
+                </div>
+            </div>
+            """,
+            unsafe_allow_html=True,
+        )
+
+        tips = get_weather_tips(weather["temperature"], weather["description"])
+        st.markdown("### 🌤️ Today's Weather Tips for You:")
+        for tip in tips:
+            st.write(f"- {tip}")
+
 
-            tips = get_weather_tips(weather["temperature"], weather["description"])
-            st.markdown("### 🌤️ Today's Weather Tips for You:")
-            for tip in tips:
-                st.write(f"- {tip}")
+# Never waits on the lookup: while it runs, the panel reruns on its own
+# every LOCAL_WEATHER_POLL seconds until the result is there
+@st.fragment(run_every=None if local_weather_future().done() else LOCAL_WEATHER_POLL)
+def local_weather_panel():
+    future = local_weather_future()
+    if not future.done():
+        st.info("📍 Detecting your location…")
+    elif future.exception() is None and future.result():
+        render_local_weather(future.result())
 
 
+col1 = st.columns(1)[0]
+with col1:
+    local_weather_panel()
+
 now = datetime.now()
-# Initialize database
-db = WeatherDB()
+
+
+# Initialize database once per process; connections come from its pool
+@st.cache_resource
+def get_db():
+    return WeatherDB()
+
+
+db = get_db()
+
+
+# Search history is written in the background so results never wait on MySQL;
+# write failures from the last few minutes are shown with the next search
+HISTORY_FAILURE_WINDOW = 5 * 60
+
+
+@st.cache_resource
+def get_history_writer():
+    return HistoryWriter(get_db())
+
+
+history_writer = get_history_writer()
+
+
+# Optional in-process cache pre-warming for the most searched locations
+@st.cache_resource
+def get_prewarmer():
+    from prewarm import Prewarmer
+
+    return Prewarmer(get_db()).start()
+
+
+if os.getenv("WEATHER_PREWARM") == "1":
+    get_prewarmer()
+
+
+# Optional OpenMetrics endpoint for Prometheus: http://127.0.0.1:$WEATHER_METRICS_PORT/metrics
+@st.cache_resource
+def get_metrics_server(port):
+    return tracing.start_metrics_server(port, http_latency_snapshot)
+
+
+if os.getenv("WEATHER_METRICS_PORT"):
+    get_metrics_server(int(os.environ["WEATHER_METRICS_PORT"]))
 
 st.title("Search (city/lat,lon/zipcode)")
 # Input section
 location_input = st.text_input("Enter City / Zip / Lat,Lon")
 
+# Instant suggestions from the local gazetteer (if one is configured)
+suggestions = [] if "," in location_input else suggest_places(location_input)
+if suggestions:
+    st.caption("Suggestions: " + ", ".join(s["name"] for s in suggestions))
+
+# Spans from the search and the rendering below are grouped per search
+search_trace = None
+
 if st.button("Search"):
+    search_trace = tracing.start_trace("search", query=location_input)
     lat_val, lon_val = None, None
     city, zipcode = None, None
 
-    # Check if user entered lat,lon
-    if "," in location_input:
-        try:
-            lat_val, lon_val = map(float, location_input.split(","))
-        except:  # noqa: E722
-            st.error("Invalid latitude/longitude format. Use: lat,lon")
-    elif location_input.isdigit():
-        zipcode = location_input
+    # City, zip or lat,lon
+    try:
+        query = parse_location_input(location_input)
+        city, zipcode = query["city"], query["zipcode"]
+        lat_val, lon_val = query["lat"], query["lon"]
+    except ValueError:
+        st.error("Invalid latitude/longitude format. Use: lat,lon")
+
+    # One lookup serves the current weather, forecast and air pollution;
+    # coordinates may reuse a recent result fetched close by. Results are kept
+    # in compact form (float32 / categorical arrays) while in session state.
+    if lat_val is not None and lon_val is not None:
+        result = fetch_nearby(lat_val, lon_val, include_pollution=True)
     else:
-        city = location_input
-
-    weather = get_weather(
-        city=city if city else None,
-        zipcode=zipcode if zipcode else None,
-        lat=lat_val,
-        lon=lon_val,
-    )
+        result = fetch_location(
+            city=city if city else None,
+            zipcode=zipcode if zipcode else None,
+            include_pollution=True,
+            compact=True,
+        )
+    weather = result["weather"] if result else None
 
     if weather:
-        # Air Pollution
-        pollution = get_air_pollution(weather["lat"], weather["lon"])
+        pollution = result["pollution"]
         air_quality_text = "N/A"
         if pollution is not None and not pollution.empty:
             # Take latest AQI value
-            air_quality_text = f"AQI {pollution.iloc[0]['aqi']}"
-
-        # ---------------- Save Search to Database ----------------
-        try:
-            db.add_record(
-                location=weather["city"],
-                weather=weather["weather"],
-                air_quality=air_quality_text,
-                record_time=now.strftime("%H:%M:%S"),
-                date=now.date(),
-            )
-        except Exception as e:
-            st.warning(f"⚠ Could not save to database: {e}")
+            air_quality_text = f"AQI {pollution['aqi'][0]}"
+
+        # ---------------- Save Search to Database (write-behind) ----------------
+        if not history_writer.submit(
+            location=weather["city"],
+            weather=weather["weather"],
+            air_quality=air_quality_text,
+            record_time=now.strftime("%H:%M:%S"),
+            date=now.date(),
+        ):
+            st.warning("⚠ Search history is backed up; this search was not saved.")
+        failure = history_writer.last_failure
+        if failure and monotonic() - failure[0] < HISTORY_FAILURE_WINDOW:
+            st.warning(f"⚠ Recent searches could not be saved to history: {failure[1]}")
+
+        # Keep the results across reruns (e.g. the report button below)
+        st.session_state.search = {"city": city, "result": result}
+        st.session_state.pop("report", None)
 
-        # Current weather
-        st.subheader(f"🌤 Current Weather in {weather['city']}")
-        st.write(f"**Temperature:** {weather['temp']} °C")
-        search_query = f"{city} weather"
-        youtube_url = f"https://www.youtube.com/results?search_query={urllib.parse.quote(search_query)}"
-
-        st.markdown(
-            f"[▶ Watch Weather Video for {city}]({youtube_url})", unsafe_allow_html=True
-        )
-
-        # Handle DB string vs API JSON
-        if "weather" in weather:  # From API
-            if isinstance(weather["weather"], list):
-                st.write(
-                    f"**Condition:** {weather['weather'][0]['main']} ({weather['weather'][0]['description']})"
-                )
-            else:
-                st.write(f"**Condition:** {weather['weather']}")
-        elif "description" in weather:
-            st.write(f"**Condition:** {weather['description']}")
-        elif "condition" in weather:
-            st.write(f"**Condition:** {weather['condition']}")
+    else:
+        st.session_state.pop("search", None)
+        if suggestions:
+            st.error(f"Location not found. Did you mean {suggestions[0]['name']}?")
         else:
+            st.error("Location not found. Try again!")
+
+search = st.session_state.get("search")
+if search:
+    # Charting and PDF code only load once there is something to show
+    from plots import render_weather, render_pollution
+    from report import report_bytes
+
+    city = search["city"]
+    result = search["result"]
+    weather = result["weather"]
+    # zero-copy DataFrame views over the compact arrays
+    forecast = result["daily"].to_frame() if result["daily"] is not None else None
+    pollution = result["pollution"].to_frame() if result["pollution"] is not None else None
+    date_column = {"date": st.column_config.DateColumn("date")}
+
+    if result["timed_out"]:
+        st.warning(f"⚠ Timed out fetching: {', '.join(result['timed_out'])}")
+
+    # Current weather
+    st.subheader(f"🌤 Current Weather in {weather['city']}")
+    if result.get("approx"):
+        st.info(describe_approx(result["approx"]))
+    st.write(f"**Temperature:** {weather['temp']} °C")
+    search_query = f"{city} weather"
+    youtube_url = f"https://www.youtube.com/results?search_query={urllib.parse.quote(search_query)}"
+
+    st.markdown(
+        f"[▶ Watch Weather Video for {city}]({youtube_url})", unsafe_allow_html=True
+    )
+
+    # Handle DB string vs API JSON
+    if "weather" in weather:  # From API
+        if isinstance(weather["weather"], list):
             st.write(
-                f"**Condition:** {weather['weather'] if 'weather' in weather else 'N/A'}"
+                f"**Condition:** {weather['weather'][0]['main']} ({weather['weather'][0]['description']})"
             )
-
-        if "next_3h_temp" in weather:
-            st.write(f"🌡 Next 3h Temp: {weather['next_3h_temp']} °C")
-            st.write(f"⏳ Next 3h Condition: {weather['next_3h_condition']}")
-
-        # Forecast
-        forecast = get_forecast(
-            city=city if city else None,
-            zipcode=zipcode if zipcode else None,
-            lat=lat_val,
-            lon=lon_val,
+        else:
+            st.write(f"**Condition:** {weather['weather']}")
+    elif "description" in weather:
+        st.write(f"**Condition:** {weather['description']}")
+    elif "condition" in weather:
+        st.write(f"**Condition:** {weather['condition']}")
+    else:
+        st.write(
+            f"**Condition:** {weather['weather'] if 'weather' in weather else 'N/A'}"
         )
-        if forecast is not None:
-            st.subheader("📊 6-Day Weather Forecast (Daily Averages)")
-            st.dataframe(forecast)
-            st.pyplot(plot_weather(forecast))
-
-        if pollution is not None:
-            st.subheader("💨 Air Quality Forecast (5 Days)")
-            st.dataframe(pollution)
-            st.pyplot(plot_pollution(pollution))
-
-        # Report
-        report = generate_report(weather["city"], weather, forecast, pollution)
+
+    if "next_3h_temp" in weather:
+        st.write(f"🌡 Next 3h Temp: {weather['next_3h_temp']} °C")
+        st.write(f"⏳ Next 3h Condition: {weather['next_3h_condition']}")
+
+    # Tips for every forecast slot, merged into time ranges (local time)
+    if result["slots"] is not None:
+        from tips import get_engine
+
+        ranges = get_engine().tip_ranges(result["slots"].to_frame(), result["current_raw"].get("timezone", 0))
+        if not ranges.empty:
+            st.markdown("### ⏰ What's Coming Up")
+            for text in ranges["text"].head(8):
+                st.write(f"- {text}")
+
+    # Forecast
+    if forecast is not None:
+        st.subheader("📊 6-Day Weather Forecast (Daily Averages)")
+        st.dataframe(forecast, column_config=date_column)
+        st.image(render_weather(forecast))
+
+    if pollution is not None:
+        st.subheader("💨 Air Quality Forecast (5 Days)")
+        st.dataframe(pollution, column_config=date_column)
+        st.image(render_pollution(pollution))
+
+    # Trend from locally stored observations (OBSERVATIONS_DB), no API calls
+    store = get_observation_store()
+    if store is not None:
+        with tracing.span("observations.trend"):
+            trend = store.resample("weather", weather["city"], "1D", source="current")
+        if len(trend.dropna()) > 1:
+            st.subheader("📈 Observed Temperature Trend (Daily Mean)")
+            st.line_chart(trend["temp"])
+
+    # Report: only built when asked for, then cached by location + data time
+    if st.button("📄 Prepare Weather Report (PDF)"):
+        st.session_state.report = report_bytes(weather["city"], weather, forecast, pollution)
+
+    if st.session_state.get("report"):
         st.download_button(
             label="⬇️ Download Weather Report (PDF)",
-            data=report,
+            data=st.session_state.report,
             file_name=f"{weather['city']}_weather_report.pdf",
             mime="application/pdf",
         )
 
-    else:
-        st.error("Location not found. Try again!")
+if search_trace is not None:
+    search_trace.end()
 
-menu = ["Add Record", "View Records", "Update Record", "Delete Record"]
+menu = ["Add Record", "View Records", "Update Record", "Delete Record", "Analytics"]
 choice = st.sidebar.selectbox("Menu", menu)
 
+AQI_OPTIONS = ["Any", "AQI 1", "AQI 2", "AQI 3", "AQI 4", "AQI 5", "N/A"]
+PAGE_SIZE = 50
+
+
+def history_filters(key):
+    """Render location / date range / AQI filters and return them as kwargs."""
+    c1, c2, c3 = st.columns(3)
+    location = c1.text_input("Filter by location", key=f"{key}_location")
+    date_range = c2.date_input("Date range", value=(), key=f"{key}_dates")
+    air_quality = c3.selectbox("Air quality", AQI_OPTIONS, key=f"{key}_aqi")
+    return {
+        "location": location.strip() or None,
+        "date_from": date_range[0] if len(date_range) > 0 else None,
+        "date_to": date_range[1] if len(date_range) > 1 else None,
+        "air_quality": None if air_quality == "Any" else air_quality,
+    }
+
+
+def history_page(key, filters):
+    """Return ``(records, cursors, next cursor)`` for the current page of ``key``.
+
+    Keyset cursors of the pages visited so far are kept in session state and
+    reset when the filters change.
+    """
+    if st.session_state.get(f"{key}_filters") != filters:
+        st.session_state[f"{key}_filters"] = filters
+        st.session_state[f"{key}_cursors"] = [None]
+    cursors = st.session_state[f"{key}_cursors"]
+    records, next_cursor = db.get_page(limit=PAGE_SIZE, after=cursors[-1], **filters)
+    if records:
+        st.caption(f"{db.count(**filters)} matching records · page {len(cursors)}")
+    return records, cursors, next_cursor
+
+
+def page_buttons(key, cursors, next_cursor):
+    prev_col, next_col = st.columns(2)
+    if prev_col.button("⬅ Previous", disabled=len(cursors) == 1, key=f"{key}_previous"):
+        cursors.pop()
+        st.rerun()
+    if next_col.button("Next ➡", disabled=next_cursor is None, key=f"{key}_next"):
+        cursors.append(next_cursor)
+        st.rerun()
+
+
 #  Add Record
 if choice == "Add Record":
     st.subheader("Add New Weather Record")
@@ -192,19 +394,46 @@ if choice == "Add Record":
 #  View Records
 elif choice == "View Records":
     st.subheader("Weather History Records")
-    records = db.get_records()
+    filters = history_filters("view")
+    records, cursors, next_cursor = history_page("view", filters)
     if records:
         st.table(records)
+        page_buttons("view", cursors, next_cursor)
+
+        # Full export of the filtered rows, streamed from the database to a file
+        # in export.EXPORT_DIR chunk by chunk (Streamlit then serves it as the download)
+        with st.expander("⬇️ Export matching records"):
+            export_fmt = st.radio("Format", FORMATS, horizontal=True, key="export_format")
+            if st.button("Prepare export"):
+                previous = st.session_state.pop("export", None)
+                if previous:
+                    remove_export(previous["path"])
+                path = export_path(export_fmt)
+                rows = export_history(db, path, export_fmt, **filters)
+                st.session_state.export = {
+                    "path": path, "rows": rows, "format": export_fmt, "filters": filters,
+                }
+
+            export = st.session_state.get("export")
+            if export and export["filters"] == filters and os.path.exists(export["path"]):
+                with open(export["path"], "rb") as f:
+                    st.download_button(
+                        label=f"Download {export['rows']} records ({export['format']})",
+                        data=f,
+                        file_name=f"weather_history.{export['format']}",
+                        mime="text/csv" if export["format"] == "csv" else "application/octet-stream",
+                    )
     else:
         st.warning("⚠ No records found.")
 
 #  Update Record
 elif choice == "Update Record":
     st.subheader("Update Weather Record")
-    records = db.get_records()
+    records, cursors, next_cursor = history_page("update", history_filters("update"))
     record_dict = {f"{r['id']} - {r['location']} ({r['weather']})": r for r in records}
 
     if record_dict:
+        page_buttons("update", cursors, next_cursor)
         selection = st.selectbox("Select record to update", list(record_dict.keys()))
         record = record_dict[selection]
 
@@ -231,10 +460,11 @@ elif choice == "Update Record":
 #  Delete Record
 elif choice == "Delete Record":
     st.subheader("Delete Weather Record")
-    records = db.get_records()
+    records, cursors, next_cursor = history_page("delete", history_filters("delete"))
     record_dict = {f"{r['id']} - {r['location']} ({r['weather']})": r for r in records}
 
     if record_dict:
+        page_buttons("delete", cursors, next_cursor)
         selection = st.selectbox("Select record to delete", list(record_dict.keys()))
         record = record_dict[selection]
 
@@ -242,3 +472,82 @@ elif choice == "Delete Record":
             db.delete_record(record["id"])
             st.success("Record deleted successfully!")
 
+
+#  Analytics (from the daily rollup tables, never from raw history rows)
+elif choice == "Analytics":
+    import pandas as pd
+
+    st.subheader("Search Analytics")
+    c1, c2 = st.columns(2)
+    location = c1.text_input("Filter by location", key="analytics_location").strip() or None
+    date_range = c2.date_input(
+        "Date range", value=(now.date() - timedelta(days=30), now.date()), key="analytics_dates"
+    )
+    date_from = date_range[0] if len(date_range) > 0 else None
+    date_to = date_range[1] if len(date_range) > 1 else None
+
+    daily = pd.DataFrame(db.daily_rollups(location, date_from, date_to))
+    if daily.empty:
+        st.warning("⚠ No searches in this range.")
+    else:
+        distribution = pd.DataFrame(db.aqi_distribution(location, date_from, date_to))
+        for frame in (daily, distribution):
+            frame["location"] = frame["location"].replace("", "(unknown)")
+        top = distribution["location"].head(10).tolist()
+
+        st.markdown("**Searches per day (top 10 locations)**")
+        per_day = daily[daily["location"].isin(top)].pivot_table(
+            index="day", columns="location", values="searches", aggfunc="sum", fill_value=0
+        )
+        st.line_chart(per_day)
+
+        st.markdown("**AQI distribution per location**")
+        aqi = distribution.set_index("location").drop(columns="searches").head(10)
+        aqi.columns = [c.replace("aqi_", "AQI ").replace("AQI other", "N/A / other") for c in aqi.columns]
+        st.bar_chart(aqi)
+
+        st.markdown("**Daily summary**")
+        st.dataframe(daily[["day", "location", "searches", "top_condition"]], hide_index=True)
+
+
+# ---------------- Debug panel (hidden) ----------------
+if profiler is not None:
+    st.session_state.profile_report = profiler.stop()
+
+if DEBUG:
+    with st.expander("🛠 Debug: performance", expanded=True):
+        traces = tracing.recent_traces(DEBUG_SEARCHES, name="search")
+        if traces:
+            st.markdown(f"**Last {len(traces)} searches (ms per stage)**")
+            rows = []
+            for t in traces:
+                cached = [s.cache for s in t.spans if s.cache]
+                row = {
+                    "query": t.attrs.get("query"),
+                    "total": round(t.duration * 1000, 1),
+                    "cache hits": f"{cached.count('hit')}/{len(cached)}",
+                }
+                row.update({name: round(sec * 1000, 1) for name, sec in t.stages().items()})
+                rows.append(row)
+            st.dataframe(rows)
+        else:
+            st.caption("No searches traced yet.")
+
+        st.markdown("**Spans (recent calls)**")
+        st.dataframe(tracing.summary())
+
+        st.markdown("**Response cache**")
+        st.write(dict(response_cache.stats, entries=len(response_cache)))
+
+        st.markdown("**History writer**")
+        st.write(dict(history_writer.stats, pending=history_writer.pending))
+
+        if PROFILE_KIND:
+            if st.button("🔬 Profile next rerun"):
+                st.session_state.profile_next = True
+            if st.session_state.get("profile_report"):
+                st.markdown(f"**Last profiled rerun ({PROFILE_KIND})**")
+                st.code(st.session_state.profile_report, language="text")
+
+        with st.expander("OpenMetrics"):
+            st.code(tracing.openmetrics(http_latency_snapshot()), language="text")
@@ -0,0 +1,192 @@
+"""Batch weather + air-quality lookups for many locations.
+
+Usage:
+    python batch.py locations.txt -o weather.parquet
+    python batch.py locations.txt -o weather.csv --workers 8 --rate 60
+    python batch.py locations.txt -o weather.parquet --reports reports/
+    python batch.py locations.txt -o weather.parquet --tips tips.csv
+
+``locations.txt`` holds one city, PIN code or "lat,lon" per line; blank
+lines and lines starting with ``#`` are ignored.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from frames import daily_forecast, daily_pollution
+from http_client import TokenBucket
+from report import write_reports
+from tips import forecast_tips
+from weather import fetch_location, parse_location_input
+
+# OpenWeather free plan: 60 calls/minute. Each location costs up to 3 calls
+# (weather, forecast, air pollution); cache hits still consume tokens.
+DEFAULT_RATE_PER_MINUTE = 60
+CALLS_PER_LOCATION = 3
+
+
+def _fetch_one(query, bucket, requests_pool):
+    """Return ``(summary row, forecast slots, pollution slots)`` for one input."""
+    try:
+        kwargs = parse_location_input(query)
+    except ValueError:
+        return {"query": query, "error": "invalid lat,lon"}, [], []
+
+    bucket.acquire(CALLS_PER_LOCATION)
+    try:
+        result = fetch_location(**kwargs, include_pollution=True, aggregate=False, executor=requests_pool)
+        if result is None:
+            return {"query": query, "error": "location not found"}, [], []
+
+        weather = result["weather"]
+        summary = {
+            "query": query,
+            "city": weather["city"],
+            "lat": weather["lat"],
+            "lon": weather["lon"],
+            "current_temp": weather["temp"],
+            "current_condition": weather["weather"],
+            "utc_offset": result["current_raw"].get("timezone"),
+            "error": f"timed out: {', '.join(result['timed_out'])}" if result["timed_out"] else None,
+        }
+        return summary, result["forecast_raw"], result["pollution_raw"]
+    except Exception as e:
+        # A malformed response fails this location only, not the whole batch
+        return {"query": query, "error": f"{type(e).__name__}: {e}"}, [], []
+
+
+def _daily_frame(forecasts, pollution):
+    """Aggregate every location's slots at once into (query, date) rows."""
+    forecasts = {q: slots for q, slots in forecasts.items() if slots}
+    pollution = {q: slots for q, slots in pollution.items() if slots}
+    keys = ["location", "date"]
+
+    daily = daily_forecast(forecasts) if forecasts else None
+    aqi = daily_pollution(pollution) if pollution else None
+    if daily is None and aqi is None:
+        return pd.DataFrame(columns=["query", "date"])
+    if daily is None:
+        daily = aqi
+    elif aqi is not None:
+        daily = daily.merge(aqi, on=keys, how="outer")
+    daily["location"] = daily["location"].astype(str)
+    return daily.rename(columns={"location": "query"})
+
+
+def _fetch_all(locations, max_workers, rate_per_minute):
+    # Small burst allowance, so no minute goes much over rate_per_minute
+    bucket = TokenBucket(rate_per_minute / 60, capacity=CALLS_PER_LOCATION)
+    # Upstream requests get their own pool rather than weather.py's shared one
+    with ThreadPoolExecutor(max_workers * CALLS_PER_LOCATION, thread_name_prefix="batch-fetch") as requests_pool:
+        with ThreadPoolExecutor(max_workers, thread_name_prefix="batch-location") as pool:
+            return list(pool.map(lambda q: _fetch_one(q, bucket, requests_pool), locations))
+
+
+def fetch_batch(locations, max_workers=8, rate_per_minute=DEFAULT_RATE_PER_MINUTE, tips=False):
+    """Fetch weather, forecast and air pollution for many locations.
+
+    Returns one DataFrame with a row per location per forecast day. Requests
+    run on ``max_workers`` threads and are throttled by a token bucket to
+    ``rate_per_minute`` upstream calls; the forecast and pollution slots of
+    all locations are then aggregated in a single pass. Locations that fail
+    get a single row with the reason in ``error``. Repeated queries are
+    fetched (and returned) once.
+
+    With ``tips`` the result is ``(frame, tip ranges)``: every location's
+    forecast tips (see tips.forecast_tips) from one vectorized pass.
+    """
+    # Rows are keyed by query, so duplicates would be merged twice
+    locations = list(dict.fromkeys(locations))
+    fetched = _fetch_all(locations, max_workers, rate_per_minute)
+    df = _batch_frame(fetched)
+    if not tips:
+        return df
+    forecasts = {summary["query"]: slots for summary, slots, _ in fetched if slots}
+    offsets = {summary["query"]: summary["utc_offset"] or 0 for summary, slots, _ in fetched if slots}
+    ranges = forecast_tips(forecasts, offsets) if forecasts else pd.DataFrame()
+    return df, ranges.rename(columns={"location": "query"})
+
+
+def _batch_frame(fetched):
+    if not fetched:
+        return pd.DataFrame()
+
+    summaries = pd.DataFrame([summary for summary, _, _ in fetched])
+    daily = _daily_frame(
+        {summary["query"]: slots for summary, slots, _ in fetched},
+        {summary["query"]: slots for summary, _, slots in fetched},
+    )
+    df = summaries.merge(daily, on="query", how="left")
+    # summary columns first, then the per-day values
+    front = ["query", "city", "lat", "lon", "date"]
+    return df[[c for c in front if c in df] + [c for c in df if c not in front]]
+
+
+def report_jobs(df):
+    """Turn a fetch_batch frame into report.write_reports jobs, one per location."""
+    forecast_cols = ["date", "temp", "condition"]
+    pollution_cols = ["date", "aqi", "pm2_5", "pm10", "no2", "so2", "o3", "co", "aqi_label"]
+    jobs = []
+    for _, rows in df[df["city"].notna()].groupby("query", sort=False):
+        first = rows.iloc[0]
+        weather = {
+            "temp": first["current_temp"],
+            "weather": first["current_condition"],
+            "lat": first["lat"],
+            "lon": first["lon"],
+        }
+        forecast = rows[forecast_cols].dropna() if "temp" in rows else None
+        pollution = rows[pollution_cols].dropna() if "aqi" in rows else None
+        if pollution is not None:
+            pollution = pollution.astype({"aqi": int})
+        jobs.append((first["city"], weather, forecast, pollution))
+    return jobs
+
+
+def read_locations(path):
+    with open(path, encoding="utf-8") as f:
+        return [
+            line.strip() for line in f
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+
+
+def write_frame(df, path):
+    """Write ``df`` as Parquet or CSV depending on the file extension."""
+    if path.endswith(".parquet"):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch weather + AQI lookup")
+    parser.add_argument("locations", help="file with one city / PIN / lat,lon per line")
+    parser.add_argument("-o", "--output", required=True, help="output .parquet or .csv path")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent locations")
+    parser.add_argument("--rate", type=int, default=DEFAULT_RATE_PER_MINUTE,
+                        help="max upstream calls per minute")
+    parser.add_argument("--reports", metavar="DIR", help="also write one PDF report per location")
+    parser.add_argument("--report-workers", type=int, default=None,
+                        help="processes used to render reports (default: CPU count)")
+    parser.add_argument("--tips", metavar="PATH",
+                        help="also write forecast tip time ranges (.parquet or .csv)")
+    args = parser.parse_args(argv)
+
+    df = fetch_batch(read_locations(args.locations), args.workers, args.rate, tips=bool(args.tips))
+    if args.tips:
+        df, ranges = df
+        write_frame(ranges, args.tips)
+        print(f"Wrote {len(ranges)} tip ranges to {args.tips}")
+    write_frame(df, args.output)
+    failed = df.loc[df["error"].notna(), "query"].nunique() if "error" in df else 0
+    print(f"Wrote {len(df)} rows to {args.output} ({failed} locations with errors)")
+
+    if args.reports:
+        paths = write_reports(report_jobs(df), args.reports, args.report_workers)
+        print(f"Wrote {len(paths)} reports to {args.reports}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Benchmark: per-row vs columnar forecast / air-pollution aggregation.
+
+Builds synthetic /forecast and /air_pollution/forecast payloads (40 slots
+per location) and times the old per-location, per-row conversion against
+frames.daily_forecast / frames.daily_pollution over all locations at once.
+
+Usage:
+    python benchmarks/bench_aggregation.py [--locations 1000] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import sys
+from time import perf_counter
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frames import AQI_LABELS, daily_forecast, daily_pollution  # noqa: E402
+
+CONDITIONS = ["clear sky", "few clouds", "scattered clouds", "light rain", "overcast clouds", "haze"]
+START = 1_700_000_000
+
+
+def synthetic_payloads(locations, slots=40, seed=0):
+    rng = random.Random(seed)
+    forecasts, pollution = {}, {}
+    for i in range(locations):
+        name = f"city{i}"
+        forecasts[name] = [
+            {
+                "dt": START + 10800 * s,
+                "dt_txt": pd.Timestamp(START + 10800 * s, unit="s").strftime("%Y-%m-%d %H:%M:%S"),
+                "main": {"temp": rng.uniform(10, 40)},
+                "weather": [{"description": rng.choice(CONDITIONS)}],
+            }
+            for s in range(slots)
+        ]
+        pollution[name] = [
+            {
+                "dt": START + 3600 * s,
+                "main": {"aqi": rng.randint(1, 5)},
+                "components": {k: rng.uniform(0, 200) for k in ["pm2_5", "pm10", "no2", "so2", "o3", "co"]},
+            }
+            for s in range(slots)
+        ]
+    return forecasts, pollution
+
+
+# The pre-columnar implementation, kept here as the baseline
+
+def legacy_forecast(forecast_list):
+    rows = [
+        {
+            "date": pd.to_datetime(f["dt_txt"]).date(),
+            "temp": f["main"]["temp"],
+            "condition": f["weather"][0]["description"],
+        }
+        for f in forecast_list
+    ]
+    return (
+        pd.DataFrame(rows)
+        .groupby("date")
+        .agg(temp=("temp", "mean"), condition=("condition", lambda x: x.value_counts().idxmax()))
+        .reset_index()
+    )
+
+
+def legacy_pollution(pollution_slots):
+    rows = []
+    for f in pollution_slots:
+        dt = pd.to_datetime(f["dt"], unit="s")
+        rows.append({"datetime": dt, "date": dt.date(), "aqi": f["main"]["aqi"], **f["components"]})
+    df = pd.DataFrame(rows).groupby("date", as_index=False).mean(numeric_only=True)
+    df["aqi"] = df["aqi"].round().astype(int)
+    df["aqi_label"] = df["aqi"].map(AQI_LABELS)
+    return df
+
+
+def best_of(repeat, fn):
+    times = []
+    for _ in range(repeat):
+        started = perf_counter()
+        fn()
+        times.append(perf_counter() - started)
+    return min(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--locations", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    forecasts, pollution = synthetic_payloads(args.locations)
+
+    cases = [
+        ("forecast", lambda: [legacy_forecast(s) for s in forecasts.values()],
+         lambda: daily_forecast(forecasts)),
+        ("pollution", lambda: [legacy_pollution(s) for s in pollution.values()],
+         lambda: daily_pollution(pollution)),
+    ]
+    print(f"{args.locations} locations x 40 slots (best of {args.repeat})")
+    for name, legacy, columnar in cases:
+        old = best_of(args.repeat, legacy)
+        new = best_of(args.repeat, columnar)
+        print(f"  {name:<10} per-row {old * 1000:9.1f} ms   columnar {new * 1000:8.1f} ms   {old / new:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Memory footprint of cached results: legacy dicts / DataFrames vs compact.py.
+
+Builds results for a sample of locations (default 100) from the replay
+fixtures and reports the memory each representation retains per 1,000
+locations, measured with tracemalloc (which makes the run slow):
+
+* frames: the get_weather dict + get_forecast + get_air_pollution frames
+  vs WeatherRecord + CompactFrame
+* search result: a full fetch_location result (with raw forecast and
+  pollution payloads) vs compact.compact_result(), the form kept in the
+  nearby-results index and in session state
+* response cache: the parsed /weather, /forecast and /air_pollution JSON a
+  ResponseCache holds per location while the entries are fresh. It stays
+  JSON (the shared SQLite backend stores it as text), so there is no
+  compact counterpart.
+
+A running app holds both the response cache entries and the compact result
+of a recently searched location.
+
+Usage:
+    python benchmarks/bench_memory.py [--locations 100]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+from time import perf_counter
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from cache import ResponseCache  # noqa: E402
+from compact import CompactFrame, WeatherRecord, compact_result  # noqa: E402
+from frames import forecast_frame, pollution_frame  # noqa: E402
+
+FIXTURES = os.path.join(HERE, "fixtures")
+
+
+def load(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+RAW = {
+    "weather": load("weather.json"),
+    "forecast": load("forecast.json"),
+    "pollution": load("air_pollution_forecast.json"),
+}
+
+
+def legacy_result(i):
+    """A fetch_location-shaped result; every location parses its own payloads."""
+    current = json.loads(RAW["weather"])
+    forecast_raw = json.loads(RAW["forecast"])["list"]
+    pollution_raw = json.loads(RAW["pollution"])["list"]
+    # vary the numbers so no two locations share values
+    for slot in forecast_raw:
+        slot["main"]["temp"] += i * 0.01
+    weather = {
+        "city": f"City {i}",
+        "temp": current["main"]["temp"] + i * 0.01,
+        "weather": current["weather"][0]["description"],
+        "lat": current["coord"]["lat"] + i * 0.001,
+        "lon": current["coord"]["lon"],
+        "dt": current["dt"],
+        "next_3h_temp": forecast_raw[0]["main"]["temp"],
+        "next_3h_condition": forecast_raw[0]["weather"][0]["description"],
+    }
+    return {
+        "weather": weather,
+        "forecast_raw": forecast_raw,
+        "daily": forecast_frame(forecast_raw),
+        "next_3h": forecast_raw[0],
+        "current_raw": current,
+        "timed_out": [],
+        "pollution_raw": pollution_raw,
+        "pollution": pollution_frame(pollution_raw),
+    }
+
+
+def retained(build, n):
+    """Bytes still allocated after building ``n`` objects with ``build(i)``."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(i) for i in range(n)]
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used, kept
+
+
+def legacy_frames(i):
+    r = legacy_result(i)
+    return r["weather"], r["daily"], r["pollution"]
+
+
+def compact_frames(i):
+    r = legacy_result(i)
+    return (
+        WeatherRecord.from_dict(r["weather"]),
+        CompactFrame.from_frame(r["daily"]),
+        CompactFrame.from_frame(r["pollution"]),
+    )
+
+
+def cache_entries(n):
+    """A ResponseCache holding the three endpoint payloads of ``n`` locations."""
+    cache = ResponseCache(maxsize=3 * n)
+    for i in range(n):
+        params = {"lat": 28.6 + i * 0.01, "lon": 77.2}
+        for endpoint, name in (("weather", "weather"), ("forecast", "forecast"),
+                               ("air_pollution/forecast", "pollution")):
+            cache.set(endpoint, params, json.loads(RAW[name]))
+    return cache
+
+
+def shared_columns(compact, view):
+    """Columns of ``view`` (CompactFrame.to_frame()) backed by the compact arrays."""
+    shared = []
+    for name in compact.columns:
+        values = view[name].array
+        # Categorical columns: compare the codes (the .cat.codes accessor returns a copy)
+        values = values.codes if hasattr(values, "codes") else values.to_numpy()
+        if np.shares_memory(values, compact._columns[name]):
+            shared.append(name)
+    return shared
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cached result memory footprint")
+    parser.add_argument("--locations", type=int, default=100)
+    args = parser.parse_args(argv)
+    n = args.locations
+
+    # warm up pandas internals and the shared vocabulary outside the measurement
+    compact_result(legacy_result(0))
+
+    cases = [
+        ("frames", legacy_frames, compact_frames),
+        ("search result", legacy_result, lambda i: compact_result(legacy_result(i))),
+    ]
+    scale = 1000 / n
+    print(f"{'per 1,000 locations':<22}{'legacy':>12}{'compact':>12}{'saving':>9}")
+    for name, legacy, compact in cases:
+        legacy_bytes, _ = retained(legacy, n)
+        compact_bytes, kept = retained(compact, n)
+        print(f"{name:<22}{legacy_bytes * scale / 2**20:>10.2f}MB{compact_bytes * scale / 2**20:>10.2f}MB"
+              f"{1 - compact_bytes / legacy_bytes:>9.0%}")
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    cache = cache_entries(n)
+    cache_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f"{'response cache (JSON)':<22}{cache_bytes * scale / 2**20:>10.2f}MB{'-':>12}{'-':>9}")
+    del cache
+
+    # Display conversion: DataFrame views over the stored arrays
+    for name in ("daily", "pollution"):
+        frames = [entry[name] for entry in kept]
+        started = perf_counter()
+        views = [frame.to_frame() for frame in frames]
+        elapsed = (perf_counter() - started) / len(frames) * 1e6
+        copied = set(frames[0].columns) - set(shared_columns(frames[0], views[0]))
+        print(f"to_frame() {name}: {elapsed:.0f} µs per frame, "
+              f"copied columns: {', '.join(sorted(copied)) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""End-to-end latency benchmark for the Search pipeline, fully offline.
+
+Starts benchmarks/replay_server.py in-process, points weather.py at it and
+times the API functions, report generation, chart rendering and the
+WeatherDB CRUD methods (against a temporary SQLite database). Prints p50 /
+p95 per case and compares them with a stored baseline.
+
+Usage:
+    python benchmarks/bench_search.py [--iterations 50] [--latency 0.05]
+                                      [--error-rate 0] [--warm-cache]
+    python benchmarks/bench_search.py --save-baseline      # write benchmarks/baseline.json
+    python benchmarks/bench_search.py --tolerance 0.25     # exit 1 if p95 regresses >25%
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+from datetime import date, datetime, time, timedelta
+from time import perf_counter
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+from replay_server import start_server  # noqa: E402
+
+BASELINE = os.path.join(HERE, "baseline.json")
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def render_png(fig):
+    with tempfile.TemporaryFile() as f:
+        fig.savefig(f, format="png")
+
+
+def build_cases(weather, db, warm_cache):
+    import plots
+    import report
+
+    def cold(fn):
+        # Measure the upstream path unless the cache is meant to be warm
+        def run():
+            if not warm_cache:
+                weather.response_cache.clear()
+            return fn()
+        return run
+
+    result = weather.fetch_location(city="Delhi", include_pollution=True)
+    w, forecast, pollution = result["weather"], result["daily"], result["pollution"]
+    record = {"location": "Delhi", "weather": "haze", "air_quality": "AQI 4"}
+    seconds = itertools.count()
+
+    def new_record(**values):
+        # (location, date, record_time) is unique: every record gets its own second
+        n = next(seconds)
+        return dict(record, record_time=(datetime.min + timedelta(seconds=n % 86400)).time(),
+                    date=date.today() - timedelta(days=n // 86400), **values)
+
+    db.add_records([new_record(location=f"City{i % 50}") for i in range(2000)])
+    record_id = db.get_records(limit=1)[0]["id"]
+
+    return {
+        "get_weather": cold(lambda: weather.get_weather(city="Delhi")),
+        "get_forecast": cold(lambda: weather.get_forecast(city="Delhi")),
+        "get_air_pollution": cold(lambda: weather.get_air_pollution(w["lat"], w["lon"])),
+        "fetch_location (search)": cold(lambda: weather.fetch_location(city="Delhi", include_pollution=True,
+                                                                        compact=True)),
+        "generate_report": lambda: report.generate_report(w["city"], w, forecast, pollution),
+        "plot_weather (png)": lambda: render_png(plots.plot_weather(forecast)),
+        "plot_pollution (png)": lambda: render_png(plots.plot_pollution(pollution)),
+        "db.add_record": lambda: db.add_record(**new_record()),
+        "db.add_records (100)": lambda: db.add_records([new_record() for _ in range(100)]),
+        "db.get_page (50)": lambda: db.get_page(limit=50),
+        "db.get_records (filtered)": lambda: db.get_records(limit=50, location="City1"),
+        "db.count": lambda: db.count(),
+        "db.update_record": lambda: db.update_record(record_id, "Delhi", "fog", "AQI 5", time(10), datetime.now()),
+        "db.delete_record": lambda: db.delete_record(-1),
+    }
+
+
+def run(cases, iterations):
+    results = {}
+    for name, fn in cases.items():
+        fn()  # warm-up
+        samples = []
+        for _ in range(iterations):
+            started = perf_counter()
+            fn()
+            samples.append((perf_counter() - started) * 1000)
+        results[name] = {"p50": percentile(samples, 50), "p95": percentile(samples, 95)}
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Print the table; return the names whose p95 regressed beyond ``tolerance``."""
+    regressions = []
+    print(f"{'case':<28}{'p50 ms':>10}{'p95 ms':>10}{'base p95':>10}{'change':>9}")
+    for name, r in results.items():
+        base = baseline.get(name, {}).get("p95")
+        change = ""
+        if base:
+            ratio = r["p95"] / base - 1
+            change = f"{ratio:+.0%}"
+            if ratio > tolerance:
+                regressions.append(name)
+                change += " !"
+        base_text = f"{base:.2f}" if base else "-"
+        print(f"{name:<28}{r['p50']:>10.2f}{r['p95']:>10.2f}{base_text:>10}{change:>9}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline Search pipeline latency benchmark")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="replayed upstream latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--warm-cache", action="store_true", help="keep the response cache between calls")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95 regression (fraction)")
+    args = parser.parse_args(argv)
+
+    server, url = start_server(latency=args.latency, jitter=args.jitter,
+                               error_rate=args.error_rate, seed=0)
+    workdir = tempfile.mkdtemp(prefix="weather-bench-")
+    os.environ.update({
+        "OPENWEATHER_URL": f"{url}/data/2.5",
+        "IPAPI_URL": f"{url}/json/",
+        "OPENWEATHER_API": "replay",
+        "DB_BACKEND": "sqlite",
+        "DB_PATH": os.path.join(workdir, "history.db"),
+    })
+    os.environ.pop("WEATHER_CACHE_DB", None)
+    os.environ.pop("OBSERVATIONS_DB", None)
+
+    import weather
+    from database import WeatherDB
+
+    try:
+        results = run(build_cases(weather, WeatherDB(), args.warm_cache), args.iterations)
+    finally:
+        server.shutdown()
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+    elif regressions:
+        print(f"FAIL: p95 regressed more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Cold-start guard: import time of weather.py and app.py, measured with ``python -X importtime``.
+
+Fails (exit status 1) if importing a module takes longer than its budget or
+pulls in any of the heavy modules that should only load on first use.
+
+``import app`` runs one pass of the Streamlit script in bare mode, against a
+temporary SQLite history and unreachable APIs. Streamlit itself is allowed
+(and not counted towards the budget), as is ``requests``, which the
+background local-weather lookup loads as soon as the page starts.
+
+Usage:
+    python benchmarks/import_time.py [--module weather] [--budget-ms 100] [--runs 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["pandas", "numpy", "matplotlib", "reportlab", "requests", "streamlit"]
+
+# Per module: heavy modules it may load and its budget excluding them
+ALLOWED = {"app": ["streamlit", "requests"]}
+BUDGET_MS = {"weather": 100.0, "app": 400.0}
+
+
+def import_profile(module):
+    """Return {module name: cumulative microseconds} for one cold import."""
+    env = dict(os.environ, OPENWEATHER_API=os.getenv("OPENWEATHER_API", "benchmark"))
+    with tempfile.TemporaryDirectory() as tmp:
+        if module == "app":
+            env.update(
+                DB_BACKEND="sqlite",
+                DB_PATH=os.path.join(tmp, "history.db"),
+                OPENWEATHER_URL="http://127.0.0.1:9",
+                IPAPI_URL="http://127.0.0.1:9",
+            )
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+        )
+    timings = {}
+    for line in proc.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = int(cumulative)
+    return timings
+
+
+def check(module, budget_ms, runs):
+    """Print the import time of ``module``; returns True if it passes."""
+    allowed = ALLOWED.get(module, [])
+    profiles = [import_profile(module) for _ in range(runs)]
+    best_ms = min(p[module] - sum(p.get(m, 0) for m in allowed) for p in profiles) / 1000
+    loaded = sorted(m for m in HEAVY_MODULES if m in profiles[0] and m not in allowed)
+
+    excluding = f", excluding {', '.join(allowed)}" if allowed else ""
+    print(f"import {module}: {best_ms:.1f} ms (best of {runs}{excluding}, budget {budget_ms:.0f} ms)")
+    ok = True
+    if loaded:
+        print(f"FAIL: heavy modules imported eagerly: {', '.join(loaded)}")
+        ok = False
+    if best_ms > budget_ms:
+        print("FAIL: import time over budget")
+        ok = False
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", action="append",
+                        help="module to check (repeatable; default: weather and app)")
+    parser.add_argument("--budget-ms", type=float, help="override the per-module budget")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = [
+        check(module, args.budget_ms or BUDGET_MS.get(module, 100.0), args.runs)
+        for module in args.module or BUDGET_MS
+    ]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""Local stand-in for OpenWeather and ip-api.com that replays recorded payloads.
+
+Serves the JSON files in benchmarks/fixtures/ for:
+
+    /data/2.5/weather                 -> weather.json
+    /data/2.5/forecast                -> forecast.json
+    /data/2.5/air_pollution/forecast  -> air_pollution_forecast.json
+    /json/                            -> ipapi.json
+
+with configurable latency and error injection. Point the app at it with
+
+    OPENWEATHER_URL=http://127.0.0.1:8765/data/2.5 IPAPI_URL=http://127.0.0.1:8765/json/
+
+Usage:
+    python benchmarks/replay_server.py [--port 8765] [--latency 0.08] [--jitter 0.02]
+                                       [--error-rate 0.05] [--error-status 503]
+    python benchmarks/replay_server.py --record --city Delhi   # refresh fixtures from the live API
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+ROUTES = {
+    "/data/2.5/weather": "weather.json",
+    "/data/2.5/forecast": "forecast.json",
+    "/data/2.5/air_pollution/forecast": "air_pollution_forecast.json",
+    "/json/": "ipapi.json",
+}
+
+
+def load_fixtures(directory=FIXTURES):
+    payloads = {}
+    for path, name in ROUTES.items():
+        with open(os.path.join(directory, name), "rb") as f:
+            payloads[path] = f.read()
+    return payloads
+
+
+def make_handler(payloads, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503, seed=None):
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    counters = {"requests": 0, "errors": 0}
+
+    class ReplayHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+        # Headers and body go out as separate writes: without TCP_NODELAY every
+        # response waits ~40 ms for the client's delayed ACK
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            path = urllib.parse.urlsplit(self.path).path
+            with lock:
+                counters["requests"] += 1
+                delay = max(0.0, latency + rng.uniform(-jitter, jitter))
+                fail = rng.random() < error_rate
+                if fail:
+                    counters["errors"] += 1
+            time.sleep(delay)
+
+            body = payloads.get(path)
+            if fail:
+                status, body = error_status, b'{"cod": %d, "message": "injected error"}' % error_status
+            elif body is None:
+                status, body = 404, b'{"cod": "404", "message": "city not found"}'
+            else:
+                status = 200
+
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            if status in (429, 503):
+                self.send_header("Retry-After", "0")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    ReplayHandler.counters = counters
+    return ReplayHandler
+
+
+def start_server(port=0, **options):
+    """Start the replay server on a background thread; returns (server, base URL)."""
+    handler = make_handler(load_fixtures(), **options)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="replay-server", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def record_fixtures(city, api_key, directory=FIXTURES):
+    """Overwrite the fixtures with live responses for ``city``."""
+    base = "https://api.openweathermap.org/data/2.5"
+
+    def fetch(url):
+        with urllib.request.urlopen(url, timeout=15) as r:
+            return json.load(r)
+
+    q = urllib.parse.urlencode({"q": city, "appid": api_key, "units": "metric"})
+    weather = fetch(f"{base}/weather?{q}")
+    coords = {"lat": weather["coord"]["lat"], "lon": weather["coord"]["lon"], "appid": api_key}
+    payloads = {
+        "weather.json": weather,
+        "forecast.json": fetch(f"{base}/forecast?{urllib.parse.urlencode(dict(coords, units='metric'))}"),
+        "air_pollution_forecast.json": fetch(f"{base}/air_pollution/forecast?{urllib.parse.urlencode(coords)}"),
+        "ipapi.json": fetch("http://ip-api.com/json/"),
+    }
+    for name, payload in payloads.items():
+        with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=1)
+    return list(payloads)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded OpenWeather / ip-api payloads")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="± seconds of random latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--record", action="store_true", help="re-record fixtures from the live API")
+    parser.add_argument("--city", default="Delhi", help="city to record")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        names = record_fixtures(args.city, os.environ["OPENWEATHER_API"])
+        print(f"Recorded {', '.join(names)} for {args.city}")
+        return
+
+    server, url = start_server(
+        args.port, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, error_status=args.error_status,
+    )
+    print(f"Replaying fixtures on {url}  (OPENWEATHER_URL={url}/data/2.5 IPAPI_URL={url}/json/)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
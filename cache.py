@@ -0,0 +1,194 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Seconds a cached response stays fresh, per OpenWeather endpoint
+DEFAULT_TTLS = {
+    "weather": 10 * 60,
+    "forecast": 60 * 60,
+    "air_pollution/forecast": 60 * 60,
+}
+DEFAULT_TTL = 10 * 60
+
+# Coordinates are rounded to 2 decimals (~1 km) so nearby lookups share an entry
+COORD_PRECISION = 2
+
+
+def make_key(endpoint, params):
+    """Normalise an endpoint + query params into a stable cache key."""
+    parts = []
+    for name in sorted(params):
+        value = params[name]
+        if name in ("lat", "lon"):
+            value = f"{round(float(value), COORD_PRECISION):.{COORD_PRECISION}f}"
+        elif isinstance(value, str):
+            value = " ".join(value.split()).lower()
+        parts.append(f"{name}={value}")
+    return f"{endpoint}?" + "&".join(parts)
+
+
+class SQLiteCacheBackend:
+    """On-disk cache shared by every worker process pointing at the same file.
+
+    Each entry keeps its ``prewarmed`` flag, so hits on entries stored by a
+    separate pre-warm worker are still recognised. Expired entries are
+    deleted when the file is opened and after every ``purge_every`` writes,
+    so the file does not grow without bound.
+    """
+
+    def __init__(self, path, purge_every=500):
+        self.path = path
+        self.purge_every = purge_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS response_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires REAL NOT NULL,
+                prewarmed INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        # Cache files created before the prewarmed column existed
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(response_cache)")}
+        if "prewarmed" not in columns:
+            self._conn.execute("ALTER TABLE response_cache ADD COLUMN prewarmed INTEGER NOT NULL DEFAULT 0")
+        self._conn.commit()
+        self.purge_expired()
+
+    def get(self, key):
+        """Return ``(value, expires, prewarmed)`` or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires, prewarmed FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1], bool(row[2])
+
+    def set(self, key, value, expires, prewarmed=False):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, expires, prewarmed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires, int(prewarmed)),
+            )
+            self._writes += 1
+            if self._writes >= self.purge_every:
+                self._writes = 0
+                self._purge()
+            self._conn.commit()
+
+    def _purge(self):
+        self._conn.execute("DELETE FROM response_cache WHERE expires < ?", (time.time(),))
+
+    def purge_expired(self):
+        with self._lock:
+            self._purge()
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache")
+            self._conn.commit()
+
+
+class ResponseCache:
+    """In-process LRU with per-endpoint TTLs and an optional shared backend.
+
+    Lookups check the LRU first, then the backend (if any); backend hits are
+    promoted into the LRU. ``stats`` counts hits, misses and LRU evictions,
+    and separately the hits on entries stored with ``prewarmed=True`` (by
+    this process or, through the backend, by a pre-warm worker).
+    """
+
+    def __init__(self, maxsize=512, ttls=None, backend=None):
+        self.maxsize = maxsize
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.backend = backend
+        self._entries = OrderedDict()  # key -> (value, expires, prewarmed)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "backend_hits": 0, "prewarmed_hits": 0}
+
+    def ttl_for(self, endpoint):
+        return self.ttls.get(endpoint, DEFAULT_TTL)
+
+    def get(self, endpoint, params):
+        key = make_key(endpoint, params)
+        entry, source = self._lookup(key)
+        with self._lock:
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            if source == "backend":
+                self.stats["backend_hits"] += 1
+            if entry[2]:
+                self.stats["prewarmed_hits"] += 1
+        return entry[0]
+
+    def peek(self, endpoint, params):
+        """Like get(), without counting the lookup in ``stats`` (for the pre-warmer)."""
+        entry, _ = self._lookup(make_key(endpoint, params))
+        return None if entry is None else entry[0]
+
+    def _lookup(self, key):
+        """Return ``(entry, "lru" | "backend")``, or ``(None, None)`` if nothing fresh is cached."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    return entry, "lru"
+                del self._entries[key]
+
+        if self.backend is not None:
+            entry = self.backend.get(key)
+            if entry is not None and entry[1] > now:
+                with self._lock:
+                    self._store(key, entry)
+                return entry, "backend"
+        return None, None
+
+    def set(self, endpoint, params, value, prewarmed=False):
+        key = make_key(endpoint, params)
+        expires = time.time() + self.ttl_for(endpoint)
+        with self._lock:
+            self._store(key, (value, expires, prewarmed))
+        if self.backend is not None:
+            self.backend.set(key, value, expires, prewarmed)
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.backend is not None:
+            self.backend.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def cache_from_env():
+    """Build the shared response cache from environment variables.
+
+    ``WEATHER_CACHE_SIZE`` sets the LRU size and ``WEATHER_CACHE_DB`` points
+    at a SQLite file used as the cross-process backend.
+    """
+    maxsize = int(os.getenv("WEATHER_CACHE_SIZE", "512"))
+    db_path = os.getenv("WEATHER_CACHE_DB")
+    backend = SQLiteCacheBackend(db_path) if db_path else None
+    return ResponseCache(maxsize=maxsize, backend=backend)
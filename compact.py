@@ -0,0 +1,186 @@
+"""Compact in-memory form of fetch_location results for long-lived caches.
+
+Daily forecast / pollution frames and forecast slots are kept as plain
+column arrays: float32 numbers, small integers, datetime64[s] dates and
+strings as integer codes into one shared, process-wide vocabulary. The
+current-weather dict becomes a ``__slots__`` record. ``to_frame()`` wraps
+the arrays in a DataFrame without copying them.
+"""
+import threading
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+
+class _Vocabulary:
+    """Strings seen so far (conditions, AQI labels), shared by every frame.
+
+    Frames keep the CategoricalDtype that was current when they were built;
+    the vocabulary only grows, so old codes stay valid.
+    """
+
+    def __init__(self):
+        self._words = {}
+        self._dtype = pd.CategoricalDtype([])
+        self._lock = threading.Lock()
+
+    def encode(self, values):
+        values = pd.Series(values, dtype="object")
+        with self._lock:
+            new = [v for v in values.dropna().unique() if v not in self._words]
+            if new:
+                for word in new:
+                    self._words[word] = len(self._words)
+                self._dtype = pd.CategoricalDtype(list(self._words))
+            dtype = self._dtype
+            codes = values.map(self._words).fillna(-1).to_numpy()
+        n = len(dtype.categories)
+        itemsize = np.int8 if n < 2 ** 7 else np.int16 if n < 2 ** 15 else np.int32
+        return codes.astype(itemsize), dtype
+
+
+vocabulary = _Vocabulary()
+
+
+def _compact_column(values):
+    """(array, categorical dtype or None) for one DataFrame column."""
+    if values.dtype == object:
+        first = values.dropna().iloc[0] if values.notna().any() else None
+        if isinstance(first, date):
+            return pd.to_datetime(values).to_numpy("datetime64[s]"), None
+        return vocabulary.encode(values)
+    if isinstance(values.dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(values):
+        return vocabulary.encode(values.astype("object"))
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.to_numpy("datetime64[s]"), None
+    if pd.api.types.is_float_dtype(values):
+        return values.to_numpy("float32"), None
+    if pd.api.types.is_integer_dtype(values):
+        return pd.to_numeric(values, downcast="integer").to_numpy(), None
+    return values.to_numpy(), None
+
+
+class CompactFrame:
+    """Column arrays of a small DataFrame; see the module docstring."""
+
+    __slots__ = ("_columns", "_dtypes")
+
+    def __init__(self, columns, dtypes=None):
+        self._columns = columns
+        self._dtypes = dtypes or {}
+
+    @classmethod
+    def from_frame(cls, df, drop=()):
+        columns, dtypes = {}, {}
+        for name in df.columns:
+            if name in drop:
+                continue
+            columns[name], dtype = _compact_column(df[name])
+            if dtype is not None:
+                dtypes[name] = dtype
+        return cls(columns, dtypes)
+
+    def __len__(self):
+        return len(next(iter(self._columns.values()), ()))
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    def __getitem__(self, name):
+        """One column as a NumPy array (categorical columns are decoded)."""
+        values = self._columns[name]
+        dtype = self._dtypes.get(name)
+        if dtype is None:
+            return values
+        return np.asarray(dtype.categories.to_numpy(dtype="object"))[values]
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in self._columns.values())
+
+    def to_frame(self):
+        """DataFrame view over the stored arrays (no data is copied, categorical codes included)."""
+        data = {}
+        for name, values in self._columns.items():
+            dtype = self._dtypes.get(name)
+            data[name] = values if dtype is None else pd.Categorical.from_codes(values, dtype=dtype)
+        return pd.DataFrame(data, copy=False)
+
+
+class WeatherRecord:
+    """The get_weather dict as a ``__slots__`` object with dict-style access.
+
+    Optional fields (``next_3h_*``) that are None behave as missing keys.
+    """
+
+    __slots__ = ("city", "temp", "weather", "lat", "lon", "dt", "next_3h_temp", "next_3h_condition")
+
+    def __init__(self, city, temp, weather, lat, lon, dt=None, next_3h_temp=None,
+                 next_3h_condition=None):
+        self.city = city
+        self.temp = temp
+        self.weather = weather
+        self.lat = lat
+        self.lon = lon
+        self.dt = dt
+        self.next_3h_temp = next_3h_temp
+        self.next_3h_condition = next_3h_condition
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{k: data[k] for k in cls.__slots__ if k in data})
+
+    def keys(self):
+        return [k for k in self.__slots__ if getattr(self, k) is not None]
+
+    def __contains__(self, key):
+        return key in self.__slots__ and getattr(self, key) is not None
+
+    def __getitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def to_dict(self):
+        return {k: getattr(self, k) for k in self.keys()}
+
+    def __repr__(self):
+        return f"WeatherRecord({self.to_dict()!r})"
+
+
+def compact_result(result):
+    """Compact copy of a fetch_location result for caching.
+
+    Keeps ``weather`` (WeatherRecord), ``daily`` and ``pollution``
+    (CompactFrame or None), ``slots`` (the 3-hourly forecast slots as a
+    CompactFrame, for tips), ``current_raw`` and ``timed_out``; the raw
+    forecast and pollution payloads are dropped.
+    """
+    from frames import forecast_slots
+
+    def frame(df):
+        return CompactFrame.from_frame(df) if df is not None else None
+
+    return {
+        "weather": WeatherRecord.from_dict(result["weather"]),
+        "daily": frame(result["daily"]),
+        "pollution": frame(result.get("pollution")),
+        "slots": (
+            CompactFrame.from_frame(forecast_slots(result["forecast_raw"]), drop=("location",))
+            if result["forecast_raw"] else None
+        ),
+        "current_raw": result["current_raw"],
+        "timed_out": result["timed_out"],
+    }
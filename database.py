@@ -1,96 +1,504 @@
 import streamlit as st
-import mysql.connector
-from mysql.connector import Error
-from datetime import datetime, time, timedelta
-import os
+from datetime import date as date_type, datetime, time, timedelta
+from contextlib import contextmanager
+import threading
 
-class WeatherDB:
-    def __init__(self, host=None, user=None, password=None, database=None):
+from storage import backend_from_env
+from tracing import traced
 
-        # Local-first configuration
-        host = host or os.getenv("DB_HOST", "localhost")
-        user = user or os.getenv("DB_USER", "root")
-        password = password or os.getenv("DB_PASSWORD", "")
-        database = database or os.getenv("DB_NAME", "weather_db")
+# Schemas already initialised in this process, keyed by backend settings
+_schema_ready = set()
+_schema_lock = threading.Lock()
 
-        self.conn = None
-        self.cursor = None
+# Composite indexes backing the history ordering and location filters
+HISTORY_INDEXES = {
+    "idx_history_date_time": "(date, record_time)",
+    "idx_history_location_date": "(location, date)",
+}
 
-        try:
-            self.conn = mysql.connector.connect(
-                host=host,
-                user=user,
-                password=password,
-                database=database,
-                port=3306
+# A history row is identified by where and when it was recorded
+HISTORY_KEY = ["location", "date", "record_time"]
+HISTORY_KEY_INDEX = "uq_history_key"
+HISTORY_VALUES = ["location", "weather", "air_quality", "record_time", "date"]
+
+# Keys looked up per query when upserting: 3 parameters each stays under
+# SQLite's default limit of 999 bound variables
+KEY_LOOKUP_BATCH = 300
+
+# Keeps the newest row of each key (tables created before the key was unique)
+DEDUPE_HISTORY = """
+    DELETE FROM history WHERE id NOT IN (
+        SELECT id FROM (SELECT MAX(id) AS id FROM history GROUP BY location, date, record_time) AS newest
+    )
+"""
+
+# history_daily counter columns; air quality outside "AQI 1".."AQI 5" counts as aqi_other
+AQI_COLUMNS = {f"AQI {n}": f"aqi_{n}" for n in range(1, 6)}
+ROLLUP_COUNTERS = ["searches", *AQI_COLUMNS.values(), "aqi_other"]
+
+
+def _datetime_value(value):
+    """History ``date`` as a datetime to the second (the precision of DATETIME)."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    elif not isinstance(value, datetime):
+        value = datetime.combine(value, time())
+    return value.replace(microsecond=0)
+
+
+def _time_value(value):
+    """History ``record_time`` as "HH:MM:SS" (MySQL returns TIME as a timedelta)."""
+    if isinstance(value, timedelta):
+        value = (datetime.min + value).time()
+    elif isinstance(value, str):
+        value = datetime.strptime(value, "%H:%M:%S" if value.count(":") == 2 else "%H:%M").time()
+    return value.strftime("%H:%M:%S")
+
+
+def _day(value):
+    """Calendar day of a history ``date`` value (datetime, date or ISO string)."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date_type):
+        return value
+    return date_type.fromisoformat(str(value)[:10])
+
+
+class RollupDelta:
+    """Changes to the daily rollups from adding (+1) or removing (-1) history rows."""
+
+    def __init__(self):
+        self.daily = {}
+        self.conditions = {}
+
+    def add(self, location, weather, air_quality, date, sign=1):
+        key = (location or "", _day(date))
+        counts = self.daily.get(key)
+        if counts is None:
+            counts = self.daily[key] = dict.fromkeys(ROLLUP_COUNTERS, 0)
+        counts["searches"] += sign
+        counts[AQI_COLUMNS.get(air_quality, "aqi_other")] += sign
+        condition = key + (weather or "",)
+        self.conditions[condition] = self.conditions.get(condition, 0) + sign
+
+    def apply(self, cursor, backend):
+        """Add the changes onto the rollup tables and drop rows that reach zero."""
+        daily = [(key, counts) for key, counts in self.daily.items() if any(counts.values())]
+        if daily:
+            cursor.executemany(
+                backend.increment_sql("history_daily", ["location", "day"], ROLLUP_COUNTERS),
+                [(*key, *(counts[c] for c in ROLLUP_COUNTERS)) for key, counts in daily],
+            )
+        conditions = [(*key, n) for key, n in self.conditions.items() if n]
+        if conditions:
+            cursor.executemany(
+                backend.increment_sql("history_daily_weather", ["location", "day", "weather"], ["searches"]),
+                conditions,
             )
-            self.cursor = self.conn.cursor(dictionary=True)
-            st.success("✅ Connected to local MySQL database")
 
-            self.create_table_if_not_exists()
+        emptied = [key for key, counts in daily if counts["searches"] < 0]
+        if emptied:
+            cursor.executemany(
+                "DELETE FROM history_daily WHERE location=%s AND day=%s AND searches <= 0", emptied
+            )
+        emptied = [condition for condition, n in self.conditions.items() if n < 0]
+        if emptied:
+            cursor.executemany(
+                "DELETE FROM history_daily_weather"
+                " WHERE location=%s AND day=%s AND weather=%s AND searches <= 0",
+                emptied,
+            )
 
-        except Error as e:
-            st.error(f"❌ Could not connect to MySQL: {e}")
 
-    def create_table_if_not_exists(self):
-        query = """
-        CREATE TABLE IF NOT EXISTS history (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            location VARCHAR(255),
-            weather VARCHAR(100),
-            air_quality VARCHAR(50),
-            record_time TIME,
-            date DATETIME
-        )
+class WeatherDB:
+    def __init__(self, host=None, user=None, password=None, database=None, pool_size=None,
+                 backend=None):
+        """Open the history store.
+
+        ``backend`` is a storage.MySQLBackend or storage.SQLiteBackend; by
+        default it is chosen by the ``DB_BACKEND`` environment variable.
         """
-        self.cursor.execute(query)
-        self.conn.commit()
+        self.backend = None
+        self._settings = (host, user, password, database, pool_size)
+        self._backend = backend
+        self._connect_lock = threading.Lock()
+
+        try:
+            self._connect()
+        except Exception as e:
+            # Not fatal: the next database call tries to connect again
+            st.error(f"❌ Could not connect to {self._label}: {e}")
+
+    @property
+    def _label(self):
+        backend = self.backend or self._backend
+        return backend.label if backend else "database"
+
+    def _connect(self):
+        """Open the backend and set up the schema (once per process)."""
+        with self._connect_lock:
+            if self.backend is not None:
+                return
+            backend = self._backend or backend_from_env(*self._settings)
+            self.backend = backend
+            try:
+                with _schema_lock:
+                    if backend.key not in _schema_ready:
+                        self.create_table_if_not_exists()
+                        _schema_ready.add(backend.key)
+                        st.success(f"✅ Connected to local {backend.label} database")
+            except Exception:
+                self.backend = None
+                raise
+
+    @contextmanager
+    def _cursor(self, commit=False, stream=False):
+        """Borrow a connection for one operation and return it afterwards.
+
+        ``stream`` uses an unbuffered cursor that fetches rows as they are read.
+        """
+        if self.backend is None:
+            self._connect()
+        with self.backend.connection() as conn:
+            cursor = self.backend.stream_cursor(conn) if stream else self.backend.cursor(conn)
+            try:
+                yield cursor
+                if commit:
+                    conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def create_table_if_not_exists(self):
+        with self._cursor(commit=True) as cursor:
+            cursor.execute(self.backend.history_ddl)
+            for name, columns in HISTORY_INDEXES.items():
+                self.backend.create_index(cursor, name, "history", columns)
+            key = f"({', '.join(HISTORY_KEY)})"
+            deduped = False
+            try:
+                self.backend.create_index(cursor, HISTORY_KEY_INDEX, "history", key, unique=True)
+            except self.backend.integrity_error:
+                cursor.execute(DEDUPE_HISTORY)
+                self.backend.create_index(cursor, HISTORY_KEY_INDEX, "history", key, unique=True)
+                deduped = True
+            for ddl in self.backend.rollup_ddl:
+                cursor.execute(ddl)
+
+            # Backfill rollups for history written before they existed
+            cursor.execute("SELECT 1 AS found FROM history_daily LIMIT 1")
+            missing = cursor.fetchone() is None
+            cursor.execute("SELECT 1 AS found FROM history LIMIT 1")
+            missing = missing and cursor.fetchone() is not None
+        if missing or deduped:
+            self.rebuild_rollups()
+
+    @staticmethod
+    def _record_values(location, weather, air_quality, record_time=None, date=None):
+        """Row for HISTORY_VALUES, with the date and time parsed and normalised."""
+        record_time = _time_value(record_time or datetime.now())
+        date = _datetime_value(date or datetime.now())
+        return (location, weather, air_quality, record_time, date)
+
+    @staticmethod
+    def _key(location, record_time, date):
+        return (location, _datetime_value(date), _time_value(record_time))
 
+    @traced("db.add_record")
     def add_record(self, location, weather, air_quality, record_time=None, date=None):
-        record_time = record_time or datetime.now().strftime("%H:%M:%S")
-        if isinstance(record_time, (datetime, time)):
-            record_time = record_time.strftime("%H:%M:%S")
+        """Insert one record; a record with the same (location, date, record_time) is kept instead."""
+        values = self._record_values(location, weather, air_quality, record_time, date)
+        delta = RollupDelta()
+        delta.add(location, weather, air_quality, values[4])
+        with self._cursor(commit=True) as cursor:
+            cursor.execute(self.backend.upsert_sql("history", HISTORY_KEY, HISTORY_VALUES, replace=False), values)
+            if cursor.rowcount > 0:
+                delta.apply(cursor, self.backend)
 
-        date = date or datetime.now()
+    @traced("db.add_records", size=int)
+    def add_records(self, records, chunk_size=500, upsert=False):
+        """Insert many records (dicts with add_record's arguments) in bulk.
 
-        query = """
-        INSERT INTO history (location, weather, air_quality, record_time, date)
-        VALUES (%s, %s, %s, %s, %s)
+        Rows are written ``chunk_size`` at a time with one multi-row INSERT
+        and one transaction per chunk. A row with the same (location, date,
+        record_time) as an existing one is skipped, or with ``upsert``
+        replaces it. Returns the number of rows written.
+        """
+        written = 0
+        chunk = []
+        for record in records:
+            chunk.append(self._record_values(**record))
+            if len(chunk) >= chunk_size:
+                written += self._write_chunk(chunk, upsert)
+                chunk = []
+        if chunk:
+            written += self._write_chunk(chunk, upsert)
+        return written
+
+    def _existing_rows(self, cursor, keys):
+        """Stored rows for (location, date, record_time) keys, by key."""
+        found = {}
+        for start in range(0, len(keys), KEY_LOOKUP_BATCH):
+            batch = keys[start:start + KEY_LOOKUP_BATCH]
+            cursor.execute(
+                "SELECT location, weather, air_quality, record_time, date FROM history"
+                f" WHERE ({', '.join(HISTORY_KEY)}) IN ({', '.join(['(%s, %s, %s)'] * len(batch))})",
+                [v for key in batch for v in key],
+            )
+            for row in cursor.fetchall():
+                found[self._key(row["location"], row["record_time"], row["date"])] = row
+        return found
+
+    def _write_chunk(self, rows, upsert):
+        # Within a chunk the last row of a key wins when upserting, the first otherwise
+        by_key = {}
+        for row in rows:
+            key = (row[0], row[4], row[3])
+            if upsert or key not in by_key:
+                by_key[key] = row
+
+        delta = RollupDelta()
+        with self._cursor(commit=True) as cursor:
+            existing = self._existing_rows(cursor, list(by_key))
+            if upsert:
+                for old in existing.values():
+                    delta.add(old["location"], old["weather"], old["air_quality"], old["date"], -1)
+                rows = list(by_key.values())
+            else:
+                rows = [row for key, row in by_key.items() if key not in existing]
+            if rows:
+                cursor.executemany(self.backend.upsert_sql("history", HISTORY_KEY, HISTORY_VALUES, upsert), rows)
+            for location, weather, air_quality, _, date in rows:
+                delta.add(location, weather, air_quality, date)
+            delta.apply(cursor, self.backend)
+        return len(rows)
+
+    @staticmethod
+    def _where(location=None, date_from=None, date_to=None, air_quality=None, after=None):
+        """Build the WHERE clause for history filters and a keyset cursor."""
+        clauses, params = [], []
+        if location:
+            clauses.append("location LIKE %s")
+            params.append(f"{location}%")
+        if date_from:
+            clauses.append("date >= %s")
+            params.append(date_from)
+        if date_to:
+            # inclusive end date
+            clauses.append("date < %s")
+            params.append(date_to + timedelta(days=1))
+        if air_quality:
+            clauses.append("air_quality = %s")
+            params.append(air_quality)
+        if after:
+            # keyset pagination: rows strictly after the last row of the previous page
+            clauses.append("(date, record_time, id) < (%s, %s, %s)")
+            params.extend(after)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return where, params
+
+    @traced("db.get_records", size=len)
+    def get_records(self, limit=None, after=None, location=None, date_from=None,
+                    date_to=None, air_quality=None):
+        """Return history rows, newest first.
+
+        ``location`` is a prefix match; ``date_from``/``date_to`` are inclusive
+        dates. Pass ``limit`` and the ``after`` cursor from get_page to page
+        through the table without OFFSET scans.
         """
-        self.cursor.execute(query, (location, weather, air_quality, record_time, date))
-        self.conn.commit()
+        where, params = self._where(location, date_from, date_to, air_quality, after)
+        query = f"SELECT * FROM history{where} ORDER BY date DESC, record_time DESC, id DESC"
+        if limit:
+            query += " LIMIT %s"
+            params.append(limit)
 
-    def get_records(self):
-        self.cursor.execute(
-            "SELECT * FROM history ORDER BY date DESC, record_time DESC"
-        )
-        rows = self.cursor.fetchall()
+        with self._cursor() as cursor:
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
 
         for r in rows:
-            if isinstance(r["record_time"], timedelta):
-                total_seconds = int(r["record_time"].total_seconds())
-                h = total_seconds // 3600
-                m = (total_seconds % 3600) // 60
-                s = total_seconds % 60
-                r["record_time"] = f"{h:02d}:{m:02d}:{s:02d}"
+            self._format_time(r)
+
+        return rows
+
+    @staticmethod
+    def _format_time(r):
+        # MySQL returns TIME columns as timedelta
+        if isinstance(r["record_time"], timedelta):
+            total_seconds = int(r["record_time"].total_seconds())
+            h = total_seconds // 3600
+            m = (total_seconds % 3600) // 60
+            s = total_seconds % 60
+            r["record_time"] = f"{h:02d}:{m:02d}:{s:02d}"
+
+    def iter_chunks(self, chunk_size=5000, location=None, date_from=None, date_to=None,
+                    air_quality=None):
+        """Yield history rows in lists of at most ``chunk_size``, in id order.
+
+        Rows are read with an unbuffered cursor and fetchmany(), so memory
+        stays constant however large the table is. The connection is held
+        until the generator is exhausted or closed.
+        """
+        where, params = self._where(location, date_from, date_to, air_quality)
+        with self._cursor(stream=True) as cursor:
+            cursor.execute(f"SELECT * FROM history{where} ORDER BY id", params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for r in rows:
+                    self._format_time(r)
+                yield rows
+
+    def iter_records(self, chunk_size=5000, **filters):
+        """Yield history rows one at a time (see iter_chunks)."""
+        for rows in self.iter_chunks(chunk_size, **filters):
+            yield from rows
+
+    @traced("db.get_page", size=lambda page: len(page[0]))
+    def get_page(self, limit=50, after=None, **filters):
+        """Return ``(rows, next_cursor)``; next_cursor is None on the last page."""
+        rows = self.get_records(limit=limit + 1, after=after, **filters)
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, (last["date"], last["record_time"], last["id"])
 
+    @traced("db.count")
+    def count(self, location=None, date_from=None, date_to=None, air_quality=None):
+        where, params = self._where(location, date_from, date_to, air_quality)
+        with self._cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) AS n FROM history{where}", params)
+            return cursor.fetchone()["n"]
+
+    @traced("db.top_locations", size=len)
+    def top_locations(self, limit=20, days=30):
+        """Most searched locations over the last ``days`` days, most frequent first."""
+        since = datetime.now().date() - timedelta(days=days)
+        with self._cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT location, SUM(searches) AS searches FROM history_daily
+                WHERE day >= %s AND location <> ''
+                GROUP BY location
+                ORDER BY searches DESC
+                LIMIT %s
+                """,
+                (since, limit),
+            )
+            return [dict(r, searches=int(r["searches"])) for r in cursor.fetchall()]
+
+    @staticmethod
+    def _rollup_where(location=None, date_from=None, date_to=None):
+        clauses, params = [], []
+        if location:
+            clauses.append("location LIKE %s")
+            params.append(f"{location}%")
+        if date_from:
+            clauses.append("day >= %s")
+            params.append(date_from)
+        if date_to:
+            clauses.append("day <= %s")
+            params.append(date_to)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return where, params
+
+    @traced("db.daily_rollups", size=len)
+    def daily_rollups(self, location=None, date_from=None, date_to=None):
+        """Per location and day: searches, AQI histogram and the most common condition.
+
+        Read from the rollup tables, so the cost depends on days x locations,
+        not on the number of history rows. Newest days first.
+        """
+        where, params = self._rollup_where(location, date_from, date_to)
+        with self._cursor() as cursor:
+            cursor.execute(
+                f"SELECT * FROM history_daily{where} ORDER BY day DESC, searches DESC, location",
+                params,
+            )
+            rows = cursor.fetchall()
+            cursor.execute(f"SELECT location, day, weather, searches FROM history_daily_weather{where}", params)
+            conditions = cursor.fetchall()
+
+        top = {}
+        for c in conditions:
+            key = (c["location"], _day(c["day"]))
+            best = top.get(key)
+            if best is None or (c["searches"], best[1]) > (best[0], c["weather"]):
+                top[key] = (c["searches"], c["weather"])
+
+        for r in rows:
+            r["day"] = _day(r["day"])
+            r["top_condition"] = top.get((r["location"], r["day"]), (0, None))[1]
         return rows
 
+    @traced("db.aqi_distribution", size=len)
+    def aqi_distribution(self, location=None, date_from=None, date_to=None):
+        """Searches and AQI histogram per location over a date range, busiest first."""
+        where, params = self._rollup_where(location, date_from, date_to)
+        sums = ", ".join(f"SUM({c}) AS {c}" for c in ROLLUP_COUNTERS)
+        with self._cursor() as cursor:
+            cursor.execute(
+                f"SELECT location, {sums} FROM history_daily{where}"
+                " GROUP BY location ORDER BY searches DESC, location",
+                params,
+            )
+            rows = cursor.fetchall()
+        # MySQL returns SUM() as Decimal
+        return [{k: v if k == "location" else int(v) for k, v in r.items()} for r in rows]
+
+    @traced("db.rebuild_rollups", size=int)
+    def rebuild_rollups(self, chunk_size=5000):
+        """Recompute the rollup tables from history; returns the number of (location, day) rows.
+
+        The history table is streamed, so memory depends only on the size of
+        the rollups. Run it while nothing else writes to the history.
+        """
+        delta = RollupDelta()
+        for rows in self.iter_chunks(chunk_size):
+            for r in rows:
+                delta.add(r["location"], r["weather"], r["air_quality"], r["date"])
+
+        with self._cursor(commit=True) as cursor:
+            cursor.execute("DELETE FROM history_daily")
+            cursor.execute("DELETE FROM history_daily_weather")
+            delta.apply(cursor, self.backend)
+        return len(delta.daily)
+
+    @traced("db.update_record")
     def update_record(self, record_id, location, weather, air_quality, record_time, date):
-        if isinstance(record_time, (datetime, time)):
-            record_time = record_time.strftime("%H:%M:%S")
+        record_time, date = _time_value(record_time), _datetime_value(date)
 
         query = """
         UPDATE history
         SET location=%s, weather=%s, air_quality=%s, record_time=%s, date=%s
         WHERE id=%s
         """
-        self.cursor.execute(
-            query,
-            (location, weather, air_quality, record_time, date, record_id)
-        )
-        self.conn.commit()
+        delta = RollupDelta()
+        with self._cursor(commit=True) as cursor:
+            cursor.execute("SELECT location, weather, air_quality, date FROM history WHERE id=%s", (record_id,))
+            old = cursor.fetchone()
+            if old is None:
+                return
+            cursor.execute(
+                query,
+                (location, weather, air_quality, record_time, date, record_id)
+            )
+            delta.add(old["location"], old["weather"], old["air_quality"], old["date"], -1)
+            delta.add(location, weather, air_quality, date)
+            delta.apply(cursor, self.backend)
 
+    @traced("db.delete_record")
     def delete_record(self, record_id):
-        self.cursor.execute("DELETE FROM history WHERE id=%s", (record_id,))
-        self.conn.commit()
+        delta = RollupDelta()
+        with self._cursor(commit=True) as cursor:
+            cursor.execute("SELECT location, weather, air_quality, date FROM history WHERE id=%s", (record_id,))
+            old = cursor.fetchone()
+            if old is None:
+                return
+            cursor.execute("DELETE FROM history WHERE id=%s", (record_id,))
+            delta.add(old["location"], old["weather"], old["air_quality"], old["date"], -1)
+            delta.apply(cursor, self.backend)
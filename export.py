@@ -0,0 +1,104 @@
+"""Streaming export of the history table to CSV or Parquet.
+
+Rows are pulled from WeatherDB.iter_chunks() and written chunk by chunk
+(one Parquet row group per chunk), so exports run in constant memory.
+"""
+import csv
+import os
+import tempfile
+from time import time
+
+from tracing import traced
+
+EXPORT_COLUMNS = ["id", "location", "weather", "air_quality", "record_time", "date"]
+FORMATS = ("csv", "parquet")
+
+# Exports prepared for download in the app; deleted once older than EXPORT_MAX_AGE seconds
+EXPORT_DIR = os.getenv("WEATHER_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "weather-exports"))
+EXPORT_MAX_AGE = 3600
+
+
+def _parquet_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("id", pa.int64()),
+        ("location", pa.string()),
+        ("weather", pa.string()),
+        ("air_quality", pa.string()),
+        ("record_time", pa.string()),
+        ("date", pa.timestamp("s")),
+    ])
+
+
+def write_csv(chunks, path):
+    """Write row chunks to a CSV file; returns the number of rows."""
+    written = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        for rows in chunks:
+            writer.writerows(rows)
+            written += len(rows)
+    return written
+
+
+def write_parquet(chunks, path):
+    """Write row chunks to a Parquet file, one row group per chunk; returns the number of rows."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema()
+    written = 0
+    with pq.ParquetWriter(path, schema, compression="snappy") as writer:
+        for rows in chunks:
+            columns = {name: [r.get(name) for r in rows] for name in EXPORT_COLUMNS}
+            columns["record_time"] = [None if t is None else str(t) for t in columns["record_time"]]
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            written += len(rows)
+    return written
+
+
+def export_format(path, fmt=None):
+    """The export format for ``path``: ``fmt`` if given, else from the extension."""
+    fmt = fmt or ("parquet" if os.path.splitext(path)[1].lower() == ".parquet" else "csv")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r} (expected one of {', '.join(FORMATS)})")
+    return fmt
+
+
+@traced("export", size=int)
+def export_history(db, path, fmt=None, chunk_size=5000, **filters):
+    """Stream history rows matching ``filters`` (see WeatherDB.get_records) to ``path``.
+
+    Returns the number of rows written.
+    """
+    writer = write_parquet if export_format(path, fmt) == "parquet" else write_csv
+    return writer(db.iter_chunks(chunk_size, **filters), path)
+
+
+def remove_export(path):
+    """Delete a prepared export; a file that is already gone is fine."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def export_path(fmt, max_age=EXPORT_MAX_AGE):
+    """A new file in EXPORT_DIR for a download, after deleting exports older than ``max_age``.
+
+    Sessions that never come back leave their files behind, so every new
+    export cleans up after them (in any process sharing the directory).
+    """
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    cutoff = time() - max_age
+    for entry in os.scandir(EXPORT_DIR):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                remove_export(entry.path)
+        except FileNotFoundError:
+            pass
+    fd, path = tempfile.mkstemp(prefix="weather-history-", suffix=f".{fmt}", dir=EXPORT_DIR)
+    os.close(fd)
+    return path
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+AQI_LABELS = {
+    1: "Good",
+    2: "Fair",
+    3: "Moderate",
+    4: "Poor",
+    5: "Very Poor",
+}
+
+POLLUTANTS = ["pm2_5", "pm10", "no2", "so2", "o3", "co"]
+
+
+def _by_location(payloads):
+    """Accept one slot list or a {location: slot list} mapping."""
+    if isinstance(payloads, dict):
+        return payloads
+    return {"": payloads}
+
+
+def forecast_slots(payloads):
+    """3-hourly /forecast slots as one columnar DataFrame.
+
+    Columns: location, datetime (UTC), temp, condition. The JSON is walked
+    once to pull out plain arrays and the timestamps are converted in a
+    single vectorized call.
+    """
+    payloads = _by_location(payloads)
+    locations, dts, temps, conditions = [], [], [], []
+    for location, slots in payloads.items():
+        locations.extend([location] * len(slots))
+        dts.extend([f["dt"] for f in slots])
+        temps.extend([f["main"]["temp"] for f in slots])
+        conditions.extend([f["weather"][0]["description"] for f in slots])
+
+    return pd.DataFrame(
+        {
+            "location": pd.Categorical(locations),
+            "datetime": pd.to_datetime(np.asarray(dts, dtype="int64"), unit="s"),
+            "temp": np.asarray(temps, dtype="float64"),
+            "condition": pd.Categorical(conditions),
+        }
+    )
+
+
+def daily_forecast(payloads):
+    """Daily mean temperature and most frequent condition per location.
+
+    All locations are aggregated in one groupby. Ties for the most frequent
+    condition go to the one seen first that day.
+    """
+    slots = forecast_slots(payloads)
+    slots["date"] = slots["datetime"].dt.normalize()
+    keys = ["location", "date"]
+
+    temps = slots.groupby(keys, observed=True, sort=True)["temp"].mean().reset_index()
+
+    counts = (
+        slots.groupby(keys + ["condition"], observed=True, sort=False)
+        .size()
+        .reset_index(name="n")
+    )
+    modal = (
+        counts.sort_values(keys + ["n"], ascending=[True, True, False], kind="stable")
+        .drop_duplicates(keys)[keys + ["condition"]]
+    )
+
+    daily = temps.merge(modal, on=keys, how="left")
+    daily["date"] = daily["date"].dt.date
+    daily["condition"] = daily["condition"].astype(str)
+    return daily
+
+
+def pollution_slots(payloads):
+    """/air_pollution/forecast slots as one columnar DataFrame."""
+    payloads = _by_location(payloads)
+    locations, dts, aqis = [], [], []
+    components = {name: [] for name in POLLUTANTS}
+    for location, slots in payloads.items():
+        locations.extend([location] * len(slots))
+        dts.extend([f["dt"] for f in slots])
+        aqis.extend([f["main"]["aqi"] for f in slots])
+        for name, values in components.items():
+            values.extend([f["components"][name] for f in slots])
+
+    df = pd.DataFrame(
+        {
+            "location": pd.Categorical(locations),
+            "datetime": pd.to_datetime(np.asarray(dts, dtype="int64"), unit="s"),
+            "aqi": np.asarray(aqis, dtype="int64"),
+        }
+    )
+    for name, values in components.items():
+        df[name] = np.asarray(values, dtype="float64")
+    return df
+
+
+def daily_pollution(payloads):
+    """Daily mean AQI and pollutant levels per location, with AQI labels."""
+    slots = pollution_slots(payloads)
+    slots["date"] = slots["datetime"].dt.normalize()
+    keys = ["location", "date"]
+
+    daily = (
+        slots.groupby(keys, observed=True, sort=True)[["aqi"] + POLLUTANTS]
+        .mean()
+        .reset_index()
+    )
+    daily["date"] = daily["date"].dt.date
+    daily["aqi"] = daily["aqi"].round().astype(int)
+    daily["aqi_label"] = daily["aqi"].map(AQI_LABELS)
+    return daily
+
+
+# Single-location helpers matching the get_forecast / get_air_pollution frames
+
+def forecast_frame(slots):
+    return daily_forecast(slots).drop(columns="location")
+
+
+def pollution_frame(slots):
+    return daily_pollution(slots).drop(columns="location")
@@ -0,0 +1,211 @@
+"""Local gazetteer of city names and Indian PIN codes for offline geocoding.
+
+The gazetteer is a compact binary file that is memory-mapped on load:
+
+    header   magic (8 bytes), entry count N (uint32), name blob size (uint32)
+    offsets  N + 1 uint32 offsets into the name blob
+    lat, lon N float32 each
+    kind     N uint8 (0 = city, 1 = PIN code)
+    names    UTF-8 "key\\x1fdisplay name" entries, sorted by normalised key
+
+Sorted keys make exact and prefix lookups a binary search (bisect) without
+loading the names into memory; fuzzy matching only scans the entries that
+share the query's first letter.
+
+Usage:
+    python geocode.py build places.csv gazetteer.bin   # CSV: name,lat,lon
+    python geocode.py lookup gazetteer.bin "bengaluru"
+"""
+import argparse
+import bisect
+import csv
+import difflib
+import mmap
+import os
+import struct
+import unicodedata
+
+MAGIC = b"WGAZ1\0\0\0"
+HEADER = struct.Struct("<8sII")
+KINDS = ("city", "pin")
+SEPARATOR = "\x1f"
+
+# Fuzzy matching compares against at most this many same-initial entries
+FUZZY_SCAN_LIMIT = 20000
+
+
+def normalise(text):
+    """Case-fold, strip accents and collapse whitespace."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.lower().split())
+
+
+def build_gazetteer(rows, path):
+    """Write a gazetteer file from ``(name, lat, lon)`` rows.
+
+    Names made only of digits are stored as PIN codes.
+    """
+    entries = sorted(
+        (normalise(name), name.strip(), float(lat), float(lon))
+        for name, lat, lon in rows
+        if name.strip()
+    )
+    names = [f"{key}{SEPARATOR}{display}".encode() for key, display, _, _ in entries]
+    offsets = [0]
+    for name in names:
+        offsets.append(offsets[-1] + len(name))
+
+    n = len(entries)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, n, offsets[-1]))
+        f.write(struct.pack(f"<{n + 1}I", *offsets))
+        f.write(struct.pack(f"<{n}f", *(e[2] for e in entries)))
+        f.write(struct.pack(f"<{n}f", *(e[3] for e in entries)))
+        f.write(bytes(1 if e[0].isdigit() else 0 for e in entries))
+        f.write(b"".join(names))
+    return n
+
+
+class _Keys:
+    """Lazy sequence view of the sorted keys, for bisect."""
+
+    def __init__(self, gazetteer):
+        self._g = gazetteer
+
+    def __len__(self):
+        return len(self._g)
+
+    def __getitem__(self, i):
+        return self._g._entry(i)[0]
+
+
+class Gazetteer:
+    """Memory-mapped gazetteer supporting exact, prefix and fuzzy lookups."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n, _ = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a gazetteer file")
+
+        view = memoryview(self._mm)
+        pos = HEADER.size
+        self._offsets = view[pos:pos + 4 * (n + 1)].cast("I")
+        pos += 4 * (n + 1)
+        self._lat = view[pos:pos + 4 * n].cast("f")
+        pos += 4 * n
+        self._lon = view[pos:pos + 4 * n].cast("f")
+        pos += 4 * n
+        self._kind = view[pos:pos + n]
+        self._names = pos + n
+        self._n = n
+        self._keys = _Keys(self)
+
+    def __len__(self):
+        return self._n
+
+    def _entry(self, i):
+        start = self._names + self._offsets[i]
+        end = self._names + self._offsets[i + 1]
+        return self._mm[start:end].decode().split(SEPARATOR, 1)
+
+    def _result(self, i):
+        key, display = self._entry(i)
+        return {
+            "name": display,
+            "lat": round(float(self._lat[i]), 4),
+            "lon": round(float(self._lon[i]), 4),
+            "kind": KINDS[self._kind[i]],
+        }
+
+    def _range(self, prefix):
+        lo = bisect.bisect_left(self._keys, prefix)
+        hi = bisect.bisect_left(self._keys, prefix + "\U0010ffff", lo)
+        return lo, hi
+
+    def lookup(self, text):
+        """Exact (normalised) match, or None."""
+        key = normalise(text)
+        i = bisect.bisect_left(self._keys, key)
+        if i < self._n and self._keys[i] == key:
+            return self._result(i)
+        return None
+
+    def prefix(self, text, limit=10):
+        """Entries whose name starts with ``text``, in key order."""
+        key = normalise(text)
+        if not key:
+            return []
+        lo, hi = self._range(key)
+        return [self._result(i) for i in range(lo, min(hi, lo + limit))]
+
+    def fuzzy(self, text, limit=5, cutoff=0.8):
+        """Closest names to ``text`` (typo-tolerant), best match first."""
+        key = normalise(text)
+        if not key:
+            return []
+        lo, hi = self._range(key[0])
+        hi = min(hi, lo + FUZZY_SCAN_LIMIT)
+        candidates = {}
+        for i in range(lo, hi):
+            candidates.setdefault(self._keys[i], i)
+        matches = difflib.get_close_matches(key, list(candidates), n=limit, cutoff=cutoff)
+        return [self._result(candidates[m]) for m in matches]
+
+    def resolve(self, text):
+        """Exact match, else the best fuzzy match, else None."""
+        found = self.lookup(text)
+        if found is None:
+            matches = self.fuzzy(text, limit=1)
+            found = matches[0] if matches else None
+        return found
+
+    def close(self):
+        for view in (self._offsets, self._lat, self._lon, self._kind):
+            view.release()
+        self._mm.close()
+
+
+_gazetteer = None
+
+
+def get_gazetteer():
+    """The gazetteer at $GAZETTEER_PATH (loaded once), or None if not configured."""
+    global _gazetteer
+    path = os.getenv("GAZETTEER_PATH")
+    if _gazetteer is None and path and os.path.exists(path):
+        _gazetteer = Gazetteer(path)
+    return _gazetteer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local gazetteer for city / PIN lookups")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="build a gazetteer from a name,lat,lon CSV")
+    build.add_argument("csv_path")
+    build.add_argument("out_path")
+
+    lookup = commands.add_parser("lookup", help="look up a name or prefix")
+    lookup.add_argument("path")
+    lookup.add_argument("text")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        with open(args.csv_path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            n = build_gazetteer(((r["name"], r["lat"], r["lon"]) for r in reader), args.out_path)
+        print(f"Wrote {n} entries to {args.out_path}")
+    else:
+        g = Gazetteer(args.path)
+        print("exact:", g.lookup(args.text))
+        print("prefix:", g.prefix(args.text))
+        print("fuzzy:", g.fuzzy(args.text))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import atexit
+import logging
+import queue
+import threading
+from time import monotonic
+
+import tracing
+
+log = logging.getLogger(__name__)
+
+
+class HistoryWriter:
+    """Write-behind queue for search-history records.
+
+    ``submit`` never blocks: records go onto a bounded queue that a
+    background thread drains into ``db.add_records`` once ``batch_size``
+    records are waiting or ``flush_interval`` seconds have passed. When the
+    queue is full the record is dropped and counted in ``stats["dropped"]``.
+    A failed batch is logged and retried once after ``retry_delay`` seconds;
+    if that fails too its records count as ``failed`` and ``last_failure``
+    holds ``(monotonic time, error)``. The stats are exported as the
+    ``weather_history_records`` counter (see tracing.openmetrics).
+    Pending records are flushed on ``close`` and at interpreter exit.
+    """
+
+    def __init__(self, db, maxsize=1000, batch_size=50, flush_interval=2.0, retry_delay=1.0):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_delay = retry_delay
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.stats = {"queued": 0, "written": 0, "dropped": 0, "retried": 0, "failed": 0}
+        self.last_failure = None
+        tracing.register_counters(
+            "history_records", "Search history records by outcome.", lambda: dict(self.stats), "outcome"
+        )
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, **record):
+        """Queue one record (add_record keyword arguments); False if dropped."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.stats["dropped"] += 1
+            log.warning("History queue full; dropped the record for %s", record.get("location"))
+            return False
+        self.stats["queued"] += 1
+        return True
+
+    @property
+    def pending(self):
+        return self.queue.qsize()
+
+    def _next_batch(self):
+        batch = []
+        deadline = monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = 0 if self._stop.is_set() else deadline - monotonic()
+            try:
+                if timeout <= 0:
+                    batch.append(self.queue.get_nowait())
+                else:
+                    batch.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not (self._stop.is_set() and self.queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch):
+        # One add_records chunk is one transaction, so a failed batch can be retried whole
+        try:
+            self.stats["written"] += self.db.add_records(batch, chunk_size=self.batch_size)
+            return
+        except Exception as e:
+            log.warning("Writing %d history records failed, retrying: %s", len(batch), e)
+            self.stats["retried"] += len(batch)
+        self._stop.wait(self.retry_delay)
+        try:
+            self.stats["written"] += self.db.add_records(batch, chunk_size=self.batch_size)
+        except Exception as e:
+            log.exception("Dropping %d history records after a failed retry", len(batch))
+            self.stats["failed"] += len(batch)
+            self.last_failure = (monotonic(), f"{type(e).__name__}: {e}")
+
+    def close(self, timeout=10):
+        """Flush queued records and stop the background thread."""
+        self._stop.set()
+        self._thread.join(timeout)
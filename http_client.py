@@ -0,0 +1,144 @@
+import bisect
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (cumulative counts, like Prometheus)."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def snapshot(self):
+        cumulative = []
+        running = 0
+        for bound, n in zip(self.buckets, self.counts):
+            running += n
+            cumulative.append((bound, running))
+        return {"buckets": cumulative, "count": self.count, "sum": self.total}
+
+
+def _retry_after_seconds(response):
+    """Parse a Retry-After header (delta-seconds or HTTP date), if present."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpClient:
+    """Pooled keep-alive session with timeouts and retry/backoff.
+
+    429 and 5xx responses (and connection errors) are retried up to
+    ``retries`` times with exponential backoff and full jitter, waiting for
+    ``Retry-After`` when the server sends one. A ``Retry-After`` longer than
+    ``max_backoff`` is not waited out: the response is returned as is.
+    Request latency is recorded per endpoint label in ``histograms``.
+    """
+
+    def __init__(self, pool_size=20, connect_timeout=3.05, read_timeout=10,
+                 retries=3, backoff=0.5, max_backoff=8.0):
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _observe(self, endpoint, seconds):
+        with self._lock:
+            histogram = self.histograms.get(endpoint)
+            if histogram is None:
+                histogram = self.histograms[endpoint] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    def _backoff_delay(self, attempt, response=None):
+        """Seconds to wait before the next attempt, or None to stop retrying."""
+        if response is not None:
+            retry_after = _retry_after_seconds(response)
+            if retry_after is not None:
+                # never retry earlier than the server allows
+                return retry_after if retry_after <= self.max_backoff else None
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def get(self, url, params=None, endpoint=None, timeout=None, retries=None):
+        """GET ``url`` with retries; raises requests.RequestException when exhausted."""
+        endpoint = endpoint or url
+        retries = self.retries if retries is None else retries
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=timeout or self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                self._observe(endpoint, time.perf_counter() - started)
+                if attempt >= retries:
+                    raise
+                time.sleep(self._backoff_delay(attempt))
+            else:
+                self._observe(endpoint, time.perf_counter() - started)
+                if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                    return response
+                delay = self._backoff_delay(attempt, response)
+                if delay is None:
+                    return response
+                time.sleep(delay)
+            attempt += 1
+
+    def latency_snapshot(self):
+        with self._lock:
+            return {name: h.snapshot() for name, h in self.histograms.items()}
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` tokens per second, up to ``capacity``."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """Block until ``tokens`` are available, then take them."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
@@ -0,0 +1,88 @@
+"""Command-line maintenance tasks for the weather history database.
+
+Usage:
+    python manage.py import history.csv [--upsert] [--chunk-size 1000]
+    python manage.py import history.parquet
+    python manage.py export history.parquet [--location Delhi] [--from 2024-01-01] [--to 2024-12-31]
+    python manage.py export history.csv --chunk-size 20000
+    python manage.py rebuild-rollups
+"""
+import argparse
+from datetime import date
+
+import pandas as pd
+
+from database import WeatherDB
+from export import FORMATS, export_history
+
+HISTORY_COLUMNS = ["location", "weather", "air_quality", "record_time", "date"]
+
+
+def _frame_records(df):
+    df = df[[c for c in HISTORY_COLUMNS if c in df.columns]]
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def read_history_file(path, chunk_size):
+    """Yield lists of history records from a CSV or Parquet file, chunk by chunk."""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield _frame_records(batch.to_pandas())
+    else:
+        for df in pd.read_csv(path, chunksize=chunk_size):
+            yield _frame_records(df)
+
+
+def import_history(db, path, chunk_size=1000, upsert=False):
+    written = 0
+    for records in read_history_file(path, chunk_size):
+        written += db.add_records(records, chunk_size=chunk_size, upsert=upsert)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Weather history maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    imp = commands.add_parser("import", help="bulk-load history rows from CSV/Parquet")
+    imp.add_argument("path", help=".csv or .parquet file with columns " + ", ".join(HISTORY_COLUMNS))
+    imp.add_argument("--chunk-size", type=int, default=1000, help="rows per INSERT/transaction")
+    imp.add_argument("--upsert", action="store_true",
+                     help="replace rows with the same location, date and record_time")
+
+    exp = commands.add_parser("export", help="stream history rows to CSV/Parquet in constant memory")
+    exp.add_argument("path", help="output .csv or .parquet file")
+    exp.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    exp.add_argument("--chunk-size", type=int, default=5000,
+                     help="rows per fetch (and per Parquet row group)")
+    exp.add_argument("--location", help="location prefix filter")
+    exp.add_argument("--from", dest="date_from", type=date.fromisoformat, help="first date (YYYY-MM-DD)")
+    exp.add_argument("--to", dest="date_to", type=date.fromisoformat, help="last date (YYYY-MM-DD)")
+    exp.add_argument("--air-quality", help='exact air quality, e.g. "AQI 3"')
+
+    rebuild = commands.add_parser("rebuild-rollups",
+                                  help="recompute the daily analytics rollups from history")
+    rebuild.add_argument("--chunk-size", type=int, default=5000, help="history rows per fetch")
+
+    args = parser.parse_args(argv)
+    db = WeatherDB()
+
+    if args.command == "import":
+        written = import_history(db, args.path, args.chunk_size, args.upsert)
+        print(f"Imported {written} rows from {args.path}")
+    elif args.command == "export":
+        written = export_history(
+            db, args.path, args.format, args.chunk_size,
+            location=args.location, date_from=args.date_from, date_to=args.date_to,
+            air_quality=args.air_quality,
+        )
+        print(f"Exported {written} rows to {args.path}")
+    elif args.command == "rebuild-rollups":
+        days = db.rebuild_rollups(args.chunk_size)
+        print(f"Rebuilt rollups: {days} location-days")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Local time-series store of every fetched weather and air-pollution observation.
+
+Observations live in an append-only SQLite file with typed columns, clustered
+by (location, timestamp) so range queries are index scans. Forecast slots for
+a time that is fetched again are replaced by the newer forecast.
+
+Enable it with ``OBSERVATIONS_DB=/path/to/observations.db``.
+"""
+import os
+import sqlite3
+import threading
+
+POLLUTANTS = ["pm2_5", "pm10", "no2", "so2", "o3", "co"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS weather_obs (
+    location TEXT NOT NULL,
+    ts INTEGER NOT NULL,          -- unix seconds (UTC)
+    source TEXT NOT NULL,         -- 'current' or 'forecast'
+    temp REAL,
+    humidity REAL,
+    wind_speed REAL,
+    condition TEXT,
+    PRIMARY KEY (location, ts, source)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS air_obs (
+    location TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    aqi INTEGER,
+    pm2_5 REAL,
+    pm10 REAL,
+    no2 REAL,
+    so2 REAL,
+    o3 REAL,
+    co REAL,
+    PRIMARY KEY (location, ts)
+) WITHOUT ROWID;
+"""
+
+TABLES = {"weather": "weather_obs", "air": "air_obs"}
+
+
+def _epoch(value):
+    """Accept unix seconds, datetime/date or an ISO string."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    import pandas as pd
+
+    return int(pd.Timestamp(value).timestamp())
+
+
+class ObservationStore:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def record(self, location, result):
+        """Append the observations in a weather.fetch_location result."""
+        current = result.get("current_raw")
+        weather_rows = []
+        if current is not None:
+            weather_rows.append((
+                location, current["dt"], "current", current["main"]["temp"],
+                current["main"].get("humidity"), current.get("wind", {}).get("speed"),
+                current["weather"][0]["description"],
+            ))
+        weather_rows.extend(
+            (
+                location, f["dt"], "forecast", f["main"]["temp"], f["main"].get("humidity"),
+                f.get("wind", {}).get("speed"), f["weather"][0]["description"],
+            )
+            for f in result.get("forecast_raw") or []
+        )
+        air_rows = [
+            (location, f["dt"], f["main"]["aqi"], *(f["components"].get(p) for p in POLLUTANTS))
+            for f in result.get("pollution_raw") or []
+        ]
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO weather_obs VALUES (?, ?, ?, ?, ?, ?, ?)", weather_rows
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO air_obs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", air_rows
+            )
+        return len(weather_rows) + len(air_rows)
+
+    def query(self, kind, location, start=None, end=None, source=None):
+        """Observations for one location as a DataFrame indexed by UTC time.
+
+        ``kind`` is "weather" or "air"; ``start``/``end`` bound the time range
+        (inclusive / exclusive) and ``source`` filters weather rows by
+        'current' or 'forecast'.
+        """
+        import pandas as pd
+
+        clauses, params = ["location = ?"], [location]
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(_epoch(start))
+        if end is not None:
+            clauses.append("ts < ?")
+            params.append(_epoch(end))
+        if source is not None and kind == "weather":
+            clauses.append("source = ?")
+            params.append(source)
+        sql = f"SELECT * FROM {TABLES[kind]} WHERE {' AND '.join(clauses)} ORDER BY ts"
+
+        with self._lock:
+            df = pd.read_sql_query(sql, self._conn, params=params)
+        df.index = pd.to_datetime(df.pop("ts"), unit="s")
+        df.index.name = "datetime"
+        return df.drop(columns="location")
+
+    def resample(self, kind, location, freq="1D", start=None, end=None, how="mean", source=None):
+        """Numeric columns aggregated into ``freq`` buckets (pandas offset alias)."""
+        df = self.query(kind, location, start, end, source)
+        return df.select_dtypes("number").resample(freq).agg(how)
+
+    def locations(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT location FROM weather_obs ORDER BY location"
+            ).fetchall()
+        return [r[0] for r in rows]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_observation_store():
+    """The store at $OBSERVATIONS_DB (opened once), or None if not configured."""
+    global _store
+    path = os.getenv("OBSERVATIONS_DB")
+    if _store is None and path:
+        with _store_lock:
+            if _store is None:
+                _store = ObservationStore(path)
+    return _store
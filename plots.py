@@ -0,0 +1,98 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import pandas as pd
+from matplotlib.figure import Figure
+
+from tracing import span
+
+# Figures are built with the object-oriented API only: nothing is registered
+# with pyplot's global figure manager, so figures are freed once unreferenced.
+
+RENDER_CACHE_SIZE = 64
+
+_render_cache = OrderedDict()
+_render_lock = threading.Lock()
+render_stats = {"hits": 0, "misses": 0}
+
+
+def plot_weather(forecast_df):
+    fig = Figure(tight_layout=True)
+    ax = fig.subplots()
+    ax.plot(forecast_df["date"], forecast_df["temp"], marker="o")
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Temperature (°C)")
+    ax.set_title("6-Day Weather Forecast")
+    ax.tick_params(axis="x", labelrotation=45)
+    return fig
+
+
+def plot_pollution(pollution_df):
+    fig = Figure(tight_layout=True)
+    ax = fig.subplots()
+
+    # Plot AQI values (1-5)
+    ax.plot(
+        pollution_df["date"],
+        pollution_df["aqi"],
+        marker="o",
+        color="purple",
+        label="AQI",
+    )
+
+    # Annotate with AQI labels (Good, Fair, etc.)
+    for date, aqi, label in zip(pollution_df["date"], pollution_df["aqi"], pollution_df["aqi_label"]):
+        ax.text(date, aqi + 0.1, label, ha="center", fontsize=8)
+
+    ax.set_xlabel("Date")
+    ax.set_ylabel("AQI (1=Good, 5=Very Poor)")
+    ax.set_title("Air Quality Index Forecast (5 Days)")
+    ax.set_ylim(0, 6)
+    ax.legend()
+    ax.tick_params(axis="x", labelrotation=45)
+    return fig
+
+
+def frame_digest(df):
+    """Content hash of a DataFrame (values, index and column names)."""
+    h = hashlib.sha1(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    h.update(repr(list(df.columns)).encode())
+    return h.hexdigest()
+
+
+def _render(plot, df, fmt):
+    with span(f"render.{plot.__name__}") as s:
+        key = (plot.__name__, fmt, frame_digest(df))
+        with _render_lock:
+            image = _render_cache.get(key)
+            if image is not None:
+                _render_cache.move_to_end(key)
+                render_stats["hits"] += 1
+                s.cache, s.size = "hit", len(image)
+                return image
+            render_stats["misses"] += 1
+
+        fig = plot(df)
+        buffer = BytesIO()
+        fig.savefig(buffer, format=fmt)
+        fig.clear()
+        image = buffer.getvalue()
+        s.cache, s.size = "miss", len(image)
+
+    with _render_lock:
+        _render_cache[key] = image
+        while len(_render_cache) > RENDER_CACHE_SIZE:
+            _render_cache.popitem(last=False)
+    return image
+
+
+def render_weather(forecast_df, fmt="png"):
+    """Forecast chart as PNG/SVG bytes, cached by the frame's content."""
+    return _render(plot_weather, forecast_df, fmt)
+
+
+def render_pollution(pollution_df, fmt="png"):
+    """AQI chart as PNG/SVG bytes, cached by the frame's content."""
+    return _render(plot_pollution, pollution_df, fmt)
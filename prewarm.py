@@ -0,0 +1,147 @@
+"""Pre-warm the response cache for the most searched locations.
+
+Reads the top-N locations from the search history and periodically
+re-fetches their current weather (the forecast and air pollution, cached
+for an hour, only once they expire) so that the first search of the day
+for a popular city is served from cache. Requests are spread out by a
+token bucket to stay under the OpenWeather rate limit.
+
+Run it as a separate worker (set WEATHER_CACHE_DB so the Streamlit workers
+share the warmed cache):
+
+    python prewarm.py --top 20 --rate 30
+    python prewarm.py --once
+
+Rounds start every 0.8 x the shortest response TTL (8 minutes with the
+default 10-minute /weather TTL), so every entry is refreshed before it
+expires.
+
+or in-process with Prewarmer(db).start().
+
+Hits on pre-warmed entries are counted by the process that serves them:
+see ``prewarmed_hits`` in the app's response cache counters.
+"""
+import argparse
+import logging
+import threading
+from time import monotonic, perf_counter
+
+from database import WeatherDB
+from http_client import TokenBucket
+from weather import fetch_location, response_cache
+
+log = logging.getLogger(__name__)
+
+# Most upstream calls one location refresh makes (weather, forecast, air pollution)
+CALLS_PER_LOCATION = 3
+
+
+def default_interval():
+    """Seconds between refresh rounds: 0.8 x the shortest response cache TTL."""
+    return 0.8 * min(response_cache.ttls.values())
+
+
+class Prewarmer:
+    """Refreshes the cache for the ``top_n`` most searched locations every ``interval`` seconds."""
+
+    def __init__(self, db, top_n=20, interval=None, rate_per_minute=30, days=30):
+        self.db = db
+        self.top_n = top_n
+        self.interval = interval or default_interval()
+        self.days = days
+        # capacity of one location keeps refreshes evenly staggered
+        self.bucket = TokenBucket(rate_per_minute / 60, capacity=CALLS_PER_LOCATION)
+        self.stats = {"runs": 0, "refreshed": 0, "failed": 0, "upstream_seconds": 0.0}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh_once(self):
+        """Refresh every top location once; returns the number refreshed."""
+        refreshed = 0
+        for row in self.db.top_locations(self.top_n, self.days):
+            if self._stop.is_set():
+                break
+            self.bucket.acquire(CALLS_PER_LOCATION)
+            started = perf_counter()
+            result = fetch_location(city=row["location"], include_pollution=True,
+                                    aggregate=False, refresh=True)
+            self.stats["upstream_seconds"] += perf_counter() - started
+            if result is None:
+                self.stats["failed"] += 1
+            else:
+                refreshed += 1
+        self.stats["refreshed"] += refreshed
+        self.stats["runs"] += 1
+        return refreshed
+
+    def metrics(self):
+        """Cache hit rates and the upstream latency pre-warmed hits avoided (estimated).
+
+        Lookups are counted by the process that makes them (the pre-warmer's
+        own lookups are not), so run as a separate worker this reports the
+        refresh counts and latency only; the hits show up in the app's
+        response cache counters.
+        """
+        cache = response_cache.stats
+        lookups = cache["hits"] + cache["misses"]
+        fetched = self.stats["refreshed"] + self.stats["failed"]
+        per_refresh = self.stats["upstream_seconds"] / fetched if fetched else 0.0
+        return {
+            **self.stats,
+            "cache_hits": cache["hits"],
+            "cache_misses": cache["misses"],
+            "prewarmed_hits": cache["prewarmed_hits"],
+            "hit_rate": cache["hits"] / lookups if lookups else 0.0,
+            "prewarmed_hit_rate": cache["prewarmed_hits"] / lookups if lookups else 0.0,
+            "avg_refresh_seconds": per_refresh,
+            "estimated_seconds_saved": cache["prewarmed_hits"] * per_refresh,
+        }
+
+    def run_forever(self):
+        """Refresh every ``interval`` seconds until stop(); a failed round is logged and retried next round."""
+        while not self._stop.is_set():
+            started = monotonic()
+            try:
+                refreshed = self.refresh_once()
+                log.info("Pre-warmed %d locations: %s", refreshed, self.metrics())
+            except Exception:
+                self.stats["failed"] += 1
+                log.exception("Pre-warm round failed")
+            self._stop.wait(max(0, self.interval - (monotonic() - started)))
+
+    def start(self):
+        """Run in a daemon thread (e.g. inside the Streamlit process)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run_forever, name="prewarm", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-warm the weather cache for popular locations")
+    parser.add_argument("--top", type=int, default=20, help="number of locations to keep warm")
+    parser.add_argument("--days", type=int, default=30, help="history window for popularity")
+    parser.add_argument("--interval", type=int, default=None,
+                        help="seconds between refresh rounds (default: 0.8 x the shortest cache TTL)")
+    parser.add_argument("--rate", type=int, default=30, help="max upstream calls per minute")
+    parser.add_argument("--once", action="store_true", help="refresh once and exit")
+    args = parser.parse_args(argv)
+
+    prewarmer = Prewarmer(WeatherDB(), args.top, args.interval, args.rate, args.days)
+    if args.once:
+        prewarmer.refresh_once()
+        print(prewarmer.metrics())
+        return
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    try:
+        prewarmer.run_forever()
+    except KeyboardInterrupt:
+        prewarmer.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from io import BytesIO
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from tracing import span
+
+# Styles are built once per process instead of on every report
+styles = getSampleStyleSheet()
+
+TITLE_STYLE = ParagraphStyle(
+    "TitleStyle",
+    parent=styles["Title"],
+    alignment=1,
+    textColor=colors.HexColor("#004080")
+)
+SECTION_STYLE = ParagraphStyle(
+    "SectionStyle",
+    parent=styles["Heading2"],
+    textColor=colors.HexColor("#006699")
+)
+
+
+def _table_style(header_color, alternate_row_color):
+    return TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor(header_color)),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.whitesmoke, alternate_row_color]),
+        ("FONTSIZE", (0, 0), (-1, -1), 9),
+        ("PADDING", (0, 0), (-1, -1), 6),
+    ])
+
+
+FORECAST_TABLE_STYLE = _table_style("#CCE5FF", colors.lightgrey)
+POLLUTION_TABLE_STYLE = _table_style("#FFDDCC", colors.lavender)
+
+# Rendered PDFs, keyed by (location, observation time), bounded by total size
+REPORT_CACHE_BYTES = 32 * 1024 * 1024
+
+_report_cache = OrderedDict()
+_report_cache_size = 0
+_report_lock = threading.Lock()
+
+
+def _cell(v):
+    if isinstance(v, float):
+        return f"{v:.2f}"
+    if isinstance(v, datetime):  # datetime64 date columns of compact frames
+        return v.strftime("%Y-%m-%d")
+    return v
+
+
+def _frame_table(df, style):
+    data = [df.columns.tolist()] + [[_cell(v) for v in row] for row in df.values.tolist()]
+    table = Table(data, hAlign="LEFT")
+    table.setStyle(style)
+    return table
+
+
+def generate_report(city, weather, forecast, pollution):
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+
+    story = []
+
+    story.append(Paragraph(f"🌍 Weather Report for {city}", TITLE_STYLE))
+    story.append(Spacer(1, 20))
+
+    story.append(Paragraph("🌤 Current Weather", SECTION_STYLE))
+    story.append(Spacer(1, 8))
+    story.append(Paragraph(f"<b>Temperature:</b> {weather['temp']:.2f} °C", styles["Normal"]))
+    story.append(Paragraph(f"<b>Condition:</b> {weather['weather']}", styles["Normal"]))
+    story.append(Paragraph(f"<b>Coordinates:</b> {weather['lat']:.2f}, {weather['lon']:.2f}", styles["Normal"]))
+    story.append(Spacer(1, 16))
+
+    if forecast is not None:
+        story.append(Paragraph("📊 5-Day Forecast", SECTION_STYLE))
+        story.append(Spacer(1, 8))
+        story.append(_frame_table(forecast, FORECAST_TABLE_STYLE))
+        story.append(Spacer(1, 16))
+
+    if pollution is not None:
+        story.append(Paragraph("💨 Air Pollution Forecast (5 Days)", SECTION_STYLE))
+        story.append(Spacer(1, 8))
+        story.append(_frame_table(pollution, POLLUTION_TABLE_STYLE))
+        story.append(Spacer(1, 16))
+
+    doc.build(story)
+    buffer.seek(0)
+    return buffer
+
+
+def report_bytes(city, weather, forecast, pollution):
+    """PDF bytes for a report, cached by location and observation time.
+
+    The least recently used reports are evicted once the cache holds more
+    than REPORT_CACHE_BYTES.
+    """
+    global _report_cache_size
+
+    key = (city, weather.get("dt"))
+    with span("report") as s:
+        with _report_lock:
+            pdf = _report_cache.get(key)
+            if pdf is not None:
+                _report_cache.move_to_end(key)
+                s.cache, s.size = "hit", len(pdf)
+                return pdf
+
+        pdf = generate_report(city, weather, forecast, pollution).getvalue()
+        s.cache, s.size = "miss", len(pdf)
+
+    with _report_lock:
+        if key not in _report_cache:
+            _report_cache[key] = pdf
+            _report_cache_size += len(pdf)
+        while _report_cache_size > REPORT_CACHE_BYTES and len(_report_cache) > 1:
+            _, evicted = _report_cache.popitem(last=False)
+            _report_cache_size -= len(evicted)
+    return pdf
+
+
+def _write_report(job):
+    path, city, weather, forecast, pollution = job
+    with open(path, "wb") as f:
+        f.write(generate_report(city, weather, forecast, pollution).getvalue())
+    return path
+
+
+def write_reports(jobs, out_dir, max_workers=None):
+    """Write one PDF per ``(city, weather, forecast, pollution)`` job in a process pool.
+
+    Returns the written file paths.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    tasks = [
+        (os.path.join(out_dir, f"{city}_weather_report.pdf".replace("/", "_")), city, weather, forecast, pollution)
+        for city, weather, forecast, pollution in jobs
+    ]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_write_report, tasks))
@@ -0,0 +1,101 @@
+"""In-memory spatial index of recently fetched observations.
+
+Entries are bucketed into a fixed lat/lon grid; a radius query scans only
+the cells that can contain a point within the radius and ranks candidates
+by great-circle (haversine) distance. Old entries expire by age and the
+index is bounded in size.
+"""
+import math
+import threading
+from collections import OrderedDict
+from time import time
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class SpatialIndex:
+    """Latest value per point, searchable by distance and age.
+
+    ``cell_deg`` is the grid cell size in degrees (0.05 is about 5.5 km of
+    latitude). Points are de-duplicated at ~10 m (4 decimal places); the
+    oldest points are dropped beyond ``maxsize`` and points older than
+    ``ttl`` seconds are dropped when a query comes across them.
+    """
+
+    def __init__(self, cell_deg=0.05, maxsize=10000, ttl=3600):
+        self.cell_deg = cell_deg
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._points = OrderedDict()  # (lat, lon) -> (fetched_at, value), oldest first
+        self._cells = {}              # (row, col) -> set of points
+        self._lock = threading.Lock()
+
+    def _cell(self, lat, lon):
+        return math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+
+    def _remove(self, point):
+        self._points.pop(point)
+        cell = self._cell(*point)
+        members = self._cells[cell]
+        members.discard(point)
+        if not members:
+            del self._cells[cell]
+
+    def add(self, lat, lon, value, fetched_at=None):
+        point = (round(lat, 4), round(lon, 4))
+        with self._lock:
+            if point in self._points:
+                self._remove(point)
+            self._points[point] = (fetched_at or time(), value)
+            self._cells.setdefault(self._cell(*point), set()).add(point)
+            while len(self._points) > self.maxsize:
+                self._remove(next(iter(self._points)))
+
+    def nearest(self, lat, lon, radius_km, max_age=None, accept=None):
+        """Closest value within ``radius_km`` fetched at most ``max_age`` seconds ago.
+
+        Returns ``(value, distance_km, age_seconds, (lat, lon))`` or None.
+        ``accept(value)`` can reject candidates (e.g. ones missing a field).
+        """
+        now = time()
+        lat_span = radius_km / KM_PER_DEGREE
+        # longitude degrees shrink towards the poles
+        cos_lat = max(math.cos(math.radians(min(89.9, abs(lat) + lat_span))), 1e-6)
+        lon_span = min(180.0, radius_km / (KM_PER_DEGREE * cos_lat))
+        row0, col0 = self._cell(lat - lat_span, lon - lon_span)
+        row1, col1 = self._cell(lat + lat_span, lon + lon_span)
+
+        best = None
+        with self._lock:
+            expired = []
+            for row in range(row0, row1 + 1):
+                for col in range(col0, col1 + 1):
+                    for point in self._cells.get((row, col), ()):
+                        fetched_at, value = self._points[point]
+                        age = now - fetched_at
+                        if age > self.ttl:
+                            expired.append(point)
+                            continue
+                        if max_age is not None and age > max_age:
+                            continue
+                        distance = haversine_km(lat, lon, *point)
+                        if distance > radius_km or (best and distance >= best[1]):
+                            continue
+                        if accept is None or accept(value):
+                            best = (value, distance, age, point)
+            for point in expired:
+                self._remove(point)
+        return best
+
+    def __len__(self):
+        return len(self._points)
@@ -0,0 +1,290 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, time
+from time import monotonic, sleep
+
+# Connection pools are shared by every backend in the process, keyed by settings
+_pools = {}
+_pool_lock = threading.Lock()
+
+HISTORY_COLUMNS = """
+    location VARCHAR(255),
+    weather VARCHAR(100),
+    air_quality VARCHAR(50),
+    record_time TIME,
+    date DATETIME
+"""
+
+# Daily rollups of history (see WeatherDB): per location and day, the search
+# count and AQI histogram, plus search counts per weather condition
+ROLLUP_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS history_daily (
+        location VARCHAR(255) NOT NULL,
+        day {day_type} NOT NULL,
+        searches INT NOT NULL DEFAULT 0,
+        aqi_1 INT NOT NULL DEFAULT 0,
+        aqi_2 INT NOT NULL DEFAULT 0,
+        aqi_3 INT NOT NULL DEFAULT 0,
+        aqi_4 INT NOT NULL DEFAULT 0,
+        aqi_5 INT NOT NULL DEFAULT 0,
+        aqi_other INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (location, day)
+    ){options}
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS history_daily_weather (
+        location VARCHAR(255) NOT NULL,
+        day {day_type} NOT NULL,
+        weather VARCHAR(100) NOT NULL,
+        searches INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (location, day, weather)
+    ){options}
+    """,
+)
+
+
+class MySQLBackend:
+    """MySQL server storage using a process-wide mysql.connector pool."""
+
+    label = "MySQL"
+    history_ddl = f"""
+        CREATE TABLE IF NOT EXISTS history (
+            id INT AUTO_INCREMENT PRIMARY KEY,{HISTORY_COLUMNS}
+        )
+    """
+    rollup_ddl = [ddl.format(day_type="DATE", options="") for ddl in ROLLUP_DDL]
+
+    def __init__(self, host, user, password, database, port=3306, pool_size=5, pool_timeout=10):
+        from mysql.connector import pooling
+
+        self.pool_timeout = pool_timeout
+
+        config = {
+            "host": host,
+            "user": user,
+            "password": password,
+            "database": database,
+            "port": port,
+            # drain unread rows of a streaming cursor closed early
+            "consume_results": True,
+        }
+        self.key = ("mysql",) + tuple(sorted(config.items()))
+        with _pool_lock:
+            self.pool = _pools.get(self.key)
+            if self.pool is None:
+                self.pool = pooling.MySQLConnectionPool(
+                    pool_name=f"weather_pool_{len(_pools)}",
+                    pool_size=pool_size,
+                    pool_reset_session=True,
+                    **config,
+                )
+                _pools[self.key] = self.pool
+
+    def _checkout(self):
+        # get_connection() fails at once while every connection is borrowed:
+        # wait up to pool_timeout seconds for one to be returned
+        from mysql.connector.errors import PoolError
+
+        deadline = monotonic() + self.pool_timeout
+        delay = 0.01
+        while True:
+            try:
+                return self.pool.get_connection()
+            except PoolError:
+                if monotonic() >= deadline:
+                    raise
+                sleep(delay)
+                delay = min(delay * 2, 0.2)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection and return it to the pool afterwards."""
+        conn = self._checkout()
+        try:
+            # Health check: transparently reconnect stale pooled connections
+            conn.ping(reconnect=True, attempts=2, delay=0)
+            yield conn
+        finally:
+            conn.close()
+
+    def cursor(self, conn):
+        return conn.cursor(dictionary=True)
+
+    def stream_cursor(self, conn):
+        # Unbuffered: rows stay on the server until fetched
+        return conn.cursor(dictionary=True, buffered=False)
+
+    @property
+    def integrity_error(self):
+        from mysql.connector import IntegrityError
+
+        return IntegrityError
+
+    def create_index(self, cursor, name, table, columns, unique=False):
+        from mysql.connector import Error, errorcode
+
+        try:
+            cursor.execute(f"CREATE {'UNIQUE ' if unique else ''}INDEX {name} ON {table} {columns}")
+        except Error as e:
+            if e.errno != errorcode.ER_DUP_KEYNAME:
+                raise
+
+    def increment_sql(self, table, keys, counters):
+        """INSERT that adds ``counters`` onto an existing row with the same key."""
+        columns = keys + counters
+        updates = ", ".join(f"{c} = {c} + VALUES({c})" for c in counters)
+        return (f"INSERT INTO {table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join(['%s'] * len(columns))}) ON DUPLICATE KEY UPDATE {updates}")
+
+    def upsert_sql(self, table, keys, columns, replace=True):
+        """INSERT that replaces (or, without ``replace``, keeps) an existing row with the same key."""
+        if replace:
+            updates = ", ".join(f"{c} = VALUES({c})" for c in columns if c not in keys)
+        else:
+            updates = f"{keys[0]} = {keys[0]}"
+        return (f"INSERT INTO {table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join(['%s'] * len(columns))}) ON DUPLICATE KEY UPDATE {updates}")
+
+
+def _sqlite_value(value):
+    # Store dates the way MySQL renders DATETIME so text comparisons order correctly.
+    # Only date/time objects are converted: WeatherDB parses date and time text
+    # for its date columns, and any other text is stored as given.
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d 00:00:00")
+    if isinstance(value, time):
+        return value.strftime("%H:%M:%S")
+    return value
+
+
+def _parse_datetime(raw):
+    # also reads date-only and ISO "T" values stored as-is by older versions
+    return datetime.fromisoformat(raw.decode()[:19])
+
+
+sqlite3.register_converter("DATETIME", _parse_datetime)
+
+
+def _dict_row(cursor, row):
+    return {col[0]: value for col, value in zip(cursor.description, row)}
+
+
+class SQLiteCursor:
+    """DB-API cursor adapter accepting the MySQL ``%s`` paramstyle."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, query, params=()):
+        self._cursor.execute(query.replace("%s", "?"), [_sqlite_value(v) for v in params])
+
+    def executemany(self, query, rows):
+        self._cursor.executemany(
+            query.replace("%s", "?"),
+            ([_sqlite_value(v) for v in row] for row in rows),
+        )
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size):
+        return self._cursor.fetchmany(size)
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteBackend:
+    """Embedded SQLite storage (WAL mode, one cached connection per thread)."""
+
+    label = "SQLite"
+    history_ddl = f"""
+        CREATE TABLE IF NOT EXISTS history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,{HISTORY_COLUMNS}
+        )
+    """
+    # days are stored like history dates ("YYYY-MM-DD 00:00:00")
+    rollup_ddl = [ddl.format(day_type="DATETIME", options=" WITHOUT ROWID") for ddl in ROLLUP_DDL]
+
+    def __init__(self, path):
+        self.path = path
+        self.key = ("sqlite", os.path.abspath(path))
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+            cached_statements=256,  # reuse prepared statements across calls
+            timeout=10,
+        )
+        conn.row_factory = _dict_row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        yield conn
+
+    def cursor(self, conn):
+        return SQLiteCursor(conn.cursor())
+
+    def stream_cursor(self, conn):
+        # SQLite cursors already step through results lazily
+        return SQLiteCursor(conn.cursor())
+
+    integrity_error = sqlite3.IntegrityError
+
+    def create_index(self, cursor, name, table, columns, unique=False):
+        cursor.execute(f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {table} {columns}")
+
+    def increment_sql(self, table, keys, counters):
+        """INSERT that adds ``counters`` onto an existing row with the same key."""
+        columns = keys + counters
+        updates = ", ".join(f"{c} = {c} + excluded.{c}" for c in counters)
+        return (f"INSERT INTO {table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join(['%s'] * len(columns))}) "
+                f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}")
+
+    def upsert_sql(self, table, keys, columns, replace=True):
+        """INSERT that replaces (or, without ``replace``, keeps) an existing row with the same key."""
+        if replace:
+            action = "DO UPDATE SET " + ", ".join(f"{c} = excluded.{c}" for c in columns if c not in keys)
+        else:
+            action = "DO NOTHING"
+        return (f"INSERT INTO {table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join(['%s'] * len(columns))}) "
+                f"ON CONFLICT ({', '.join(keys)}) {action}")
+
+
+def backend_from_env(host=None, user=None, password=None, database=None, pool_size=None):
+    """Pick the storage backend from ``DB_BACKEND`` (``mysql`` or ``sqlite``)."""
+    if os.getenv("DB_BACKEND", "mysql").lower() == "sqlite":
+        return SQLiteBackend(os.getenv("DB_PATH", "weather.db"))
+
+    # Local-first configuration
+    return MySQLBackend(
+        host=host or os.getenv("DB_HOST", "localhost"),
+        user=user or os.getenv("DB_USER", "root"),
+        password=password or os.getenv("DB_PASSWORD", ""),
+        database=database or os.getenv("DB_NAME", "weather_db"),
+        pool_size=pool_size or int(os.getenv("DB_POOL_SIZE", "5")),
+        pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "10")),
+    )
@@ -0,0 +1,91 @@
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import MySQLBackend, SQLiteBackend  # noqa: E402
+
+HISTORY_TABLES = ("history", "history_daily", "history_daily_weather")
+
+
+def _mysql_backend():
+    """Backend for the TEST_DB_* server; the tests empty its history tables."""
+    try:
+        return MySQLBackend(
+            host=os.getenv("TEST_DB_HOST", "localhost"),
+            user=os.getenv("TEST_DB_USER", "root"),
+            password=os.getenv("TEST_DB_PASSWORD", ""),
+            database=os.getenv("TEST_DB_NAME", "weather_test"),
+            port=int(os.getenv("TEST_DB_PORT", "3306")),
+        )
+    except Exception as e:
+        pytest.skip(f"MySQL not available: {e}")
+
+
+@pytest.fixture(params=["sqlite", "mysql"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteBackend(str(tmp_path / "history.db"))
+    return _mysql_backend()
+
+
+@pytest.fixture
+def db(backend):
+    from database import WeatherDB
+
+    db = WeatherDB(backend=backend)
+    with db._cursor(commit=True) as cursor:
+        for table in HISTORY_TABLES:
+            cursor.execute(f"DELETE FROM {table}")
+    return db
+
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures")
+OWM_FIXTURES = {
+    "weather": "weather.json",
+    "forecast": "forecast.json",
+    "air_pollution/forecast": "air_pollution_forecast.json",
+}
+
+
+class FakeOWMResponse:
+    def __init__(self, body):
+        self.status_code = 200
+        self.content = body.encode()
+        self._body = body
+
+    def json(self):
+        import json
+
+        return json.loads(self._body)
+
+
+class FakeOWMClient:
+    """Serves the replay fixtures and records the endpoint of every call."""
+
+    def __init__(self):
+        self.calls = []
+        self.threads = set()
+
+    def get(self, url, params=None, endpoint=None):
+        self.calls.append(endpoint)
+        self.threads.add(threading.current_thread().name)
+        with open(os.path.join(FIXTURES, OWM_FIXTURES[endpoint]), encoding="utf-8") as f:
+            return FakeOWMResponse(f.read())
+
+
+@pytest.fixture
+def owm(monkeypatch):
+    """Point weather.py at fixture responses and an empty response cache."""
+    import weather
+    from cache import ResponseCache
+
+    client = FakeOWMClient()
+    monkeypatch.setattr(weather, "_http", client)
+    monkeypatch.setattr(weather, "_api_key", "test")
+    monkeypatch.setattr(weather, "response_cache", ResponseCache())
+    monkeypatch.setattr(weather, "get_observation_store", lambda: None)
+    return client
@@ -0,0 +1,42 @@
+import weather
+from batch import fetch_batch, report_jobs
+
+# No throttling in tests
+RATE = 60_000
+
+
+def test_fetch_batch_rows_and_errors(owm):
+    df = fetch_batch(["Delhi", "not,a,place"], rate_per_minute=RATE)
+    delhi = df[df["query"] == "Delhi"]
+    assert len(delhi) > 1
+    assert delhi["date"].is_unique
+    assert delhi["temp"].notna().all()
+    assert delhi["aqi"].notna().any()
+    assert df.loc[df["query"] == "not,a,place", "error"].tolist() == ["invalid lat,lon"]
+
+
+def test_duplicate_queries_are_fetched_once(owm):
+    once = fetch_batch(["Delhi"], rate_per_minute=RATE)
+    weather.response_cache.clear()
+    owm.calls.clear()
+    twice = fetch_batch(["Delhi", "Mumbai", "Delhi"], rate_per_minute=RATE)
+
+    assert owm.calls.count("weather") == 2
+    assert twice["query"].unique().tolist() == ["Delhi", "Mumbai"]
+    delhi = twice[twice["query"] == "Delhi"].reset_index(drop=True)
+    assert delhi.equals(once)
+
+    jobs = report_jobs(twice)
+    assert len(jobs) == 2
+    assert len(jobs[0][2]) == len(once)
+
+
+def test_requests_run_on_the_batch_pool(owm):
+    fetch_batch(["Delhi"], rate_per_minute=RATE)
+    assert owm.threads and all(name.startswith("batch-fetch") for name in owm.threads)
+
+
+def test_tip_ranges(owm):
+    df, ranges = fetch_batch(["Delhi", "Delhi"], rate_per_minute=RATE, tips=True)
+    assert set(ranges["query"]) == {"Delhi"}
+    assert not ranges.duplicated().any()
@@ -0,0 +1,85 @@
+import sqlite3
+import time
+
+from cache import ResponseCache, SQLiteCacheBackend, make_key
+
+
+def test_make_key_normalises_params():
+    assert make_key("weather", {"q": "  New   Delhi ", "units": "metric"}) == make_key(
+        "weather", {"units": "metric", "q": "new delhi"}
+    )
+    assert make_key("forecast", {"lat": 28.61391, "lon": 77.2090}) == "forecast?lat=28.61&lon=77.21"
+
+
+def test_hit_miss_and_expiry(monkeypatch):
+    cache = ResponseCache(ttls={"weather": 60})
+    assert cache.get("weather", {"q": "delhi"}) is None
+    cache.set("weather", {"q": "delhi"}, {"temp": 30})
+    assert cache.get("weather", {"q": "Delhi"}) == {"temp": 30}
+
+    now = time.time()
+    monkeypatch.setattr("cache.time.time", lambda: now + 61)
+    assert cache.get("weather", {"q": "delhi"}) is None
+    assert len(cache) == 0
+    assert (cache.stats["hits"], cache.stats["misses"]) == (1, 2)
+
+
+def test_lru_eviction():
+    cache = ResponseCache(maxsize=2)
+    for city in ("a", "b"):
+        cache.set("weather", {"q": city}, city)
+    cache.get("weather", {"q": "a"})
+    cache.set("weather", {"q": "c"}, "c")
+    assert cache.get("weather", {"q": "b"}) is None
+    assert cache.get("weather", {"q": "a"}) == "a"
+    assert cache.stats["evictions"] == 1
+
+
+def test_prewarmed_hits():
+    cache = ResponseCache()
+    cache.set("weather", {"q": "delhi"}, 1, prewarmed=True)
+    cache.set("weather", {"q": "pune"}, 2)
+    assert cache.peek("weather", {"q": "delhi"}) == 1
+    cache.get("weather", {"q": "delhi"})
+    cache.get("weather", {"q": "pune"})
+    assert (cache.stats["hits"], cache.stats["prewarmed_hits"]) == (2, 1)
+
+    # storing the key again without the flag clears it
+    cache.set("weather", {"q": "delhi"}, 3)
+    cache.get("weather", {"q": "delhi"})
+    assert cache.stats["prewarmed_hits"] == 1
+
+
+def test_prewarmed_flag_is_shared_through_the_backend(tmp_path):
+    path = str(tmp_path / "cache.db")
+    worker = ResponseCache(backend=SQLiteCacheBackend(path))
+    app = ResponseCache(backend=SQLiteCacheBackend(path))
+
+    worker.set("weather", {"q": "delhi"}, {"temp": 30}, prewarmed=True)
+    assert app.get("weather", {"q": "delhi"}) == {"temp": 30}
+    assert app.get("weather", {"q": "delhi"}) == {"temp": 30}  # now from the LRU
+    assert app.stats["backend_hits"] == 1
+    assert app.stats["prewarmed_hits"] == 2
+    assert worker.stats["hits"] == 0
+
+
+def test_backend_adds_prewarmed_column_to_old_files(tmp_path):
+    path = str(tmp_path / "cache.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE response_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)")
+    conn.execute("INSERT INTO response_cache VALUES ('weather?q=delhi', '1', ?)", (time.time() + 60,))
+    conn.commit()
+    conn.close()
+
+    backend = SQLiteCacheBackend(path)
+    assert backend.get("weather?q=delhi")[2] is False
+    backend.set("weather?q=pune", 2, time.time() + 60, prewarmed=True)
+    assert backend.get("weather?q=pune")[2] is True
+
+
+def test_backend_purges_expired_entries(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "cache.db"), purge_every=2)
+    backend.set("old", 1, time.time() - 1)
+    backend.set("new", 2, time.time() + 60)
+    assert backend.get("old") is None
+    assert backend.get("new")[0] == 2
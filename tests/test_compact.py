@@ -0,0 +1,61 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from compact import CompactFrame, WeatherRecord, compact_result
+from frames import forecast_frame, pollution_frame
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures")
+
+
+def payload(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return json.load(f)["list"]
+
+
+def test_round_trip_keeps_values():
+    df = pollution_frame(payload("air_pollution_forecast.json"))
+    frame = CompactFrame.from_frame(df)
+    view = frame.to_frame()
+    assert list(view.columns) == list(df.columns)
+    assert view["aqi_label"].astype(str).tolist() == df["aqi_label"].astype(str).tolist()
+    assert np.allclose(view["pm2_5"], df["pm2_5"], rtol=1e-6)
+    assert frame["aqi_label"].tolist() == df["aqi_label"].astype(str).tolist()
+    assert frame["pm2_5"].dtype == np.float32
+
+
+def test_to_frame_shares_every_column():
+    for df in (forecast_frame(payload("forecast.json")), pollution_frame(payload("air_pollution_forecast.json"))):
+        frame = CompactFrame.from_frame(df)
+        view = frame.to_frame()
+        for name in frame.columns:
+            values = view[name].array
+            values = values.codes if isinstance(view[name].dtype, pd.CategoricalDtype) else values.to_numpy()
+            assert np.shares_memory(values, frame._columns[name]), name
+
+
+def test_weather_record_behaves_like_the_dict():
+    record = WeatherRecord.from_dict({"city": "Delhi", "temp": 30.5, "weather": "haze", "lat": 28.6, "lon": 77.2})
+    assert record["city"] == "Delhi"
+    assert "next_3h_temp" not in record
+    assert record.get("next_3h_temp", "n/a") == "n/a"
+    assert dict(record.to_dict()) == {"city": "Delhi", "temp": 30.5, "weather": "haze", "lat": 28.6, "lon": 77.2}
+
+
+def test_compact_result_drops_raw_payloads():
+    forecast = payload("forecast.json")
+    result = {
+        "weather": {"city": "Delhi", "temp": 30.5, "weather": "haze", "lat": 28.6, "lon": 77.2},
+        "forecast_raw": forecast,
+        "daily": forecast_frame(forecast),
+        "pollution": None,
+        "current_raw": {"dt": 0},
+        "timed_out": ["pollution"],
+    }
+    compact = compact_result(result)
+    assert "forecast_raw" not in compact
+    assert compact["pollution"] is None
+    assert len(compact["slots"]) == len(forecast)
+    assert len(compact["daily"]) == len(result["daily"])
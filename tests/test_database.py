@@ -0,0 +1,214 @@
+"""WeatherDB CRUD, paging, bulk import and rollups, run against every backend."""
+from datetime import date, datetime, timedelta
+
+TODAY = date.today()
+DAY1 = datetime.combine(TODAY - timedelta(days=2), datetime.min.time())
+DAY2 = datetime.combine(TODAY - timedelta(days=1), datetime.min.time())
+
+
+def seed(db):
+    db.add_record("Delhi", "haze", "AQI 4", "08:00:00", DAY1)
+    db.add_record("Delhi", "clear sky", "AQI 3", "14:30:00", DAY2)
+    db.add_record("Mumbai", "light rain", "AQI 2", "09:15:00", DAY2)
+    db.add_record("Chennai", "clear sky", "AQI 2", "18:45:00", DAY2)
+
+
+def keys(rows):
+    return [(r["location"], r["record_time"]) for r in rows]
+
+
+def rollups(db):
+    return [
+        {k: r[k] for k in ("location", "day", "searches", "aqi_2", "aqi_3", "aqi_4", "top_condition")}
+        for r in db.daily_rollups()
+    ]
+
+
+def assert_rollups_consistent(db):
+    incremental = rollups(db)
+    db.rebuild_rollups()
+    assert incremental == rollups(db)
+
+
+def test_add_and_get_records(db):
+    seed(db)
+    rows = db.get_records()
+    assert keys(rows) == [
+        ("Chennai", "18:45:00"),
+        ("Delhi", "14:30:00"),
+        ("Mumbai", "09:15:00"),
+        ("Delhi", "08:00:00"),
+    ]
+    first = rows[0]
+    assert first["weather"] == "clear sky"
+    assert first["air_quality"] == "AQI 2"
+    assert first["date"] == DAY2
+
+
+def test_date_and_time_strings(db):
+    db.add_record("Pune", "mist", "AQI 1", "7:05", DAY1.strftime("%Y-%m-%d"))
+    db.add_records([
+        {"location": "Goa", "weather": "haze", "air_quality": "AQI 2",
+         "record_time": "10:00:00", "date": DAY2.strftime("%Y-%m-%dT10:00:00")},
+    ])
+    rows = db.get_records()
+    assert keys(rows) == [("Goa", "10:00:00"), ("Pune", "07:05:00")]
+    assert rows[0]["date"] == DAY2.replace(hour=10)
+    assert rows[1]["date"] == DAY1
+    assert db.count(date_from=DAY1.date(), date_to=DAY1.date()) == 1
+
+
+def test_filters_and_count(db):
+    seed(db)
+    assert keys(db.get_records(location="Del")) == [("Delhi", "14:30:00"), ("Delhi", "08:00:00")]
+    assert keys(db.get_records(air_quality="AQI 2")) == [("Chennai", "18:45:00"), ("Mumbai", "09:15:00")]
+    assert keys(db.get_records(date_from=DAY1.date(), date_to=DAY1.date())) == [("Delhi", "08:00:00")]
+    assert db.count() == 4
+    assert db.count(location="Delhi") == 2
+    assert db.count(date_from=DAY2.date()) == 3
+
+
+def test_get_page_walks_all_rows(db):
+    seed(db)
+    pages, after = [], None
+    while True:
+        rows, after = db.get_page(limit=3, after=after)
+        pages.append(keys(rows))
+        if after is None:
+            break
+    assert [len(p) for p in pages] == [3, 1]
+    assert sum(pages, []) == keys(db.get_records())
+
+
+def test_iter_chunks(db):
+    seed(db)
+    chunks = list(db.iter_chunks(chunk_size=3))
+    assert [len(c) for c in chunks] == [3, 1]
+    assert [r["location"] for c in chunks for r in c] == ["Delhi", "Delhi", "Mumbai", "Chennai"]
+    assert chunks[0][0]["record_time"] == "08:00:00"
+
+
+def test_update_record(db):
+    seed(db)
+    record = db.get_records(location="Mumbai")[0]
+    db.update_record(record["id"], "Mumbai", "heavy rain", "AQI 3", "10:00:00", DAY1)
+    updated = db.get_records(location="Mumbai")[0]
+    assert (updated["weather"], updated["air_quality"], updated["record_time"], updated["date"]) == (
+        "heavy rain", "AQI 3", "10:00:00", DAY1,
+    )
+    assert_rollups_consistent(db)
+
+
+def test_delete_record(db):
+    seed(db)
+    record = db.get_records(location="Chennai")[0]
+    db.delete_record(record["id"])
+    assert db.count() == 3
+    assert db.get_records(location="Chennai") == []
+    assert all(r["location"] != "Chennai" for r in db.daily_rollups())
+    assert_rollups_consistent(db)
+
+
+def test_add_records_upsert(db):
+    records = [
+        {"location": "Delhi", "weather": "haze", "air_quality": "AQI 4", "record_time": "08:00:00", "date": DAY1},
+        {"location": "Delhi", "weather": "smoke", "air_quality": "AQI 5", "record_time": "09:00:00", "date": DAY1},
+    ]
+    assert db.add_records(records, chunk_size=1) == 2
+
+    replacement = dict(records[0], weather="clear sky", air_quality="AQI 2")
+    assert db.add_records([replacement], upsert=True) == 1
+    rows = db.get_records()
+    assert [(r["weather"], r["air_quality"]) for r in rows] == [("smoke", "AQI 5"), ("clear sky", "AQI 2")]
+
+    # without upsert an existing key is kept
+    assert db.add_records([dict(replacement, weather="fog")]) == 0
+    db.add_record("Delhi", "fog", "AQI 5", "08:00:00", DAY1)
+    assert db.count() == 2
+    assert db.get_records(location="Delhi")[1]["weather"] == "clear sky"
+    assert_rollups_consistent(db)
+
+
+def test_upsert_normalises_keys(db):
+    db.add_records([{"location": "Pune", "weather": "mist", "air_quality": "AQI 1",
+                     "record_time": "7:05", "date": DAY1.strftime("%Y-%m-%d")}])
+    # the same key written as objects, and twice within one chunk
+    same = {"location": "Pune", "air_quality": "AQI 2", "record_time": DAY1.replace(hour=7, minute=5).time(),
+            "date": DAY1.date()}
+    assert db.add_records([dict(same, weather="haze"), dict(same, weather="clear sky")], upsert=True) == 1
+    assert [(r["weather"], r["record_time"]) for r in db.get_records()] == [("clear sky", "07:05:00")]
+    assert_rollups_consistent(db)
+
+
+def test_upsert_large_chunk(db):
+    records = [
+        {"location": f"City {i}", "weather": "haze", "air_quality": "AQI 3", "record_time": "08:00:00", "date": DAY1}
+        for i in range(1200)
+    ]
+    assert db.add_records(records[:600]) == 600
+    assert db.add_records([dict(r, weather="clear sky") for r in records], chunk_size=1200, upsert=True) == 1200
+    assert db.count() == 1200
+    assert {r["weather"] for r in db.get_records()} == {"clear sky"}
+    assert_rollups_consistent(db)
+
+
+def test_text_is_stored_as_given(db):
+    db.add_record("2024-01-01", "12:30", "AQI 1", "08:00:00", DAY1)
+    row = db.get_records()[0]
+    assert (row["location"], row["weather"]) == ("2024-01-01", "12:30")
+
+
+def test_rollups(db):
+    seed(db)
+    assert rollups(db) == [
+        {"location": "Chennai", "day": DAY2.date(), "searches": 1, "aqi_2": 1, "aqi_3": 0, "aqi_4": 0,
+         "top_condition": "clear sky"},
+        {"location": "Delhi", "day": DAY2.date(), "searches": 1, "aqi_2": 0, "aqi_3": 1, "aqi_4": 0,
+         "top_condition": "clear sky"},
+        {"location": "Mumbai", "day": DAY2.date(), "searches": 1, "aqi_2": 1, "aqi_3": 0, "aqi_4": 0,
+         "top_condition": "light rain"},
+        {"location": "Delhi", "day": DAY1.date(), "searches": 1, "aqi_2": 0, "aqi_3": 0, "aqi_4": 1,
+         "top_condition": "haze"},
+    ]
+    distribution = {r["location"]: r for r in db.aqi_distribution()}
+    assert distribution["Delhi"]["searches"] == 2
+    assert distribution["Delhi"]["aqi_3"] == distribution["Delhi"]["aqi_4"] == 1
+    assert db.top_locations(limit=1) == [{"location": "Delhi", "searches": 2}]
+    assert_rollups_consistent(db)
+
+
+def test_connects_on_first_use_after_failed_start(tmp_path):
+    from database import WeatherDB
+    from storage import SQLiteBackend
+
+    folder = tmp_path / "missing"
+    db = WeatherDB(backend=SQLiteBackend(str(folder / "history.db")))
+    assert db.backend is None
+
+    folder.mkdir()
+    db.add_record("Delhi", "haze", "AQI 4", "08:00:00", DAY1)
+    assert db.count() == 1
+
+
+def test_duplicate_keys_removed_when_upgrading(tmp_path):
+    import sqlite3
+
+    from database import WeatherDB
+    from storage import SQLiteBackend
+
+    path = str(tmp_path / "history.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE history (id INTEGER PRIMARY KEY AUTOINCREMENT, location VARCHAR(255),"
+                 " weather VARCHAR(100), air_quality VARCHAR(50), record_time TIME, date DATETIME)")
+    day = DAY1.strftime("%Y-%m-%d %H:%M:%S")
+    conn.executemany(
+        "INSERT INTO history (location, weather, air_quality, record_time, date) VALUES (?, ?, ?, ?, ?)",
+        [("Delhi", "haze", "AQI 4", "08:00:00", day), ("Delhi", "smoke", "AQI 5", "08:00:00", day),
+         ("Mumbai", "rain", "AQI 2", "08:00:00", day)],
+    )
+    conn.commit()
+    conn.close()
+
+    db = WeatherDB(backend=SQLiteBackend(path))
+    assert [(r["location"], r["weather"]) for r in db.get_records()] == [("Mumbai", "rain"), ("Delhi", "smoke")]
+    assert sum(r["searches"] for r in db.daily_rollups()) == 2
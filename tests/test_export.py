@@ -0,0 +1,71 @@
+import csv
+import os
+from datetime import datetime
+from time import time
+
+import pytest
+
+import export
+from export import export_format, export_history, export_path, remove_export
+
+DAY = datetime(2024, 1, 2)
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    from database import WeatherDB
+    from storage import SQLiteBackend
+
+    db = WeatherDB(backend=SQLiteBackend(str(tmp_path / "history.db")))
+    db.add_records([
+        {"location": f"City {i}", "weather": "haze", "air_quality": "AQI 3",
+         "record_time": f"08:{i:02d}:00", "date": DAY}
+        for i in range(5)
+    ])
+    return db
+
+
+def test_export_format():
+    assert export_format("out.parquet") == "parquet"
+    assert export_format("out.txt") == "csv"
+    assert export_format("out.txt", "parquet") == "parquet"
+    with pytest.raises(ValueError):
+        export_format("out.csv", "xlsx")
+
+
+def test_csv_export_streams_chunks(sqlite_db, tmp_path):
+    path = str(tmp_path / "history.csv")
+    assert export_history(sqlite_db, path, chunk_size=2) == 5
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == export.EXPORT_COLUMNS
+    assert [r["record_time"] for r in rows] == [f"08:{i:02d}:00" for i in range(5)]
+
+
+def test_parquet_export_writes_a_row_group_per_chunk(sqlite_db, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "history.parquet")
+    assert export_history(sqlite_db, path, chunk_size=2, location="City 1") == 1
+    assert export_history(sqlite_db, path, chunk_size=2) == 5
+    f = pq.ParquetFile(path)
+    assert f.metadata.num_row_groups == 3
+    table = f.read()
+    assert table.column("location").to_pylist() == [f"City {i}" for i in range(5)]
+    assert table.column("date").to_pylist()[0] == DAY
+
+
+def test_export_path_removes_stale_exports(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_DIR", str(tmp_path / "exports"))
+    old = export_path("csv")
+    fresh = export_path("csv")
+    past = time() - 2 * export.EXPORT_MAX_AGE
+    os.utime(old, (past, past))
+
+    path = export_path("parquet")
+    assert path.endswith(".parquet") and os.path.exists(path)
+    assert not os.path.exists(old)
+    assert os.path.exists(fresh)
+
+    remove_export(path)
+    remove_export(path)
+    assert not os.path.exists(path)
@@ -0,0 +1,51 @@
+from datetime import date
+
+import pandas as pd
+
+from frames import daily_forecast, daily_pollution, forecast_frame, pollution_frame
+
+DAY = int(pd.Timestamp("2025-01-06", tz="UTC").timestamp())
+HOUR = 3600
+
+
+def forecast_slot(hour, temp, condition):
+    return {"dt": DAY + hour * HOUR, "main": {"temp": temp}, "weather": [{"description": condition}]}
+
+
+def pollution_slot(hour, aqi, pm2_5):
+    components = {"pm2_5": pm2_5, "pm10": 1.0, "no2": 2.0, "so2": 3.0, "o3": 4.0, "co": 5.0}
+    return {"dt": DAY + hour * HOUR, "main": {"aqi": aqi}, "components": components}
+
+
+def test_forecast_frame_daily_mean_and_modal_condition():
+    slots = [
+        forecast_slot(0, 10, "haze"),
+        forecast_slot(3, 20, "clear sky"),
+        forecast_slot(6, 30, "clear sky"),
+        forecast_slot(24, 5, "mist"),
+        forecast_slot(27, 7, "fog"),  # tie: the first condition of the day wins
+    ]
+    df = forecast_frame(slots)
+    assert df.to_dict("records") == [
+        {"date": date(2025, 1, 6), "temp": 20.0, "condition": "clear sky"},
+        {"date": date(2025, 1, 7), "temp": 6.0, "condition": "mist"},
+    ]
+
+
+def test_daily_forecast_groups_many_locations():
+    df = daily_forecast({
+        "Delhi": [forecast_slot(0, 30, "haze")],
+        "Pune": [forecast_slot(0, 20, "rain"), forecast_slot(24, 22, "rain")],
+    })
+    assert df.groupby("location", observed=True).size().to_dict() == {"Delhi": 1, "Pune": 2}
+
+
+def test_pollution_frame_rounds_aqi_and_labels_it():
+    df = pollution_frame([pollution_slot(0, 2, 10.0), pollution_slot(3, 3, 20.0), pollution_slot(6, 4, 30.0)])
+    row = df.iloc[0]
+    assert (row["date"], row["aqi"], row["aqi_label"], row["pm2_5"]) == (date(2025, 1, 6), 3, "Moderate", 20.0)
+
+
+def test_daily_pollution_per_location():
+    df = daily_pollution({"Delhi": [pollution_slot(0, 5, 1.0)], "Pune": [pollution_slot(0, 1, 1.0)]})
+    assert dict(zip(df["location"], df["aqi_label"])) == {"Delhi": "Very Poor", "Pune": "Good"}
@@ -0,0 +1,51 @@
+import pytest
+
+from geocode import Gazetteer, build_gazetteer, normalise
+
+PLACES = [
+    ("New Delhi", 28.6139, 77.2090),
+    ("Delhi", 28.7041, 77.1025),
+    ("Bengaluru", 12.9716, 77.5946),
+    ("Bhopal", 23.2599, 77.4126),
+    ("São Paulo", -23.5505, -46.6333),
+    ("110001", 28.6328, 77.2197),
+]
+
+
+@pytest.fixture
+def gazetteer(tmp_path):
+    path = str(tmp_path / "gazetteer.bin")
+    assert build_gazetteer(PLACES, path) == len(PLACES)
+    g = Gazetteer(path)
+    yield g
+    g.close()
+
+
+def test_normalise():
+    assert normalise("  São   PAULO ") == "sao paulo"
+
+
+def test_lookup(gazetteer):
+    assert gazetteer.lookup("delhi") == {"name": "Delhi", "lat": 28.7041, "lon": 77.1025, "kind": "city"}
+    assert gazetteer.lookup("sao paulo")["name"] == "São Paulo"
+    assert gazetteer.lookup("110001")["kind"] == "pin"
+    assert gazetteer.lookup("Mumbai") is None
+
+
+def test_prefix(gazetteer):
+    assert [p["name"] for p in gazetteer.prefix("b")] == ["Bengaluru", "Bhopal"]
+    assert [p["name"] for p in gazetteer.prefix("b", limit=1)] == ["Bengaluru"]
+    assert gazetteer.prefix("") == []
+
+
+def test_fuzzy_and_resolve(gazetteer):
+    assert gazetteer.fuzzy("bengaluro")[0]["name"] == "Bengaluru"
+    assert gazetteer.resolve("Bhopl")["name"] == "Bhopal"
+    assert gazetteer.resolve("zzz") is None
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"\0" * 32)
+    with pytest.raises(ValueError):
+        Gazetteer(str(path))
@@ -0,0 +1,74 @@
+import threading
+
+from history_writer import HistoryWriter
+
+
+class FakeDB:
+    """Collects add_records batches; fails the first ``failures`` calls."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.batches = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def add_records(self, records, chunk_size=None):
+        self.release.wait()
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("database is locked")
+        self.batches.append(list(records))
+        return len(records)
+
+
+def record(i):
+    return {"location": f"City {i}", "weather": "haze", "air_quality": "AQI 3",
+            "record_time": "08:00:00", "date": "2024-01-01"}
+
+
+def test_submit_and_close_flush_in_batches():
+    db = FakeDB()
+    writer = HistoryWriter(db, batch_size=2, flush_interval=0.05)
+    for i in range(5):
+        assert writer.submit(**record(i))
+    writer.close()
+    assert sum(len(b) for b in db.batches) == 5
+    assert max(len(b) for b in db.batches) <= 2
+    assert writer.stats["queued"] == writer.stats["written"] == 5
+    assert writer.pending == 0
+
+
+def test_full_queue_drops_records():
+    db = FakeDB()
+    db.release.clear()
+    writer = HistoryWriter(db, maxsize=1, batch_size=1, flush_interval=0.01)
+    writer.submit(**record(0))  # taken by the writer thread, which then blocks in add_records
+    while writer.pending:
+        pass
+    assert writer.submit(**record(1))
+    assert not writer.submit(**record(2))
+    assert writer.stats["dropped"] == 1
+    db.release.set()
+    writer.close()
+    assert writer.stats["written"] == 2
+
+
+def test_failed_batch_is_retried_once():
+    db = FakeDB(failures=1)
+    writer = HistoryWriter(db, batch_size=10, flush_interval=0.01, retry_delay=0)
+    writer.submit(**record(0))
+    writer.close()
+    assert writer.stats["retried"] == 1
+    assert writer.stats["written"] == 1
+    assert writer.last_failure is None
+
+
+def test_second_failure_counts_records_as_failed():
+    db = FakeDB(failures=2)
+    writer = HistoryWriter(db, batch_size=2, flush_interval=5, retry_delay=0)
+    writer.submit(**record(0))
+    writer.submit(**record(1))
+    writer.close()
+    assert writer.stats["failed"] == 2
+    assert writer.stats["written"] == 0
+    assert writer.last_failure[1] == "RuntimeError: database is locked"
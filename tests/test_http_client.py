@@ -0,0 +1,67 @@
+import pytest
+import requests
+
+import http_client
+from http_client import HttpClient
+
+
+class FakeResponse:
+    def __init__(self, status_code, retry_after=None):
+        self.status_code = status_code
+        self.headers = {"Retry-After": retry_after} if retry_after is not None else {}
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    waited = []
+    monkeypatch.setattr(http_client.time, "sleep", waited.append)
+    return waited
+
+
+def client_with(responses, **kwargs):
+    client = HttpClient(**kwargs)
+    calls = []
+
+    def get(url, params=None, timeout=None):
+        calls.append(url)
+        result = responses.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    client.session.get = get
+    return client, calls
+
+
+def test_retries_server_errors(sleeps):
+    client, calls = client_with([FakeResponse(503), FakeResponse(502), FakeResponse(200)])
+    assert client.get("http://x", endpoint="weather").status_code == 200
+    assert len(calls) == 3
+    assert len(sleeps) == 2
+    assert client.latency_snapshot()["weather"]["count"] == 3
+
+
+def test_waits_for_retry_after(sleeps):
+    client, calls = client_with([FakeResponse(429, "2"), FakeResponse(200)])
+    assert client.get("http://x").status_code == 200
+    assert sleeps == [2.0]
+
+
+def test_retry_after_beyond_max_backoff_is_not_retried(sleeps):
+    client, calls = client_with([FakeResponse(429, "60"), FakeResponse(200)], max_backoff=8.0)
+    assert client.get("http://x").status_code == 429
+    assert len(calls) == 1
+    assert sleeps == []
+
+
+def test_gives_up_after_retries(sleeps):
+    client, calls = client_with([FakeResponse(503)] * 3, retries=2)
+    assert client.get("http://x").status_code == 503
+    assert len(calls) == 3
+
+
+def test_connection_errors_raise_when_exhausted(sleeps):
+    client, calls = client_with([requests.ConnectionError("down")] * 2, retries=1)
+    with pytest.raises(requests.ConnectionError):
+        client.get("http://x")
+    assert len(calls) == 2
@@ -0,0 +1,61 @@
+import pytest
+
+import prewarm
+from prewarm import Prewarmer
+
+
+class FakeDB:
+    def top_locations(self, limit=20, days=30):
+        return [{"location": "Delhi", "searches": 5}, {"location": "Mumbai", "searches": 3}][:limit]
+
+
+@pytest.fixture
+def prewarmer(owm, monkeypatch):
+    import weather
+
+    monkeypatch.setattr(prewarm, "response_cache", weather.response_cache)
+    return Prewarmer(FakeDB(), rate_per_minute=6000)
+
+
+def test_default_interval_is_below_the_shortest_ttl(prewarmer):
+    assert prewarmer.interval == pytest.approx(0.8 * 600)
+
+
+def test_later_rounds_refresh_only_the_current_weather(prewarmer, owm):
+    assert prewarmer.refresh_once() == 2
+    # both fixture cities resolve to the same coordinates
+    assert sorted(owm.calls) == ["air_pollution/forecast", "forecast", "weather", "weather"]
+
+    owm.calls.clear()
+    assert prewarmer.refresh_once() == 2
+    assert owm.calls == ["weather", "weather"]
+
+
+def test_searches_count_prewarmed_hits(prewarmer, owm):
+    from weather import fetch_location
+
+    prewarmer.refresh_once()
+    owm.calls.clear()
+    fetch_location(city="Delhi", include_pollution=True, aggregate=False)
+    assert owm.calls == []
+
+    metrics = prewarmer.metrics()
+    assert metrics["refreshed"] == 2
+    assert metrics["cache_hits"] == metrics["prewarmed_hits"] == 3
+    assert metrics["prewarmed_hit_rate"] == 1.0
+
+
+def test_run_forever_survives_a_failed_round(prewarmer, monkeypatch):
+    rounds = []
+
+    def refresh_once():
+        rounds.append(1)
+        if len(rounds) == 2:
+            prewarmer.stop()
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(prewarmer, "refresh_once", refresh_once)
+    prewarmer.interval = 0
+    prewarmer.run_forever()
+    assert len(rounds) == 2
+    assert prewarmer.stats["failed"] == 2
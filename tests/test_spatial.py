@@ -0,0 +1,51 @@
+import pytest
+
+from spatial import SpatialIndex, haversine_km
+
+
+def test_haversine():
+    assert haversine_km(28.6139, 77.2090, 28.6139, 77.2090) == 0
+    # Delhi to Mumbai is about 1,150 km
+    assert haversine_km(28.6139, 77.2090, 19.0760, 72.8777) == pytest.approx(1150, rel=0.01)
+
+
+def test_nearest_within_radius():
+    index = SpatialIndex()
+    index.add(28.6139, 77.2090, "delhi")
+    index.add(28.7041, 77.1025, "north delhi")
+    value, distance, age, point = index.nearest(28.62, 77.21, radius_km=5)
+    assert value == "delhi"
+    assert distance < 1
+    assert point == (28.6139, 77.209)
+    assert index.nearest(19.07, 72.87, radius_km=5) is None
+
+
+def test_nearest_across_cells_and_accept():
+    index = SpatialIndex(cell_deg=0.01)
+    index.add(28.60, 77.20, {"pollution": None})
+    index.add(28.63, 77.20, {"pollution": "ok"})
+    hit = index.nearest(28.60, 77.20, radius_km=5, accept=lambda v: v["pollution"] is not None)
+    assert hit[0] == {"pollution": "ok"}
+    assert hit[1] == pytest.approx(3.34, abs=0.01)
+
+
+def test_age_and_expiry(monkeypatch):
+    index = SpatialIndex(ttl=100)
+    index.add(28.6, 77.2, "old", fetched_at=1000)
+    monkeypatch.setattr("spatial.time", lambda: 1050)
+    assert index.nearest(28.6, 77.2, 1, max_age=30) is None
+    assert index.nearest(28.6, 77.2, 1)[2] == 50
+    monkeypatch.setattr("spatial.time", lambda: 1101)
+    assert index.nearest(28.6, 77.2, 1) is None
+    assert len(index) == 0
+
+
+def test_bounded_size_and_dedup():
+    index = SpatialIndex(maxsize=2)
+    index.add(10.0, 10.0, "a")
+    index.add(10.00001, 10.0, "a2")  # same ~10 m point: replaces "a"
+    index.add(20.0, 20.0, "b")
+    index.add(30.0, 30.0, "c")
+    assert len(index) == 2
+    assert index.nearest(10.0, 10.0, 1) is None
+    assert index.nearest(30.0, 30.0, 1)[0] == "c"
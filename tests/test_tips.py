@@ -0,0 +1,50 @@
+import pandas as pd
+
+from tip_rules import RULES, reading_tips
+from tips import TipEngine, forecast_tips
+
+TIP = {rule.name: rule.tip for rule in RULES}
+
+
+def test_reading_tips():
+    assert reading_tips(42, "clear sky") == [TIP["extreme_heat"], TIP["sunny"]]
+    assert reading_tips(15, "light rain") == [TIP["cool"], TIP["rain"]]
+    assert reading_tips(-2, "Heavy Snow") == [TIP["freezing"], TIP["snow"]]
+    assert reading_tips(24, "overcast clouds") == [TIP["comfortable"]]
+    # forecast-only rules and keywords stay out of the current-weather tips
+    assert reading_tips(24, "thunderstorm with drizzle") == [TIP["comfortable"]]
+    assert reading_tips(24, "mist") == [TIP["comfortable"]]
+
+
+def test_engine_uses_the_same_thresholds():
+    engine = TipEngine()
+    temps = [-5, 0, 5, 10, 19.9, 20, 25, 26, 29.9, 30, 40, 45]
+    matched = engine.evaluate(temps, ["clear sky"] * len(temps))
+    for temp, row in zip(temps, matched):
+        expected = reading_tips(temp, "clear sky")
+        assert [r.tip for r, hit in zip(engine.rules, row) if hit] == expected
+
+
+def test_engine_keywords():
+    engine = TipEngine()
+    matched = engine.evaluate([15, 15, 15], ["drizzle", "thunderstorm", None])
+    names = [[n for n, hit in zip(engine.names, row) if hit] for row in matched]
+    assert names == [["cool", "rain"], ["cool", "storm"], ["cool"]]
+
+
+def slot(when, temp, condition):
+    return {"dt": int(pd.Timestamp(when, tz="UTC").timestamp()),
+            "main": {"temp": temp}, "weather": [{"description": condition}]}
+
+
+def test_forecast_tip_ranges():
+    slots = [
+        slot("2025-01-06 09:00", 15, "light rain"),
+        slot("2025-01-06 12:00", 16, "moderate rain"),
+        slot("2025-01-06 15:00", 24, "overcast clouds"),
+        slot("2025-01-06 18:00", 15, "light rain"),
+    ]
+    ranges = forecast_tips(slots, tz_offset=19800)
+    rain = ranges[ranges["rule"] == "rain"]["text"].tolist()
+    assert rain == ["rain expected Mon 14:30–20:30", "rain expected Mon 23:30–Tue 02:30"]
+    assert "comfortable" not in set(ranges["rule"])
@@ -0,0 +1,70 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import tracing
+
+
+def test_span_records_size_cache_and_errors():
+    with tracing.span("test.span") as s:
+        s.size = 10
+        s.cache = "hit"
+    with pytest.raises(KeyError):
+        with tracing.span("test.span"):
+            raise KeyError("x")
+
+    first, second = tracing.recent_spans(2)
+    assert (first.name, first.size, first.cache, first.error) == ("test.span", 10, "hit", None)
+    assert second.error == "KeyError"
+    assert second.duration >= 0
+
+
+def test_traced_uses_size_of_result():
+    @tracing.traced("test.traced", size=len)
+    def rows():
+        return [1, 2, 3]
+
+    assert rows() == [1, 2, 3]
+    assert tracing.recent_spans(1)[0].size == 3
+
+
+def test_trace_groups_spans_and_bind_carries_it_to_threads():
+    with tracing.start_trace("test.search", city="Delhi") as trace:
+        with tracing.span("test.fetch"):
+            pass
+        with ThreadPoolExecutor(1) as pool:
+            pool.submit(tracing.bind(_worker_span)).result()
+            pool.submit(_worker_span).result()
+
+    assert tracing.recent_traces(1, name="test.search") == [trace]
+    assert trace.duration is not None
+    assert [s.name for s in trace.spans] == ["test.fetch", "test.worker"]
+    assert all(s.trace_id == trace.id for s in trace.spans)
+    assert set(trace.stages()) == {"test.fetch", "test.worker"}
+    # ending the trace clears the current one
+    with tracing.span("test.after"):
+        pass
+    assert tracing.recent_spans(1)[0].trace_id is None
+
+
+def _worker_span():
+    with tracing.span("test.worker"):
+        pass
+
+
+def test_openmetrics_renders_spans_and_counters(monkeypatch):
+    monkeypatch.setattr(tracing, "_counters", {})
+    with tracing.span("test.metrics") as s:
+        s.cache = "miss"
+    tracing.register_counters("test_outcomes", "Test outcomes.", lambda: {"ok": 2, 'a"b': 1}, "outcome")
+    text = tracing.openmetrics({
+        "weather": {"buckets": [(0.1, 1), (float("inf"), 2)], "count": 2, "sum": 0.3},
+    })
+
+    assert 'weather_span_seconds_count{span="test.metrics"}' in text
+    assert 'weather_span_cache_total{span="test.metrics",status="miss"} ' in text
+    assert "# TYPE weather_test_outcomes counter" in text
+    assert 'weather_test_outcomes_total{outcome="ok"} 2' in text
+    assert 'weather_test_outcomes_total{outcome="a\\"b"} 1' in text
+    assert 'weather_http_request_seconds_bucket{endpoint="weather",le="+Inf"} 2' in text
+    assert text.endswith("# EOF\n")
@@ -0,0 +1,67 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import compact
+import weather
+from spatial import SpatialIndex
+
+
+class FakeStore:
+    def __init__(self):
+        self.recorded = []
+
+    def record(self, location, result):
+        self.recorded.append(location)
+
+
+@pytest.fixture
+def search(owm, monkeypatch):
+    """fetch_location with a fresh nearby index, a fake observation store and a compaction counter."""
+    store = FakeStore()
+    compacted = []
+    compact_result = compact.compact_result
+    monkeypatch.setattr(weather, "observation_index", SpatialIndex())
+    monkeypatch.setattr(weather, "get_observation_store", lambda: store)
+    monkeypatch.setattr(compact, "compact_result", lambda r: compacted.append(1) or compact_result(r))
+    return store, compacted
+
+
+def test_fresh_fetch_is_indexed_and_recorded_once(search, owm):
+    store, compacted = search
+    pool = ThreadPoolExecutor(4)
+    result = weather.fetch_location(city="Delhi", include_pollution=True, compact=True, executor=pool)
+    pool.shutdown(wait=True)
+    assert isinstance(result["weather"], compact.WeatherRecord)
+    assert result["daily"] is not None and result["pollution"] is not None
+    assert len(compacted) == 1
+    assert len(weather.observation_index) == 1
+    assert store.recorded == ["Delhi"]
+
+
+def test_cached_result_is_not_indexed_or_recorded_again(search, owm):
+    store, compacted = search
+    pool = ThreadPoolExecutor(4)
+    weather.fetch_location(city="Delhi", include_pollution=True, executor=pool)
+    weather.observation_index = SpatialIndex()
+    owm.calls.clear()
+
+    result = weather.fetch_location(city="Delhi", include_pollution=True, executor=pool)
+    pool.shutdown(wait=True)
+    assert owm.calls == []
+    assert isinstance(result["weather"], dict)
+    assert len(compacted) == 1  # only for the first, fresh result
+    assert len(weather.observation_index) == 0
+    assert store.recorded == ["Delhi"]
+
+
+def test_fetch_nearby_reuses_the_indexed_result(search, owm):
+    store, compacted = search
+    first = weather.fetch_nearby(28.61, 77.21, include_pollution=True)
+    assert first["approx"] is None
+    owm.calls.clear()
+
+    near = weather.fetch_nearby(first["weather"].lat + 0.01, first["weather"].lon, include_pollution=True)
+    assert owm.calls == []
+    assert near["approx"]["distance_km"] > 0
+    assert len(compacted) == 1
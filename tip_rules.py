@@ -0,0 +1,81 @@
+"""Weather tip rules, shared by the single-reading tips (weather.get_weather_tips)
+and the vectorized forecast tips (tips.TipEngine).
+
+Plain Python only, so importing it does not load NumPy or pandas.
+"""
+import re
+from collections import namedtuple
+
+# ``summary`` is the short text used for time ranges (None: not worth a range).
+# Temperature bounds: at_least <= t < below, above < t <= at_most.
+# ``fallback`` rules match when no other temperature rule does.
+# ``current`` says whether the rule applies to a single current reading: True,
+# False, or a narrower condition pattern to use there instead of ``pattern``.
+Rule = namedtuple(
+    "Rule",
+    "name summary tip at_least below above at_most pattern fallback current",
+    defaults=(None, None, None, None, None, False, True),
+)
+
+RULES = (
+    Rule("extreme_heat", "extreme heat",
+         "🥵 Extreme heat! Stay indoors during peak hours, hydrate with electrolyte drinks, use SPF 30+, and wear loose, breathable layers.",
+         at_least=40),
+    Rule("hot", "hot",
+         "🌞 Hot weather—choose lightweight, moisture-wicking fabrics and stay hydrated.",
+         at_least=30, below=40),
+    Rule("freezing", "freezing",
+         "🥶 Cold weather—layer up: base, insulating mid-layer, and waterproof shell. Cover head, hands, feet to stay warm.",
+         at_most=0),
+    Rule("cool", "cool",
+         "🧥 Mild but cool—layer light sweater or jacket, especially in the morning/evening.",
+         at_least=10, below=20),
+    Rule("comfortable", None, "🙂 Comfortable weather—light layers are enough.", fallback=True),
+    Rule("rain", "rain expected",
+         "☔ Carry an umbrella or wear waterproof outer layer.",
+         pattern=r"rain|drizzle", current=r"rain"),
+    Rule("storm", "thunderstorms",
+         "⛈ Thunderstorms likely—avoid open ground and unplug sensitive electronics.",
+         pattern=r"thunder", current=False),
+    Rule("snow", "snow expected",
+         "❄ Be cautious—wear boots with good grip and watch for icy surfaces.",
+         pattern=r"snow|sleet", current=r"snow"),
+    Rule("low_visibility", "low visibility",
+         "🌫 Low visibility—drive slowly and use low-beam headlights.",
+         pattern=r"fog|mist|haze|smoke", current=False),
+    Rule("sunny", "sunny",
+         "🕶 Sunny and clear—use sunglasses and apply sunscreen.",
+         above=25, pattern=r"clear"),
+)
+
+
+def is_temperature_rule(rule):
+    """True for rules decided by temperature alone (they decide whether the fallback applies)."""
+    return not rule.pattern and any(b is not None for b in (rule.at_least, rule.below, rule.above, rule.at_most))
+
+
+def in_bounds(rule, temp):
+    return (
+        (rule.at_least is None or temp >= rule.at_least)
+        and (rule.below is None or temp < rule.below)
+        and (rule.above is None or temp > rule.above)
+        and (rule.at_most is None or temp <= rule.at_most)
+    )
+
+
+def reading_tips(temp, condition, rules=RULES):
+    """Tip texts for one current reading, in rule order."""
+    rules = [r for r in rules if r.current]
+    hot_or_cold = any(is_temperature_rule(r) and in_bounds(r, temp) for r in rules)
+    tips = []
+    for rule in rules:
+        if rule.fallback:
+            matched = not hot_or_cold
+        else:
+            pattern = rule.current if isinstance(rule.current, str) else rule.pattern
+            matched = in_bounds(rule, temp) and (
+                not pattern or re.search(pattern, condition or "", re.IGNORECASE) is not None
+            )
+        if matched:
+            tips.append(rule.tip)
+    return tips
@@ -0,0 +1,150 @@
+"""Weather tips evaluated in bulk over forecast slots.
+
+Rules (tip_rules.RULES) are compiled once: temperature bounds become NumPy
+comparisons and all condition keywords become one regex. The regex only runs
+over the distinct condition strings (factorized), so evaluating thousands of
+slots for hundreds of locations costs a handful of array operations per rule.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from frames import forecast_slots
+from tip_rules import RULES, is_temperature_rule
+
+# Forecast slot length (/forecast is 3-hourly)
+SLOT = pd.Timedelta(hours=3)
+
+
+def _strftime(values, fmt):
+    # Slot times repeat across locations: format each distinct time once
+    codes, uniques = pd.factorize(values)
+    return np.asarray(pd.DatetimeIndex(uniques).strftime(fmt), dtype=object)[codes]
+
+
+class TipEngine:
+    def __init__(self, rules=RULES):
+        self.rules = tuple(rules)
+        self.names = [r.name for r in self.rules]
+        self._regex = re.compile(
+            "|".join(f"(?P<{r.name}>{r.pattern})" for r in self.rules if r.pattern),
+            re.IGNORECASE,
+        )
+        self._column = {name: i for i, name in enumerate(self.names)}
+        # pure temperature rules, which decide whether the fallback applies
+        self._temperature = np.array([is_temperature_rule(r) for r in self.rules])
+
+    def _keyword_hits(self, conditions):
+        """(rows x rules) keyword matches, running the regex once per distinct condition."""
+        codes, uniques = pd.factorize(pd.Series(conditions, dtype="object"))
+        hits = np.zeros((len(uniques) + 1, len(self.rules)), dtype=bool)  # last row: missing
+        for i, text in enumerate(uniques):
+            for match in self._regex.finditer(str(text)):
+                hits[i, self._column[match.lastgroup]] = True
+        return hits[codes]
+
+    def evaluate(self, temps, conditions):
+        """Boolean matrix: one row per (temp, condition) pair, one column per rule."""
+        t = np.asarray(temps, dtype="float64")
+        keywords = self._keyword_hits(conditions)
+        matched = np.ones((len(t), len(self.rules)), dtype=bool)
+        for j, rule in enumerate(self.rules):
+            column = matched[:, j]
+            if rule.at_least is not None:
+                column &= t >= rule.at_least
+            if rule.below is not None:
+                column &= t < rule.below
+            if rule.above is not None:
+                column &= t > rule.above
+            if rule.at_most is not None:
+                column &= t <= rule.at_most
+            if rule.pattern:
+                column &= keywords[:, j]
+        others = matched[:, self._temperature].any(axis=1)
+        for j, rule in enumerate(self.rules):
+            if rule.fallback:
+                matched[:, j] = ~others
+        return matched
+
+    def slot_tips(self, slots):
+        """Long table of matched rules per slot: location, datetime, rule, summary.
+
+        ``slots`` is a frames.forecast_slots() frame (any number of locations);
+        without a ``location`` column all slots belong to location "".
+        """
+        matched = self.evaluate(slots["temp"].to_numpy(), slots["condition"])
+        rows, cols = np.nonzero(matched)
+        names = np.array(self.names, dtype=object)
+        summaries = np.array([r.summary for r in self.rules], dtype=object)
+        if "location" in slots:
+            locations = slots["location"].to_numpy(dtype="object")
+        else:
+            locations = np.full(len(slots), "", dtype=object)
+        return pd.DataFrame({
+            "location": locations[rows],
+            "datetime": slots["datetime"].to_numpy()[rows],
+            "rule": names[cols],
+            "summary": summaries[cols],
+        })
+
+    def tip_ranges(self, slots, tz_offset=0):
+        """Consecutive slots with the same tip collapsed into time ranges.
+
+        Returns location, rule, start, end (local time, end exclusive) and
+        text such as "rain expected Tue 15:00–21:00", ordered by location and
+        start. ``tz_offset`` is seconds east of UTC, or {location: seconds}.
+        """
+        long = self.slot_tips(slots)
+        long = long[long["summary"].notna()]
+        if long.empty:
+            return pd.DataFrame(columns=["location", "rule", "start", "end", "text"])
+
+        if isinstance(tz_offset, dict):
+            offsets = long["location"].map(tz_offset).fillna(0)
+        else:
+            offsets = tz_offset
+        long = long.assign(datetime=long["datetime"] + pd.to_timedelta(offsets, unit="s"))
+        long = long.sort_values(["location", "rule", "datetime"], kind="stable")
+
+        # A run starts wherever the location or rule changes or a slot is skipped
+        location = long["location"].to_numpy()
+        rule = long["rule"].to_numpy()
+        when = long["datetime"].to_numpy()
+        starts = np.ones(len(long), dtype=bool)
+        starts[1:] = (
+            (location[1:] != location[:-1])
+            | (rule[1:] != rule[:-1])
+            | (when[1:] - when[:-1] != SLOT.to_timedelta64())
+        )
+        first = np.flatnonzero(starts)
+        last = np.append(first[1:], len(long)) - 1
+
+        runs = pd.DataFrame({
+            "location": location[first],
+            "rule": rule[first],
+            "start": when[first],
+            "end": when[last] + SLOT.to_timedelta64(),
+        })
+        summary = long["summary"].to_numpy()[first]
+
+        same_day = runs["start"].dt.normalize() == (runs["end"] - pd.Timedelta(seconds=1)).dt.normalize()
+        until = np.where(same_day, _strftime(runs["end"], "%H:%M"), _strftime(runs["end"], "%a %H:%M"))
+        runs["text"] = summary + " " + _strftime(runs["start"], "%a %H:%M") + "–" + until
+        return runs.sort_values(["location", "start"], kind="stable").reset_index(drop=True)
+
+
+_engine = None
+
+
+def get_engine():
+    """The default TipEngine, compiled on first use."""
+    global _engine
+    if _engine is None:
+        _engine = TipEngine()
+    return _engine
+
+
+def forecast_tips(payloads, tz_offset=0):
+    """Tip time ranges for /forecast slots of one location (a list) or many ({location: list})."""
+    return get_engine().tip_ranges(forecast_slots(payloads), tz_offset)
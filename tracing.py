@@ -0,0 +1,336 @@
+import functools
+import io
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from time import perf_counter, time
+
+# Lightweight in-process tracing: every span records its duration, payload
+# size and cache status into a bounded ring buffer, and spans opened while a
+# trace is active (e.g. one dashboard search) are grouped under it.
+# Set WEATHER_TRACE=0 to turn recording off.
+
+ENABLED = os.getenv("WEATHER_TRACE", "1") != "0"
+SPAN_BUFFER_SIZE = int(os.getenv("WEATHER_TRACE_SPANS", "2000"))
+TRACE_BUFFER_SIZE = int(os.getenv("WEATHER_TRACE_SEARCHES", "50"))
+# Spans kept per trace; a trace left open by an aborted rerun stops growing here
+MAX_TRACE_SPANS = 200
+
+_spans = deque(maxlen=SPAN_BUFFER_SIZE)
+_traces = deque(maxlen=TRACE_BUFFER_SIZE)
+_lock = threading.Lock()
+_current = ContextVar("weather_trace", default=None)
+
+# Cumulative per-span-name totals for the metrics exporter (never reset)
+_totals = {}
+
+# Extra counters for the exporter: name -> (description, label, callable returning {label value: count})
+_counters = {}
+
+
+class Span:
+    """One timed operation.
+
+    ``size`` is the payload size: bytes for HTTP bodies and rendered
+    images/PDFs, rows or items for database calls and aggregation.
+    ``cache`` is "hit", "miss" or "refresh" where a cache is involved,
+    else None.
+    """
+
+    __slots__ = ("name", "started", "duration", "size", "cache", "error", "trace_id")
+
+    def __init__(self, name, trace_id=None):
+        self.name = name
+        self.started = time()
+        self.duration = None
+        self.size = None
+        self.cache = None
+        self.error = None
+        self.trace_id = trace_id
+
+    def as_dict(self):
+        return {attr: getattr(self, attr) for attr in self.__slots__}
+
+
+class Trace:
+    """A group of spans, e.g. everything done for one search."""
+
+    def __init__(self, name, **attrs):
+        self.id = f"{int(time() * 1000):x}-{id(self) & 0xffff:04x}"
+        self.name = name
+        self.attrs = attrs
+        self.started = time()
+        self.duration = None
+        self.spans = []
+        self._t0 = perf_counter()
+        self._token = None
+
+    def end(self):
+        """Close the trace and keep it in the recent-traces buffer."""
+        if self.duration is not None:
+            return
+        self.duration = perf_counter() - self._t0
+        if self._token is not None:
+            try:
+                _current.reset(self._token)
+            except ValueError:  # ended from another context
+                _current.set(None)
+        if ENABLED:
+            with _lock:
+                _traces.append(self)
+
+    def stages(self):
+        """Total seconds per span name, in first-seen order."""
+        totals = {}
+        for span in list(self.spans):
+            totals[span.name] = totals.get(span.name, 0.0) + (span.duration or 0.0)
+        return totals
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.end()
+
+
+def start_trace(name, **attrs):
+    """Start a trace and make it current; call ``.end()`` (or use ``with``) to close it."""
+    trace = Trace(name, **attrs)
+    trace._token = _current.set(trace)
+    return trace
+
+
+def _record(span, seconds):
+    span.duration = seconds
+    trace = _current.get()
+    with _lock:
+        _spans.append(span)
+        if trace is not None and len(trace.spans) < MAX_TRACE_SPANS:
+            trace.spans.append(span)
+        totals = _totals.get(span.name)
+        if totals is None:
+            totals = _totals[span.name] = {"count": 0, "seconds": 0.0, "bytes": 0,
+                                           "errors": 0, "cache": {}}
+        totals["count"] += 1
+        totals["seconds"] += seconds
+        if span.size:
+            totals["bytes"] += span.size
+        if span.error:
+            totals["errors"] += 1
+        if span.cache:
+            totals["cache"][span.cache] = totals["cache"].get(span.cache, 0) + 1
+
+
+@contextmanager
+def span(name):
+    """Time the enclosed block; set ``.size`` / ``.cache`` on the yielded span."""
+    if not ENABLED:
+        yield Span(name)
+        return
+    trace = _current.get()
+    current = Span(name, trace.id if trace else None)
+    t0 = perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = type(e).__name__
+        raise
+    finally:
+        _record(current, perf_counter() - t0)
+
+
+def traced(name=None, size=None):
+    """Decorator form of span(); ``size(result)`` gives the payload size."""
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            with span(label) as s:
+                result = fn(*args, **kwargs)
+                if size is not None and result is not None:
+                    s.size = size(result)
+                return result
+        return wrapper
+    return decorate
+
+
+def bind(fn):
+    """Wrap ``fn`` to run in the caller's trace context (for executor threads)."""
+    return functools.partial(copy_context().run, fn)
+
+
+def recent_spans(limit=None):
+    with _lock:
+        spans = list(_spans)
+    return spans[-limit:] if limit else spans
+
+
+def recent_traces(limit=None, name=None):
+    """Finished traces, newest first."""
+    with _lock:
+        traces = [t for t in reversed(_traces) if name is None or t.name == name]
+    return traces[:limit] if limit else traces
+
+
+def summary():
+    """Per span name: calls, p50/p95/max in ms and cache hits from the span buffer."""
+    by_name = {}
+    for s in recent_spans():
+        by_name.setdefault(s.name, []).append(s)
+    rows = []
+    for name, spans in sorted(by_name.items()):
+        durations = sorted(s.duration * 1000 for s in spans)
+        n = len(durations)
+        cached = [s.cache for s in spans if s.cache]
+        rows.append({
+            "span": name,
+            "calls": n,
+            "p50_ms": round(durations[(n - 1) // 2], 2),
+            "p95_ms": round(durations[min(n - 1, int(n * 0.95))], 2),
+            "max_ms": round(durations[-1], 2),
+            "cache_hit_ratio": round(cached.count("hit") / len(cached), 2) if cached else None,
+            "errors": sum(1 for s in spans if s.error),
+        })
+    return rows
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def register_counters(name, description, read, label="status"):
+    """Export ``read()`` ({label value: count}) as the counter ``weather_<name>``.
+
+    Registering the same name again replaces the previous source.
+    """
+    with _lock:
+        _counters[name] = (description, label, read)
+
+
+def openmetrics(http_histograms=None):
+    """Span totals, registered counters and optional http_client histograms in OpenMetrics text format."""
+    with _lock:
+        totals = {name: dict(t, cache=dict(t["cache"])) for name, t in _totals.items()}
+
+    lines = [
+        "# TYPE weather_span_seconds summary",
+        "# UNIT weather_span_seconds seconds",
+        "# HELP weather_span_seconds Time spent in traced operations.",
+    ]
+    for name, t in sorted(totals.items()):
+        lines.append(f'weather_span_seconds_count{{span="{_label(name)}"}} {t["count"]}')
+        lines.append(f'weather_span_seconds_sum{{span="{_label(name)}"}} {t["seconds"]:.6f}')
+
+    lines += ["# TYPE weather_span_payload counter",
+              "# HELP weather_span_payload Payload size (bytes for HTTP and rendering, else rows)."]
+    for name, t in sorted(totals.items()):
+        lines.append(f'weather_span_payload_total{{span="{_label(name)}"}} {t["bytes"]}')
+
+    lines += ["# TYPE weather_span_errors counter",
+              "# HELP weather_span_errors Traced operations that raised."]
+    for name, t in sorted(totals.items()):
+        lines.append(f'weather_span_errors_total{{span="{_label(name)}"}} {t["errors"]}')
+
+    lines += ["# TYPE weather_span_cache counter",
+              "# HELP weather_span_cache Cache lookups by outcome."]
+    for name, t in sorted(totals.items()):
+        for status, n in sorted(t["cache"].items()):
+            lines.append(f'weather_span_cache_total{{span="{_label(name)}",status="{status}"}} {n}')
+
+    with _lock:
+        counters = dict(_counters)
+    for name, (description, label, read) in sorted(counters.items()):
+        lines += [f"# TYPE weather_{name} counter", f"# HELP weather_{name} {description}"]
+        for value, n in sorted(read().items()):
+            lines.append(f'weather_{name}_total{{{label}="{_label(value)}"}} {n}')
+
+    if http_histograms:
+        lines += ["# TYPE weather_http_request_seconds histogram",
+                  "# UNIT weather_http_request_seconds seconds",
+                  "# HELP weather_http_request_seconds Upstream request latency."]
+        for endpoint, snap in sorted(http_histograms.items()):
+            label = f'endpoint="{_label(endpoint)}"'
+            for bound, count in snap["buckets"]:
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f'weather_http_request_seconds_bucket{{{label},le="{le}"}} {count}')
+            lines.append(f'weather_http_request_seconds_count{{{label}}} {snap["count"]}')
+            lines.append(f'weather_http_request_seconds_sum{{{label}}} {snap["sum"]:.6f}')
+
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def start_metrics_server(port, http_histograms=None, host="127.0.0.1"):
+    """Serve openmetrics() at http://host:port/metrics from a daemon thread.
+
+    ``http_histograms`` is a callable returning HttpClient.latency_snapshot().
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = openmetrics(http_histograms() if http_histograms else None).encode()
+            self.send_response(200)
+            self.send_header("Content-Type",
+                             "application/openmetrics-text; version=1.0.0; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="weather-metrics", daemon=True).start()
+    return server
+
+
+class Profiler:
+    """cProfile, or pyinstrument's sampling profiler if installed, around one run.
+
+    ``kind`` is "cprofile" or "pyinstrument"; pyinstrument falls back to
+    cProfile when it is not installed.
+    """
+
+    def __init__(self, kind="cprofile"):
+        self.kind = kind
+        self._profiler = None
+        if kind == "pyinstrument":
+            try:
+                from pyinstrument import Profiler as Sampler
+            except ImportError:
+                self.kind = "cprofile"
+            else:
+                self._profiler = Sampler()
+        if self._profiler is None:
+            import cProfile
+
+            self._profiler = cProfile.Profile()
+
+    def start(self):
+        if self.kind == "pyinstrument":
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+        return self
+
+    def stop(self, limit=40):
+        """Stop profiling and return a text report."""
+        if self.kind == "pyinstrument":
+            self._profiler.stop()
+            return self._profiler.output_text(unicode=True)
+
+        import pstats
+
+        self._profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
@@ -1,319 +1,455 @@
-import streamlit as st
 import os
-import requests
-import pandas as pd
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-from io import BytesIO
-
-from datetime import datetime, time, timedelta
-OPENWEATHER_API = st.secrets["OPENWEATHER_API"]
-# Current Weather
-def get_weather(city=None, zipcode=None, lat=None, lon=None):
-    # Build query
+import importlib
+import threading
+
+from datetime import datetime, time
+from time import monotonic
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+
+from cache import cache_from_env
+from geocode import get_gazetteer
+from observations import get_observation_store
+from spatial import SpatialIndex
+from tip_rules import reading_tips
+from tracing import bind, register_counters, span, traced
+
+# pandas, matplotlib, ReportLab, requests and Streamlit are only imported on
+# first use, so importing this module (e.g. for get_weather_tips) stays cheap.
+
+# Upstream endpoints (overridable, e.g. to point at benchmarks/replay_server.py)
+OPENWEATHER_URL = os.getenv("OPENWEATHER_URL", "https://api.openweathermap.org/data/2.5")
+# ip-api.com only serves HTTPS on its paid plan
+IPAPI_URL = os.getenv("IPAPI_URL", "http://ip-api.com/json/")
+
+# Shared cache for every OpenWeather response (see cache.py)
+response_cache = cache_from_env()
+register_counters(
+    "response_cache", "OpenWeather response cache events.", lambda: dict(response_cache.stats), "event"
+)
+
+# Seconds allowed for a single upstream request / for a whole search fan-out
+REQUEST_TIMEOUT = 10
+SEARCH_DEADLINE = 15
+
+# Recent fetch_location results (compact.compact_result) by coordinates, so
+# lat,lon lookups can reuse data fetched close by (see fetch_nearby)
+observation_index = SpatialIndex()
+NEARBY_RADIUS_KM = float(os.getenv("WEATHER_NEARBY_KM", "2"))
+NEARBY_MAX_AGE = int(os.getenv("WEATHER_NEARBY_MAX_AGE", "600"))
+
+_lazy_lock = threading.Lock()
+_http = None
+_api_key = None
+
+
+def _client():
+    """Shared keep-alive client for all upstream calls (see http_client.py)."""
+    global _http
+    if _http is None:
+        with _lazy_lock:
+            if _http is None:
+                from http_client import HttpClient
+
+                _http = HttpClient(read_timeout=REQUEST_TIMEOUT)
+    return _http
+
+
+def http_latency_snapshot():
+    """Per-endpoint upstream latency histograms ({} before the first request)."""
+    return _http.latency_snapshot() if _http is not None else {}
+
+
+def _openweather_key():
+    """OpenWeather API key from $OPENWEATHER_API or Streamlit secrets, read once."""
+    global _api_key
+    if _api_key is None:
+        _api_key = os.getenv("OPENWEATHER_API")
+        if not _api_key:
+            import streamlit as st
+
+            _api_key = st.secrets["OPENWEATHER_API"]
+    return _api_key
+
+
+# Heavy attributes resolved on first access
+_LAZY_ATTRS = {
+    "plot_weather": ("plots", "plot_weather"),
+    "plot_pollution": ("plots", "plot_pollution"),
+    "generate_report": ("report", "generate_report"),
+}
+
+
+def __getattr__(name):
+    if name == "http":
+        return _client()
+    if name == "OPENWEATHER_API":
+        return _openweather_key()
+    if name in _LAZY_ATTRS:
+        module, attr = _LAZY_ATTRS[name]
+        return getattr(importlib.import_module(module), attr)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Worker threads for concurrent upstream requests
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="weather-fetch")
+
+
+def parse_location_input(text):
+    """Split a search string into city / zipcode / lat,lon keyword arguments.
+
+    Raises ValueError for a malformed "lat,lon" pair.
+    """
+    text = text.strip()
+    if "," in text:
+        lat, lon = map(float, text.split(","))
+        return {"city": None, "zipcode": None, "lat": lat, "lon": lon}
+    elif text.isdigit():
+        return {"city": None, "zipcode": text, "lat": None, "lon": None}
+    return {"city": text or None, "zipcode": None, "lat": None, "lon": None}
+
+
+@traced("gazetteer.resolve")
+def resolve_place(city=None, zipcode=None):
+    """Look a city or PIN code up in the local gazetteer (None if absent)."""
+    gazetteer = get_gazetteer()
+    if gazetteer is None or not (city or zipcode):
+        return None
+    return gazetteer.lookup(city or zipcode)
+
+
+@traced("gazetteer.suggest", size=len)
+def suggest_places(text, limit=5):
+    """Autocomplete / did-you-mean names for ``text`` from the local gazetteer."""
+    gazetteer = get_gazetteer()
+    if gazetteer is None or not text.strip():
+        return []
+    return gazetteer.prefix(text, limit) or gazetteer.fuzzy(text, limit)
+
+
+def _location_query(city=None, zipcode=None, lat=None, lon=None):
+    """Build the OpenWeather query parameters for a city, zip or lat/lon."""
     if city:
-        url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={OPENWEATHER_API}&units=metric"
-        url_fc = f"http://api.openweathermap.org/data/2.5/forecast?q={city}&appid={OPENWEATHER_API}&units=metric"
+        return {"q": city}
     elif zipcode:
-        url = f"http://api.openweathermap.org/data/2.5/weather?zip={zipcode},IN&appid={OPENWEATHER_API}&units=metric"
-        url_fc = f"http://api.openweathermap.org/data/2.5/forecast?zip={zipcode},IN&appid={OPENWEATHER_API}&units=metric"
+        return {"zip": f"{zipcode},IN"}
     elif lat and lon:
-        url = f"http://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={OPENWEATHER_API}&units=metric"
-        url_fc = f"http://api.openweathermap.org/data/2.5/forecast?lat={lat}&lon={lon}&appid={OPENWEATHER_API}&units=metric"
-    else:
+        return {"lat": lat, "lon": lon}
+    return None
+
+
+def _owm_fetch(endpoint, params, units="metric", refresh=False, prewarm=False):
+    """GET an OpenWeather endpoint, serving fresh responses from the cache.
+
+    Returns ``(status_code, json, cached)``; the JSON is None on failure,
+    the status is None if the API could not be reached at all and
+    ``cached`` is True for responses served from the cache. ``refresh``
+    skips the cache lookup. With ``prewarm`` the lookup is not counted in
+    the cache stats and a new response is stored marked as pre-warmed (see
+    cache.ResponseCache.stats).
+    """
+    if units:
+        params = dict(params, units=units)
+
+    with span(f"owm.{endpoint}") as s:
+        if not refresh:
+            lookup = response_cache.peek if prewarm else response_cache.get
+            cached = lookup(endpoint, params)
+            if cached is not None:
+                s.cache = "hit"
+                return 200, cached, True
+        s.cache = "refresh" if refresh else "miss"
+
+        from requests import RequestException
+
+        try:
+            r = _client().get(
+                f"{OPENWEATHER_URL}/{endpoint}",
+                params=dict(params, appid=_openweather_key()),
+                endpoint=endpoint,
+            )
+        except RequestException as e:
+            s.error = type(e).__name__
+            return None, None, False
+        s.size = len(r.content)
+        if r.status_code != 200:
+            return r.status_code, None, False
+
+        data = r.json()
+    response_cache.set(endpoint, params, data, prewarmed=prewarm)
+    return 200, data, False
+
+
+def _owm_get(endpoint, params, units="metric", refresh=False, prewarm=False):
+    """GET an OpenWeather endpoint and return the JSON body, or None on failure."""
+    return _owm_fetch(endpoint, params, units, refresh, prewarm)[1]
+
+
+# Location search (current weather, then forecast + air pollution in parallel)
+@traced("fetch_location")
+def fetch_location(city=None, zipcode=None, lat=None, lon=None,
+                   include_pollution=False, deadline=SEARCH_DEADLINE, aggregate=True,
+                   refresh=False, executor=None, compact=False):
+    """Resolve a location and fetch its current weather and forecast once.
+
+    Returns a dict with ``weather`` (the get_weather dict), ``current_raw``
+    (the /weather payload), ``forecast_raw`` (the 3-hourly /forecast slots),
+    ``daily`` (the get_forecast DataFrame) and ``next_3h`` (the first
+    forecast slot), or None if the location cannot be resolved. With ``include_pollution`` the dict also carries
+    ``pollution`` (the get_air_pollution DataFrame) and ``pollution_raw``.
+    ``aggregate=False`` skips building the DataFrames (``daily`` and
+    ``pollution`` are None) for callers that aggregate many locations at
+    once with frames.daily_forecast / frames.daily_pollution. ``refresh``
+    (used to pre-warm the cache) re-fetches the current weather, which has
+    the shortest TTL, and fetches the forecast and pollution only if they
+    are no longer cached; responses it fetches are marked as pre-warmed.
+    ``executor`` runs the upstream requests instead of the shared pool
+    (batch jobs pass their own so they do not starve interactive searches).
+    With ``compact`` the result is returned as compact.compact_result().
+
+    Only a result with freshly fetched current weather is added to the
+    nearby-results index and the observation store: a cached /weather
+    response means the same observation was already added when it was
+    fetched.
+
+    Once the coordinates are known the forecast and air-pollution requests
+    run concurrently. ``deadline`` (seconds) covers the whole lookup: None is
+    returned if the current weather has not arrived by then, and forecast or
+    pollution data still outstanding is left out (None) and listed under
+    ``timed_out``.
+    """
+    from frames import forecast_frame, pollution_frame
+
+    started = monotonic()
+    executor = executor or _executor
+
+    # Cities and PIN codes in the local gazetteer skip the network lookup
+    place = resolve_place(city, zipcode)
+    if place is not None:
+        city, zipcode, lat, lon = None, None, place["lat"], place["lon"]
+
+    params = _location_query(city, zipcode, lat, lon)
+    if params is None:
         return None
 
-    # Current Weather
-    r = requests.get(url)
-    if r.status_code != 200:
+    def fan_out(coords):
+        # bind() keeps the worker's spans under the caller's trace
+        pending = {"forecast": executor.submit(bind(_owm_get), "forecast", coords, "metric", False, refresh)}
+        if include_pollution:
+            pending["pollution"] = executor.submit(
+                bind(_owm_get), "air_pollution/forecast", coords, None, False, refresh
+            )
+        return pending
+
+    # With coordinates already known, everything is requested at once
+    pending = fan_out(params) if "lat" in params else None
+
+    # Current Weather, on the pool as well so the deadline covers it (and its retries)
+    current = executor.submit(bind(_owm_fetch), "weather", params, "metric", refresh, refresh)
+    try:
+        _, data, cached = current.result(timeout=max(0, deadline - (monotonic() - started)))
+    except FutureTimeoutError:
+        return None
+    if data is None:
         return None
-    data = r.json()
 
     weather = {
-        "city": data["name"],
+        "city": place["name"] if place and place["kind"] == "city" else data["name"],
         "temp": data["main"]["temp"],
         "weather": data["weather"][0]["description"],  # ✅ consistent key
         "lat": data["coord"]["lat"],
         "lon": data["coord"]["lon"],
+        "dt": data.get("dt"),  # observation time (unix seconds)
     }
 
-    # Next 3-hour forecast
-    r_fc = requests.get(url_fc)
-    if r_fc.status_code == 200:
-        data_fc = r_fc.json()
-        if len(data_fc["list"]) > 0:
-            next_fc = data_fc["list"][0]  # next 3 hours
-            weather["next_3h_temp"] = next_fc["main"]["temp"]
-            weather["next_3h_condition"] = next_fc["weather"][0]["description"]
+    # Otherwise fan out for the coordinates the API resolved
+    if pending is None:
+        pending = fan_out({"lat": weather["lat"], "lon": weather["lon"]})
+
+    done, _ = wait(pending.values(), timeout=max(0, deadline - (monotonic() - started)))
+    payloads = {}
+    timed_out = []
+    for name, future in pending.items():
+        if future not in done:
+            timed_out.append(name)
+            payloads[name] = None
+        elif future.exception() is not None:
+            payloads[name] = None
+        else:
+            payloads[name] = future.result()
+
+    data_fc = payloads["forecast"]
+    forecast_raw = data_fc["list"] if data_fc else []
+
+    next_3h = forecast_raw[0] if forecast_raw else None
+    if next_3h is not None:
+        weather["next_3h_temp"] = next_3h["main"]["temp"]
+        weather["next_3h_condition"] = next_3h["weather"][0]["description"]
+
+    daily = None
+    if forecast_raw and aggregate:
+        with span("aggregate.forecast") as s:
+            daily = forecast_frame(forecast_raw)
+            s.size = len(forecast_raw)
+
+    result = {
+        "weather": weather,
+        "forecast_raw": forecast_raw,
+        "daily": daily,
+        "next_3h": next_3h,
+        "current_raw": data,
+        "timed_out": timed_out,
+    }
+    if include_pollution:
+        data_ap = payloads["pollution"]
+        result["pollution_raw"] = data_ap["list"] if data_ap else []
+        result["pollution"] = None
+        if result["pollution_raw"] and aggregate:
+            with span("aggregate.pollution") as s:
+                result["pollution"] = pollution_frame(result["pollution_raw"])
+                s.size = len(result["pollution_raw"])
+
+    if not cached:
+        # Keep a local time series of everything fetched, off the request path
+        store = get_observation_store()
+        if store is not None:
+            executor.submit(store.record, weather["city"], result)
+
+    # Complete results can stand in for nearby lat,lon lookups
+    index = aggregate and not timed_out and not cached
+    if not (compact or index):
+        return result
+
+    from compact import compact_result
+
+    compacted = compact_result(result)
+    if index:
+        observation_index.add(weather["lat"], weather["lon"], compacted)
+        if "lat" in params:
+            observation_index.add(params["lat"], params["lon"], compacted)
+    return compacted if compact else result
+
+
+def _nearby(lat, lon, radius_km, max_age, accept=None):
+    hit = observation_index.nearest(lat, lon, radius_km, max_age, accept) if radius_km > 0 else None
+    if hit is None:
+        return None, None
+    result, distance, age, (hit_lat, hit_lon) = hit
+    return result, {
+        "distance_km": round(distance, 2),
+        "age_seconds": round(age),
+        "lat": hit_lat,
+        "lon": hit_lon,
+    }
 
-    return weather
 
+@traced("fetch_nearby")
+def fetch_nearby(lat, lon, radius_km=NEARBY_RADIUS_KM, max_age=NEARBY_MAX_AGE,
+                 include_pollution=False, **kwargs):
+    """fetch_location for coordinates, reusing a recent result fetched nearby.
 
+    Returns a compact result (see compact.compact_result) plus ``approx``.
+    A result fetched within ``radius_km`` of (lat, lon) and at most
+    ``max_age`` seconds ago is reused; otherwise the location is fetched
+    upstream. ``approx`` is None for fresh results, or a dict with the
+    ``distance_km`` and ``age_seconds`` of the reused result and the
+    ``lat``/``lon`` it was fetched for.
+    """
+    def usable(result):
+        return not include_pollution or result["pollution"] is not None
 
-# 6-day Daily Forecast
-def get_forecast(city=None, zipcode=None, lat=None, lon=None):
-    if city:
-        url = f"http://api.openweathermap.org/data/2.5/forecast?q={city}&appid={OPENWEATHER_API}&units=metric"
-    elif zipcode:
-        url = f"http://api.openweathermap.org/data/2.5/forecast?zip={zipcode},IN&appid={OPENWEATHER_API}&units=metric"
-    elif lat and lon:
-        url = f"http://api.openweathermap.org/data/2.5/forecast?lat={lat}&lon={lon}&appid={OPENWEATHER_API}&units=metric"
-    else:
-        return None
+    cached, approx = _nearby(lat, lon, radius_km, max_age, usable)
+    if cached is not None:
+        return dict(cached, approx=approx)
 
-    r = requests.get(url)
-    if r.status_code != 200:
+    result = fetch_location(lat=lat, lon=lon, include_pollution=include_pollution, compact=True, **kwargs)
+    if result is None:
         return None
+    return dict(result, approx=None)
 
-    data = r.json()
-    forecast_list = []
-
-    for f in data["list"]:
-        forecast_list.append(
-            {
-                "date": pd.to_datetime(f["dt_txt"]).date(),
-                "temp": f["main"]["temp"],
-                "condition": f["weather"][0]["description"],
-            }
-        )
 
-    df = pd.DataFrame(forecast_list)
+# Current Weather
+@traced("get_weather")
+def get_weather(city=None, zipcode=None, lat=None, lon=None):
+    result = fetch_location(city, zipcode, lat, lon)
+    if result is None:
+        return None
+    return result["weather"]
 
-    df_daily = (
-        df.groupby("date")
-        .agg(
-            temp=("temp", "mean"),
-            condition=("condition", lambda x: x.value_counts().idxmax()),
-        )
-        .reset_index()
-    )
 
-    return df_daily
+# 6-day Daily Forecast
+@traced("get_forecast")
+def get_forecast(city=None, zipcode=None, lat=None, lon=None):
+    result = fetch_location(city, zipcode, lat, lon)
+    if result is None:
+        return None
+    return result["daily"]
 
 
 # Air Pollution (Current + 5 days)
-
+@traced("get_air_pollution")
 def get_air_pollution(lat, lon):
-    url = f"http://api.openweathermap.org/data/2.5/air_pollution/forecast?lat={lat}&lon={lon}&appid={OPENWEATHER_API}"
-    r = requests.get(url)
-    if r.status_code != 200:
-        return None
+    from frames import pollution_frame
 
-    data = r.json()
-    pollution_list = []
+    data = _owm_get("air_pollution/forecast", {"lat": lat, "lon": lon}, units=None)
+    if data is None:
+        return None
+    return pollution_frame(data["list"])
 
-    aqi_map = {
-        1: "Good",
-        2: "Fair",
-        3: "Moderate",
-        4: "Poor",
-        5: "Very Poor",
-    }
 
-    for f in data["list"]:
-        dt = pd.to_datetime(f["dt"], unit="s")
-        pollution_list.append(
-            {
-                "datetime": dt,
-                "date": dt.date(),
-                "aqi": f["main"]["aqi"],  # numeric AQI
-                "aqi_label": aqi_map[f["main"]["aqi"]],  # mapped AQI text
-                "pm2_5": f["components"]["pm2_5"],
-                "pm10": f["components"]["pm10"],
-                "no2": f["components"]["no2"],
-                "so2": f["components"]["so2"],
-                "o3": f["components"]["o3"],
-                "co": f["components"]["co"],
-            }
-        )
-
-    df = pd.DataFrame(pollution_list)
-
-    df = df.groupby("date", as_index=False).mean(numeric_only=True)
-
-    df["aqi"] = df["aqi"].round().astype(int)
-    df["aqi_label"] = df["aqi"].map(aqi_map)
-
-    return df
-
-
-def plot_weather(forecast_df):
-    fig, ax = plt.subplots()
-    ax.plot(forecast_df["date"], forecast_df["temp"], marker="o")
-    ax.set_xlabel("Date")
-    ax.set_ylabel("Temperature (°C)")
-    ax.set_title("6-Day Weather Forecast")
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    return fig
-
-
-def plot_pollution(pollution_df):
-    fig, ax = plt.subplots()
-
-    # Plot AQI values (1-5)
-    ax.plot(
-        pollution_df["date"],
-        pollution_df["aqi"],
-        marker="o",
-        color="purple",
-        label="AQI",
-    )
-
-    # Annotate with AQI labels (Good, Fair, etc.)
-    for i, row in pollution_df.iterrows():
-        ax.text(
-            row["date"], row["aqi"] + 0.1, row["aqi_label"], ha="center", fontsize=8
-        )
-
-    ax.set_xlabel("Date")
-    ax.set_ylabel("AQI (1=Good, 5=Very Poor)")
-    ax.set_title("Air Quality Index Forecast (5 Days)")
-    ax.set_ylim(0, 6)
-    ax.legend()
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    return fig
-# Report Generator (PDF)
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-
-
-def generate_report(city, weather, forecast, pollution):
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    styles = getSampleStyleSheet()
-
-    title_style = ParagraphStyle(
-        "TitleStyle",
-        parent=styles["Title"],
-        alignment=1,
-        textColor=colors.HexColor("#004080")
-    )
-    section_style = ParagraphStyle(
-        "SectionStyle",
-        parent=styles["Heading2"],
-        textColor=colors.HexColor("#006699")
-    )
-
-    story = []
-
-    story.append(Paragraph(f"🌍 Weather Report for {city}", title_style))
-    story.append(Spacer(1, 20))
-
-    story.append(Paragraph("🌤 Current Weather", section_style))
-    story.append(Spacer(1, 8))
-    story.append(Paragraph(f"<b>Temperature:</b> {weather['temp']:.2f} °C", styles["Normal"]))
-    story.append(Paragraph(f"<b>Condition:</b> {weather['weather']}", styles["Normal"]))
-    story.append(Paragraph(f"<b>Coordinates:</b> {weather['lat']:.2f}, {weather['lon']:.2f}", styles["Normal"]))
-    story.append(Spacer(1, 16))
-
-    if forecast is not None:
-        story.append(Paragraph("📊 5-Day Forecast", section_style))
-        story.append(Spacer(1, 8))
-        forecast_data = [forecast.columns.tolist()] + [
-            [f"{v:.2f}" if isinstance(v, float) else v for v in row] for row in forecast.values.tolist()
-        ]
-        forecast_table = Table(forecast_data, hAlign="LEFT")
-        forecast_table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#CCE5FF")),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
-            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.whitesmoke, colors.lightgrey]),
-            ("FONTSIZE", (0, 0), (-1, -1), 9),
-            ("PADDING", (0, 0), (-1, -1), 6),
-        ]))
-        story.append(forecast_table)
-        story.append(Spacer(1, 16))
-
-    if pollution is not None:
-        story.append(Paragraph("💨 Air Pollution Forecast (5 Days)", section_style))
-        story.append(Spacer(1, 8))
-        pollution_data = [pollution.columns.tolist()] + [
-            [f"{v:.2f}" if isinstance(v, float) else v for v in row] for row in pollution.values.tolist()
-        ]
-        pollution_table = Table(pollution_data, hAlign="LEFT")
-        pollution_table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#FFDDCC")),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
-            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.whitesmoke, colors.lavender]),
-            ("FONTSIZE", (0, 0), (-1, -1), 9),
-            ("PADDING", (0, 0), (-1, -1), 6),
-        ]))
-        story.append(pollution_table)
-        story.append(Spacer(1, 16))
-
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
-
-
-def get_user_location():
+@traced("get_user_location")
+def get_user_location(timeout=3):
     """Get user's approximate location using IP address"""
+    from requests import RequestException
+
     try:
-        response = requests.get("http://ip-api.com/json/")
+        response = _client().get(IPAPI_URL, endpoint="ip-api", timeout=timeout, retries=0)
         data = response.json()
         return data["lat"], data["lon"]
-    except:
+    except (RequestException, ValueError, KeyError):
         return None, None
 
 
+def _current_summary(data):
+    return {
+        "city": data["name"],
+        "temperature": data["main"]["temp"],
+        "description": data["weather"][0]["description"].capitalize(),
+        "humidity": data["main"]["humidity"],
+        "wind_speed": data["wind"]["speed"],
+    }
+
+
+@traced("get_current_weather")
 def get_current_weather(lat, lon):
     """Fetches the current weather for given latitude and longitude using OpenWeatherMap API."""
-    
-    url = f"http://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={OPENWEATHER_API}&units=metric"
-    response = requests.get(url)
 
-    if response.status_code == 200:
-        data = response.json()
-        return {
-            "city": data["name"],
-            "temperature": data["main"]["temp"],
-            "description": data["weather"][0]["description"].capitalize(),
-            "humidity": data["main"]["humidity"],
-            "wind_speed": data["wind"]["speed"],
-        }
+    status, data, _ = _owm_fetch("weather", {"lat": lat, "lon": lon})
+
+    if data is not None:
+        return _current_summary(data)
     else:
-        return {"error": f"Failed to fetch weather: {response.status_code}"}
+        return {"error": f"Failed to fetch weather: {status or 'service unreachable'}"}
+
+
+@traced("get_local_weather")
+def get_local_weather(radius_km=NEARBY_RADIUS_KM, max_age=NEARBY_MAX_AGE):
+    """Current weather at the user's IP location, or None if it can't be located.
+
+    Weather fetched within ``radius_km`` in the last ``max_age`` seconds is
+    reused; the dict then has an ``approx`` entry as in fetch_nearby.
+    """
+    lat, lon = get_user_location()
+    if not (lat and lon):
+        return None
+    cached, approx = _nearby(lat, lon, radius_km, max_age)
+    if cached is not None:
+        return dict(_current_summary(cached["current_raw"]), approx=approx)
+    return get_current_weather(lat, lon)
 
 
 def get_weather_tips(temp_c, description):
-    tips = []
-    if temp_c >= 40:
-        tips.append(
-            "🥵 Extreme heat! Stay indoors during peak hours, hydrate with electrolyte drinks, use SPF 30+, and wear loose, breathable layers."
-        )
-    elif temp_c >= 30:
-        tips.append(
-            "🌞 Hot weather—choose lightweight, moisture-wicking fabrics and stay hydrated."
-        )
-    elif temp_c <= 0:
-        tips.append(
-            "🥶 Cold weather—layer up: base, insulating mid-layer, and waterproof shell. Cover head, hands, feet to stay warm."
-        )
-    elif 10 <= temp_c < 20:
-        tips.append(
-            "🧥 Mild but cool—layer light sweater or jacket, especially in the morning/evening."
-        )
-    else:
-        tips.append("🙂 Comfortable weather—light layers are enough.")
-
-    if "rain" in description.lower():
-        tips.append("☔ Carry an umbrella or wear waterproof outer layer.")
-    if "snow" in description.lower():
-        tips.append(
-            "❄ Be cautious—wear boots with good grip and watch for icy surfaces."
-        )
-    if "clear" in description.lower() and temp_c > 25:
-        tips.append("🕶 Sunny and clear—use sunglasses and apply sunscreen.")
-
-    return tips
+    """Tips for one reading (no pandas); tips.py evaluates forecast slots in bulk."""
+    return reading_tips(temp_c, description)
 
 
 def parse_record_time(rt):